@@ -0,0 +1,25 @@
+"""This module contains async drivers required for asyncio serving mode."""
+
+from neo4j import AsyncGraphDatabase
+from elasticsearch import AsyncElasticsearch
+
+from app import APP_CONFIG
+
+
+ASYNC_NEO4J_DRIVER = AsyncGraphDatabase.driver(
+    APP_CONFIG.NEO4J_DATABASE_URI,
+    auth=(APP_CONFIG.NEO4J_DATABASE_USER, APP_CONFIG.NEO4J_DATABASE_PASSWORD),
+    max_connection_pool_size=APP_CONFIG.NEO4j_DATABASE_SIZE,
+)
+ASYNC_ES_DRIVER = AsyncElasticsearch(
+    [APP_CONFIG.ES_DATABASE_HOST],
+    http_auth=(APP_CONFIG.ES_DATABASE_USER, APP_CONFIG.ES_DATABASE_PASS),
+    port=APP_CONFIG.ES_DATABASE_PORT,
+    maxsize=APP_CONFIG.ES_DATABASE_SIZE,
+)
+
+
+async def close_async_drivers():
+    """Close connections pools of async drivers."""
+    await ASYNC_NEO4J_DRIVER.close()
+    await ASYNC_ES_DRIVER.close()
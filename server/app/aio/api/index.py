@@ -0,0 +1,65 @@
+"""This module provides basic server endpoints for asyncio serving mode."""
+
+import time
+
+from quart import Blueprint, request, g
+
+from app.views import index as views
+
+
+internal_blueprint = Blueprint("ct-internal", __name__)
+
+
+@internal_blueprint.route("/health", methods=["GET"])
+async def health():
+    """Return health OK http status."""
+    return views.health(request.url)
+
+
+@internal_blueprint.route("/cache", methods=["GET"])
+async def cache_stats():
+    """Return recommendation cache hits and misses counters."""
+    return views.cache_stats()
+
+
+@internal_blueprint.route("/coalescing", methods=["GET"])
+async def coalescing_stats():
+    """Return counters of backend calls and calls coalesced with identical in-flight ones."""
+    return views.coalescing_stats()
+
+
+@internal_blueprint.route("/metrics", methods=["GET"])
+async def metrics():
+    """Return latency histograms, error counters and pool gauges in prometheus text format."""
+    return views.metrics()
+
+
+async def start_request_timer():
+    """Remember start time of request to observe its duration."""
+    g.request_started_at = time.perf_counter()
+
+
+async def observe_request_duration(response):
+    """Observe duration of request by route, method and response status."""
+    return views.observe_request_duration(request, g.get("request_started_at"), response)
+
+
+async def validate_body():
+    """Validate request json body for all request, except GET."""
+    if views.is_body_required(request.method):
+        return views.validate_body(await request.get_json())
+
+
+async def handle_404(error):
+    """Return custom response for 404 http status code."""
+    return views.not_found(request.path)
+
+
+async def handle_405(error):
+    """Return custom response for 405 http status code."""
+    return views.method_not_allowed(request.method)
+
+
+async def handle_500(error):
+    """Return custom response for 500 http status code."""
+    return views.server_error(error, request.url)
@@ -0,0 +1,84 @@
+"""This module provides movies endpoints for asyncio serving mode."""
+
+from quart import Blueprint, request, g
+
+from app.aio.models.movie import AsyncMovie
+from app.aio.utils.auth import auth_required
+from app.views import movie as views
+
+
+movies_blueprint = Blueprint("pl-movies", __name__)
+
+
+@movies_blueprint.route("user/movies", methods=("GET",))
+@auth_required
+async def handle_user_liked_movies():
+    """Return movies liked by user."""
+    return await views.get_user_liked_movies(AsyncMovie, g.user_id)
+
+
+@movies_blueprint.route("user/likes", methods=("POST",))
+@auth_required
+async def handle_user_likes_bulk():
+    """Apply list of like and unlike operations of user in one transaction."""
+    return await views.apply_user_like_operations(
+        AsyncMovie, g.user_id, await request.get_json()
+    )
+
+
+@movies_blueprint.route("/movies", methods=("GET",))
+async def handle_movies_search():
+    """Return results from elastic search by provided query."""
+    return await views.search_movies(AsyncMovie, request.args)
+
+
+@movies_blueprint.route("/movies/suggest", methods=("GET",))
+async def handle_movies_suggest():
+    """Return movies with titles starting with provided query words."""
+    return await views.suggest_movies(AsyncMovie, request.args)
+
+
+@movies_blueprint.route("/movies/<movie_id>", methods=("GET",))
+async def handle_get_movie(movie_id):
+    """Return movie data by provided movie external id."""
+    return await views.get_movie(AsyncMovie, request, movie_id)
+
+
+@movies_blueprint.route("/movies/batch", methods=("POST",))
+async def handle_get_movies_batch():
+    """Return movies data by provided movies external ids and list of missing ids."""
+    return await views.get_movies_batch(AsyncMovie, await request.get_json())
+
+
+@movies_blueprint.route("/movies/<movie_id>/like", methods=("POST",))
+@auth_required
+async def handle_movie_like(movie_id):
+    """Create like for provided movie and user."""
+    return await views.like_movie(AsyncMovie, g.user_id, movie_id)
+
+
+@movies_blueprint.route("/movies/<movie_id>/like", methods=("DELETE",))
+@auth_required
+async def handle_movie_dislike(movie_id):
+    """Delete like for provided movie and user."""
+    return await views.unlike_movie(AsyncMovie, g.user_id, movie_id)
+
+
+@movies_blueprint.route("/movies/<movie_id>/similar", methods=("GET",))
+async def handle_movie_similar(movie_id):
+    """Return list of similar movies to provided movie_id."""
+    return await views.get_similar_movies(AsyncMovie, request, movie_id)
+
+
+@movies_blueprint.route("movies/recommendations/collaborative", methods=("GET",))
+@auth_required
+async def handle_collaborative_recommendations():
+    """Return collaborative recommendations for provided user."""
+    return await views.get_collaborative_recommendations(AsyncMovie, g.user_id, request.args)
+
+
+@movies_blueprint.route("/movies/recommendations/content-based", methods=("GET",))
+@auth_required
+async def handle_content_based_recommendations():
+    """Return content-based recommendations for provided user."""
+    return await views.get_content_based_recommendations(AsyncMovie, g.user_id, request.args)
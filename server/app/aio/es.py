@@ -0,0 +1,20 @@
+"""This module includes async functionality to work with ES."""
+
+from app.aio import ASYNC_ES_DRIVER
+from app.es import ElasticSearchDriver
+
+
+class AsyncElasticSearchDriver(ElasticSearchDriver):
+    """Class to work with elastic search from asyncio serving mode."""
+
+    driver = ASYNC_ES_DRIVER
+
+    @classmethod
+    async def search(cls, query, index, limit, timeout=None):
+        """Get search results and format response."""
+        with cls.time_search(index):
+            result = await cls.driver.search(
+                body=query, index=index, size=limit, **cls.get_search_params(timeout)
+            )
+
+        return cls.format_results(result, index)
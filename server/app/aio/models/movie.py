@@ -0,0 +1,12 @@
+"""This module includes async functionality to work with Movies nodes."""
+
+from app.aio.es import AsyncElasticSearchDriver
+from app.aio.storage import ASYNC_STORAGE
+from app.models.movie import Movie
+
+
+class AsyncMovie(Movie):
+    """This class includes async functionality to work with Movies nodes."""
+
+    storage = ASYNC_STORAGE
+    es_driver = AsyncElasticSearchDriver
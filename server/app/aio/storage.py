@@ -0,0 +1,74 @@
+"""This module includes async storage backends of movies graph used by AsyncMovie model."""
+
+import time
+
+from app import APP_CONFIG
+from app.aio import ASYNC_NEO4J_DRIVER
+from app.constants import MEMORY_STORAGE_BACKEND
+from app.metrics import get_query_name
+from app.profiling import QUERY_PROFILER
+from app.storage import STORAGE, BaseNeo4jStorageBackend
+
+
+class AsyncNeo4jStorageBackend(BaseNeo4jStorageBackend):
+    """Class that represents movies graph stored in neo4j database with async driver."""
+
+    async def run(self, query, single=False, **parameters):
+        """Run cypher query in new session and return its records as dicts.
+
+        With single flag only the first record is returned, or None if there are no records.
+        """
+        name = get_query_name(query)
+        profiled_query, profiled = QUERY_PROFILER.prepare(query)
+        async with self.driver.session() as session:
+            started_at = time.perf_counter()
+            with self.time_query("run", name):
+                result = await session.run(profiled_query, **parameters)
+            with self.time_query("data", name):
+                records = await result.data()
+
+            duration = time.perf_counter() - started_at
+            if QUERY_PROFILER.should_record(duration, profiled):
+                summary = await result.consume()
+                QUERY_PROFILER.record(name, parameters, duration, len(records), summary, profiled)
+
+        return self.select_records(name, records, single)
+
+    async def write_likes(self, create_query, delete_query, likes, unlikes):
+        """Create likes and delete unlikes in one write transaction, return created likes."""
+
+        async def apply(transaction):
+            """Create likes and delete unlikes in provided transaction."""
+            created = []
+            if likes:
+                result = await transaction.run(create_query, likes=likes)
+                created = await result.data()
+            if unlikes:
+                result = await transaction.run(delete_query, unlikes=unlikes)
+                await result.consume()
+
+            return created
+
+        name = get_query_name(create_query)
+        started_at = time.perf_counter()
+        async with self.driver.session() as session:
+            with self.time_query("transaction", name):
+                created = await session.execute_write(apply)
+
+        self.record_write(name, likes, unlikes, time.perf_counter() - started_at, created)
+        return created
+
+
+def create_async_storage_backend():
+    """Return async storage backend of movies graph with configured backend.
+
+    In-process backend is shared with sync mode, its reads take microseconds, so they
+    are run in the event loop directly.
+    """
+    if APP_CONFIG.STORAGE_BACKEND == MEMORY_STORAGE_BACKEND:
+        return STORAGE
+
+    return AsyncNeo4jStorageBackend(ASYNC_NEO4J_DRIVER)
+
+
+ASYNC_STORAGE = create_async_storage_backend()
@@ -0,0 +1,22 @@
+"""This module provides decorators for asyncio server application."""
+
+from functools import wraps
+
+from quart import request, g
+
+from app.utils.jwt import authenticate
+
+
+def auth_required(view):
+    """Check if authorization token in headers is correct."""
+
+    @wraps(view)
+    async def decorated_function(*args, **kwargs):
+        """Returns UNAUTHORIZED if authorization token is not correct or empty."""
+        g.user_id, error_response = authenticate(request.headers.get("Authorization"))
+        if error_response:
+            return error_response
+
+        return await view(*args, **kwargs)
+
+    return decorated_function
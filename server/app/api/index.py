@@ -1,64 +1,65 @@
 """This module provides basic server endpoints."""
 
-import logging
-from http import HTTPStatus
+import time
 
-from flask import Blueprint, request
+from flask import Blueprint, request, g
 
-from app.utils.response import make_response
+from app.views import index as views
 
 
 internal_blueprint = Blueprint("ct-internal", __name__)
 
 
-LOGGER = logging.getLogger(__name__)
-SAFE_REQUEST_METHODS = ("GET", "HEAD", "OPTIONS")
-
-
 @internal_blueprint.route("/health", methods=["GET"])
 def health():
     """Return health OK http status."""
-    return make_response(
-        success=True,
-        message=f"OK. URL: {str(request.url)}",
-        http_status=HTTPStatus.OK
-    )
+    return views.health(request.url)
+
+
+@internal_blueprint.route("/cache", methods=["GET"])
+def cache_stats():
+    """Return recommendation cache hits and misses counters."""
+    return views.cache_stats()
+
+
+@internal_blueprint.route("/coalescing", methods=["GET"])
+def coalescing_stats():
+    """Return counters of backend calls and calls coalesced with identical in-flight ones."""
+    return views.coalescing_stats()
+
+
+@internal_blueprint.route("/metrics", methods=["GET"])
+def metrics():
+    """Return latency histograms, error counters and pool gauges in prometheus text format."""
+    return views.metrics()
+
+
+def start_request_timer():
+    """Remember start time of request to observe its duration."""
+    g.request_started_at = time.perf_counter()
+
+
+def observe_request_duration(response):
+    """Observe duration of request by route, method and response status."""
+    return views.observe_request_duration(request, g.get("request_started_at"), response)
 
 
 def validate_body():
     """Validate request json body for all request, except GET."""
-    if request.method not in SAFE_REQUEST_METHODS and request.json is None:
-        return make_response(
-            success=False,
-            message="Wrong input. Couldn't found json body.",
-            http_status=HTTPStatus.BAD_REQUEST,
-        )
+    if views.is_body_required(request.method):
+        return views.validate_body(request.json)
 
 
 def handle_404(error):
     """Return custom response for 404 http status code."""
-    return make_response(
-        success=False,
-        message=f"The endpoint ({request.path}) you are trying to access could not be found on the server.",
-        http_status=HTTPStatus.NOT_FOUND,
-    )
+    return views.not_found(request.path)
 
 
 def handle_405(error):
     """Return custom response for 405 http status code."""
-    return make_response(
-        success=False,
-        message=f"The method ({request.method}) you are trying to use for this URL is not supported.",
-        http_status=HTTPStatus.METHOD_NOT_ALLOWED,
-    )
+    return views.method_not_allowed(request.method)
 
 
 def handle_500(error):
     """Return custom response for 500 http status code."""
-    LOGGER.error("Unhandled 500x error: %s", error)
-
-    return make_response(
-        success=False,
-        message=f"Something has gone wrong on the server side (URL - {str(request.url)}). Please, try again later.",
-        http_status=HTTPStatus.INTERNAL_SERVER_ERROR,
-    )
+    return views.server_error(error, request.url)
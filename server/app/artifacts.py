@@ -0,0 +1,255 @@
+"""This module includes versioned memory-mapped storage of precomputed data.
+
+Layout: <ARTIFACTS_DIR>/<name>/CURRENT keeps the active version and every
+<ARTIFACTS_DIR>/<name>/<version>/ keeps meta.json and fixed-width .npy arrays.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app import APP_CONFIG
+from app.exceptions import ArtifactError
+
+
+FORMAT_VERSION = 1
+CURRENT_FILE_NAME = "CURRENT"
+META_FILE_NAME = "meta.json"
+TEMPORARY_PREFIX = "."
+
+STRINGS_OFFSETS_SUFFIX = ".offsets"
+STRINGS_DATA_SUFFIX = ".data"
+IDS_SORTED_SUFFIX = ".sorted"
+IDS_SORTED_ROWS_SUFFIX = ".sorted_rows"
+
+
+def get_artifact_dir(name):
+    """Return directory of all versions of provided artifact."""
+    return os.path.join(APP_CONFIG.ARTIFACTS_DIR, name)
+
+
+def read_current_version(name):
+    """Return active version of provided artifact."""
+    try:
+        with open(os.path.join(get_artifact_dir(name), CURRENT_FILE_NAME)) as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        raise ArtifactError(f"The artifact does not exist: name={name}")
+
+
+class StringTable:
+    """Class that represents read-only table of strings stored as offsets and bytes."""
+
+    def __init__(self, offsets, data):
+        """Initialize table with strings offsets and utf-8 bytes."""
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        """Return count of strings."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        """Return string by its row."""
+        return bytes(self.data[self.offsets[row]:self.offsets[row + 1]]).decode()
+
+
+class IdTable:
+    """Class that represents read-only mapping between external ids and rows."""
+
+    def __init__(self, ids, sorted_ids, sorted_rows):
+        """Initialize table with ids by rows and sorted ids with their rows."""
+        self.ids = ids
+        self.sorted_ids = sorted_ids
+        self.sorted_rows = sorted_rows
+
+    def __len__(self):
+        """Return count of ids."""
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        """Return external id by its row."""
+        return self.ids[row].decode()
+
+    def __contains__(self, external_id):
+        """Return whether external id is in the table."""
+        return self.get_row(external_id) is not None
+
+    def get_row(self, external_id):
+        """Return row of provided external id or None if it does not exist."""
+        key = external_id.encode()
+        position = int(np.searchsorted(self.sorted_ids, key))
+        if position < len(self.sorted_ids) and self.sorted_ids[position] == key:
+            return int(self.sorted_rows[position])
+
+        return None
+
+
+class Artifact:
+    """Class that represents one read-only version of an artifact."""
+
+    def __init__(self, path, meta):
+        """Initialize artifact with its version directory and metadata."""
+        self.path = path
+        self.meta = meta
+        self.params = meta["params"]
+
+    @classmethod
+    def open(cls, name, version=None):
+        """Open provided or active version of the artifact."""
+        version = version or read_current_version(name)
+        path = os.path.join(get_artifact_dir(name), version)
+        try:
+            with open(os.path.join(path, META_FILE_NAME)) as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            raise ArtifactError(
+                f"The artifact version does not exist: name={name}, version={version}"
+            )
+
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ArtifactError(
+                f"Unsupported artifact format: name={name}, format={meta['format_version']}"
+            )
+
+        return cls(path, meta)
+
+    @property
+    def version(self):
+        """Return version of the artifact."""
+        return self.meta["version"]
+
+    def array(self, name):
+        """Return memory-mapped array."""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def strings(self, name):
+        """Return memory-mapped table of strings."""
+        return StringTable(
+            offsets=self.array(name + STRINGS_OFFSETS_SUFFIX),
+            data=self.array(name + STRINGS_DATA_SUFFIX),
+        )
+
+    def ids(self, name):
+        """Return memory-mapped table of external ids."""
+        return IdTable(
+            ids=self.array(name),
+            sorted_ids=self.array(name + IDS_SORTED_SUFFIX),
+            sorted_rows=self.array(name + IDS_SORTED_ROWS_SUFFIX),
+        )
+
+
+class ArtifactWriter:
+    """Class that writes new version of an artifact and activates it."""
+
+    def __init__(self, name):
+        """Initialize writer of the new artifact version in temporary directory."""
+        self.name = name
+        self.version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        self.artifact_dir = get_artifact_dir(name)
+        self.path = os.path.join(self.artifact_dir, TEMPORARY_PREFIX + self.version)
+        self.arrays = []
+        os.makedirs(self.path)
+
+    def add_array(self, name, array):
+        """Write fixed-width array."""
+        np.save(os.path.join(self.path, f"{name}.npy"), np.ascontiguousarray(array))
+        self.arrays.append(name)
+
+    def add_strings(self, name, strings):
+        """Write strings as offsets and utf-8 bytes."""
+        encoded = [string.encode() for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        self.add_array(name + STRINGS_OFFSETS_SUFFIX, offsets)
+        self.add_array(
+            name + STRINGS_DATA_SUFFIX, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        )
+
+    def add_ids(self, name, ids):
+        """Write external ids by rows and their sorted copy for lookups."""
+        ids = np.array([external_id.encode() for external_id in ids], dtype=np.bytes_)
+        sorted_rows = np.argsort(ids, kind="stable").astype(np.int64)
+        self.add_array(name, ids)
+        self.add_array(name + IDS_SORTED_SUFFIX, ids[sorted_rows])
+        self.add_array(name + IDS_SORTED_ROWS_SUFFIX, sorted_rows)
+
+    def publish(self, params=None):
+        """Atomically activate written version and prune outdated versions."""
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "name": self.name,
+            "version": self.version,
+            "created_at": int(time.time() * 1000),
+            "arrays": self.arrays,
+            "params": params or {},
+        }
+        with open(os.path.join(self.path, META_FILE_NAME), "w") as file:
+            json.dump(meta, file)
+
+        os.rename(self.path, os.path.join(self.artifact_dir, self.version))
+
+        current_path = os.path.join(self.artifact_dir, CURRENT_FILE_NAME)
+        temporary_current_path = os.path.join(
+            self.artifact_dir, TEMPORARY_PREFIX + CURRENT_FILE_NAME
+        )
+        with open(temporary_current_path, "w") as file:
+            file.write(self.version)
+        os.replace(temporary_current_path, current_path)
+
+        self.prune()
+        return self.version
+
+    def prune(self):
+        """Remove all versions except a few latest ones."""
+        versions = sorted(
+            version for version in os.listdir(self.artifact_dir)
+            if version not in (CURRENT_FILE_NAME, TEMPORARY_PREFIX + CURRENT_FILE_NAME)
+            and not version.startswith(TEMPORARY_PREFIX)
+        )
+        for version in versions[:-APP_CONFIG.ARTIFACTS_KEEP_VERSIONS]:
+            shutil.rmtree(os.path.join(self.artifact_dir, version), ignore_errors=True)
+
+
+class ArtifactStore:
+    """Class that keeps object loaded from the active artifact version.
+
+    Active version is rechecked at most once per ARTIFACTS_CHECK_INTERVAL
+    seconds, so a published version is swapped in without restarting workers.
+    """
+
+    def __init__(self, name, loader):
+        """Initialize store with artifact name and function that loads object from artifact."""
+        self.name = name
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+        self._checked_at = None
+
+    def get(self):
+        """Return object loaded from the active artifact version."""
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if checked_at is not None and now - checked_at < APP_CONFIG.ARTIFACTS_CHECK_INTERVAL:
+            return self._value
+
+        with self._lock:
+            if self._checked_at == checked_at:
+                version = read_current_version(self.name)
+                if version != self._version:
+                    self._value = self.loader(Artifact.open(self.name, version))
+                    self._version = version
+                self._checked_at = now
+
+        return self._value
+
+    def get_version(self):
+        """Return version of the artifact the object returned by get was loaded from."""
+        self.get()
+        return self._version
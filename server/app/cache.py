@@ -0,0 +1,209 @@
+"""This module includes bounded cache of ranked recommendation lists."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app import APP_CONFIG
+from app.constants import (
+    MEMORY_CACHE_BACKEND,
+    SQLITE_CACHE_BACKEND,
+    COLLABORATIVE_ALGORITHM,
+    CONTENT_BASED_ALGORITHM,
+)
+
+
+USER_ALGORITHMS = (COLLABORATIVE_ALGORITHM, CONTENT_BASED_ALGORITHM)
+
+
+class MemoryCacheBackend:
+    """Class that represents in-process LRU cache with expiration."""
+
+    def __init__(self, max_size, ttl):
+        """Initialize cache with max count of entries and their time to live in seconds."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return cached value or None if it is missed or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Cache value and evict the least recently used entries above max size."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class SqliteCacheBackend:
+    """Class that represents LRU cache with expiration in local sqlite file.
+
+    The file is shared by all worker processes on the host, so invalidation in
+    one worker is visible to the others.
+    """
+
+    def __init__(self, path, max_size, ttl):
+        """Initialize cache file, max count of entries and their time to live in seconds."""
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return sqlite connection of current thread, opening it on first use in the thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT, expires_at REAL, accessed_at REAL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+            )
+            self._local.connection = connection
+
+        return connection
+
+    def get(self, key):
+        """Return cached value or None if it is missed or expired."""
+        connection = self._connect()
+        now = time.time()
+        row = connection.execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at >= ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+
+        connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Cache value and evict expired and the least recently used entries."""
+        connection = self._connect()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl, now),
+        )
+        connection.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        connection.execute(
+            "DELETE FROM cache WHERE key IN "
+            "(SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+
+class RecommendationCache:
+    """Class that caches ranked recommendation lists by algorithm and user or movie.
+
+    Keys of lists include version of their algorithm and subject, which invalidation
+    replaces instead of deleting the lists. So a list computed before invalidation is
+    cached under the outdated version and is never read. Keys also include version
+    of catalogue and artifacts the lists are computed from, so lists computed before
+    their rebuild are never read either.
+    """
+
+    def __init__(self, backend, depth):
+        """Initialize cache with backend and count of items kept in every cached list."""
+        self.backend = backend
+        self.depth = depth
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_version_key(algorithm, subject_id):
+        """Return cache key of version of algorithm results for user or movie."""
+        return f"version:{algorithm}:{subject_id}"
+
+    def make_key(self, algorithm, subject_id, data_version):
+        """Return cache key of current version of algorithm results for user or movie."""
+        version = self.backend.get(self.make_version_key(algorithm, subject_id))
+        return f"{algorithm}:{subject_id}:{version or 0}:{data_version}"
+
+    def _count(self, hit):
+        """Increase hits or misses counter."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    async def get_ranked(self, algorithm, subject_id, data_version, compute):
+        """Return cached ranked list or await its computation with cache depth and cache it."""
+        key = self.make_key(algorithm, subject_id, data_version) if self.backend else None
+        ranked = self.backend.get(key) if self.backend else None
+        self._count(hit=ranked is not None)
+        if ranked is None:
+            ranked = await compute(self.depth)
+            if self.backend:
+                self.backend.set(key, ranked)
+
+        return ranked
+
+    async def get_or_compute(self, algorithm, subject_id, data_version, limit, compute):
+        """Return top limit items of cached list, computing limit directly if it exceeds depth."""
+        if limit > self.depth:
+            return await compute(limit)
+
+        return (await self.get_ranked(algorithm, subject_id, data_version, compute))[:limit]
+
+    def invalidate(self, subject_id, algorithms=USER_ALGORITHMS):
+        """Replace versions of cached lists of provided user or movie."""
+        if self.backend:
+            version = time.time_ns()
+            for algorithm in algorithms:
+                self.backend.set(self.make_version_key(algorithm, subject_id), version)
+
+    def stats(self):
+        """Return hits and misses counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_recommendation_cache():
+    """Return recommendation cache with configured backend."""
+    backend = None
+    if APP_CONFIG.RECOMMENDATION_CACHE_BACKEND == MEMORY_CACHE_BACKEND:
+        backend = MemoryCacheBackend(
+            max_size=APP_CONFIG.RECOMMENDATION_CACHE_SIZE,
+            ttl=APP_CONFIG.RECOMMENDATION_CACHE_TTL,
+        )
+    elif APP_CONFIG.RECOMMENDATION_CACHE_BACKEND == SQLITE_CACHE_BACKEND:
+        backend = SqliteCacheBackend(
+            path=APP_CONFIG.RECOMMENDATION_CACHE_PATH,
+            max_size=APP_CONFIG.RECOMMENDATION_CACHE_SIZE,
+            ttl=APP_CONFIG.RECOMMENDATION_CACHE_TTL,
+        )
+
+    return RecommendationCache(backend, depth=APP_CONFIG.RECOMMENDATION_CACHE_DEPTH)
+
+
+RECOMMENDATION_CACHE = create_recommendation_cache()
+
+
+MOVIE_CACHE = MemoryCacheBackend(
+    max_size=APP_CONFIG.MOVIE_CACHE_SIZE,
+    ttl=APP_CONFIG.MOVIE_CACHE_TTL,
+)
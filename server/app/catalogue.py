@@ -0,0 +1,42 @@
+"""This module includes version of the loaded movies catalogue."""
+
+import os
+import threading
+import time
+
+from app import APP_CONFIG
+
+
+DEFAULT_CATALOGUE_VERSION = "0"
+
+_LOCK = threading.Lock()
+_CACHED_VERSION = {"mtime": None, "version": DEFAULT_CATALOGUE_VERSION}
+
+
+def get_catalogue_version():
+    """Return version of the loaded catalogue, rereading version file only when it changes."""
+    try:
+        mtime = os.stat(APP_CONFIG.CATALOGUE_VERSION_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return DEFAULT_CATALOGUE_VERSION
+
+    if mtime != _CACHED_VERSION["mtime"]:
+        with _LOCK:
+            with open(APP_CONFIG.CATALOGUE_VERSION_PATH) as file:
+                _CACHED_VERSION["version"] = file.read().strip() or DEFAULT_CATALOGUE_VERSION
+            _CACHED_VERSION["mtime"] = mtime
+
+    return _CACHED_VERSION["version"]
+
+
+def bump_catalogue_version():
+    """Atomically write new catalogue version after catalogue was reloaded."""
+    version = str(time.time_ns())
+    path = APP_CONFIG.CATALOGUE_VERSION_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as file:
+        file.write(version)
+    os.replace(temporary_path, path)
+
+    return version
@@ -0,0 +1,118 @@
+"""This module includes coalescing of identical in-flight backend calls."""
+
+import asyncio
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from app.utils.coroutines import has_running_loop, run_sync
+
+
+class InFlightCall:
+    """Class that represents backend call shared by concurrent callers."""
+
+    def __init__(self):
+        """Initialize call without result."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Class that shares result of backend call with callers of the same key arriving meanwhile.
+
+    Results are not kept after the call completes, so callers never get stale data.
+    """
+
+    def __init__(self):
+        """Initialize registries of in-flight calls and their counters."""
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"calls": 0, "coalesced": 0})
+
+    def _count(self, group, coalesced):
+        """Increase calls or coalesced calls counter of group."""
+        self._counters[group]["coalesced" if coalesced else "calls"] += 1
+
+    def do(self, group, key, function):
+        """Return result of function, joining in-flight call with the same group and key."""
+        with self._lock:
+            call = self._calls.get((group, key))
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[(group, key)] = InFlightCall()
+            self._count(group, coalesced=not is_leader)
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[(group, key)]
+            call.done.set()
+
+        return call.result
+
+    async def do_async(self, group, key, function):
+        """Return awaited result of function, joining in-flight call with the same group and key.
+
+        The call runs in its own task awaited through shield, so cancelled caller, the
+        first one included, does not cancel the call for the others.
+        """
+        task = self._tasks.get((group, key))
+        with self._lock:
+            self._count(group, coalesced=task is not None)
+
+        if task is None:
+            task = self._tasks[(group, key)] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self._complete(group, key, done))
+
+        return await asyncio.shield(task)
+
+    def _complete(self, group, key, task):
+        """Forget completed call task and retrieve its error in case every caller was cancelled."""
+        if self._tasks.get((group, key)) is task:
+            del self._tasks[(group, key)]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """Return calls and coalesced calls counters by group."""
+        with self._lock:
+            return {group: dict(counters) for group, counters in self._counters.items()}
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def coalesced(group):
+    """Share result of decorated coroutine classmethod between concurrent identical calls.
+
+    In event loop the call is shared with coroutines of the loop, otherwise the coroutine
+    runs over sync backends and the call is shared with concurrent threads.
+    """
+
+    def decorator(method):
+        """Wrap coroutine method with single flight call keyed by its arguments."""
+
+        @wraps(method)
+        async def decorated_method(*args, **kwargs):
+            """Return method result shared with concurrent identical calls."""
+            key = args[1:], tuple(sorted(kwargs.items()))
+            if has_running_loop():
+                return await SINGLE_FLIGHT.do_async(group, key, lambda: method(*args, **kwargs))
+
+            return SINGLE_FLIGHT.do(group, key, lambda: run_sync(method(*args, **kwargs)))
+
+        return decorated_method
+
+    return decorator
@@ -7,6 +7,7 @@ APP_NAME = "peliculas"
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.abspath(os.path.join(APP_DIR, os.pardir))
 STATIC_DIR = os.path.join(ROOT_DIR, "static")
+ARTIFACTS_DIR = os.path.join(ROOT_DIR, "artifacts")
 IMDB_DIR = os.path.join(ROOT_DIR, "imdb")
 
 PRODUCTION_KEY = "production"
@@ -22,3 +23,46 @@ EXTERNAL_ID_FIELD = "external_id"
 DESCRIPTION_FIELD = "description"
 ORIGINAL_TITLE_FIELD = "original_title"
 TITLE_FIELD = "title"
+TITLE_PREFIX_FIELD = "title.prefix"
+LIKED_TIMESTAMP_FIELD = "liked_timestamp"
+
+# Similar movies scoring modes
+WEIGHTED_SCORING = "weighted"
+IDF_SCORING = "idf"
+
+# Recommendation backends
+CYPHER_BACKEND = "cypher"
+MATERIALIZED_BACKEND = "materialized"
+MATRIX_BACKEND = "matrix"
+CO_LIKED_BACKEND = "co_liked"
+FACTORS_BACKEND = "factors"
+
+# Count of the most recent user likes used for recommendations
+RECENT_LIKED_MOVIES_COUNT = 10
+
+# Recommendation algorithms
+COLLABORATIVE_ALGORITHM = "collaborative"
+CONTENT_BASED_ALGORITHM = "content-based"
+SIMILAR_ALGORITHM = "similar"
+
+# Search backends
+ES_SEARCH_BACKEND = "es"
+EMBEDDED_SEARCH_BACKEND = "embedded"
+
+# Storage backends
+NEO4J_STORAGE_BACKEND = "neo4j"
+MEMORY_STORAGE_BACKEND = "memory"
+
+# Cache backends
+MEMORY_CACHE_BACKEND = "memory"
+SQLITE_CACHE_BACKEND = "sqlite"
+
+# Like operations
+LIKE_ACTION = "like"
+UNLIKE_ACTION = "unlike"
+
+# Coalesced backend calls groups
+MOVIE_CALLS_GROUP = "movie"
+SEARCH_CALLS_GROUP = "search"
+SUGGEST_CALLS_GROUP = "suggest"
+SIMILAR_CALLS_GROUP = "similar"
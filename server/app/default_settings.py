@@ -2,6 +2,8 @@
 
 import os
 
+from app.constants import ARTIFACTS_DIR, IMDB_DIR
+
 
 class BaseConfig:
     """Base configuration includes shared variables."""
@@ -9,6 +11,11 @@ class BaseConfig:
     SERVER_HOST = os.getenv("SERVER_HOST", "localhost")
     SERVER_PORT = os.getenv("SERVER_PORT", 5555)
 
+    # Precomputed artifacts, other artifacts paths default to files in it
+    ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", ARTIFACTS_DIR)
+    ARTIFACTS_KEEP_VERSIONS = int(os.getenv("ARTIFACTS_KEEP_VERSIONS", 2))
+    ARTIFACTS_CHECK_INTERVAL = float(os.getenv("ARTIFACTS_CHECK_INTERVAL", 5))
+
     # Neo4j
     NEO4J_DATABASE_HOST = os.getenv("NEO4J_DATABASE_HOST", "localhost")
     NEO4J_DATABASE_PORT = os.getenv("NEO4J_DATABASE_PORT", "7687")
@@ -17,8 +24,70 @@ class BaseConfig:
     NEO4J_DATABASE_URI = f"neo4j://{NEO4J_DATABASE_HOST}:{NEO4J_DATABASE_PORT}"
     NEO4j_DATABASE_SIZE = 100
 
+    # Storage of movies graph
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "neo4j")
+    LIKE_LOG_PATH = os.getenv("LIKE_LOG_PATH", os.path.join(ARTIFACTS_DIR, "likes.log"))
+
+    # Cypher queries profiling
+    QUERY_PROFILE_SAMPLE_RATE = float(os.getenv("QUERY_PROFILE_SAMPLE_RATE", 0))
+    SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD", 1))
+    QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH", os.path.join(ARTIFACTS_DIR, "queries.log"))
+    QUERY_LOG_MAX_BYTES = int(os.getenv("QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024))
+    QUERY_LOG_BACKUP_COUNT = int(os.getenv("QUERY_LOG_BACKUP_COUNT", 5))
+
+    # Similar movies
+    SIMILAR_MOVIES_SCORING = os.getenv("SIMILAR_MOVIES_SCORING", "weighted")
+    SIMILAR_MOVIES_MAX_DEGREE = int(os.getenv("SIMILAR_MOVIES_MAX_DEGREE", 5000))
+    SIMILAR_MOVIES_BACKEND = os.getenv("SIMILAR_MOVIES_BACKEND", "cypher")
+    SIMILAR_MOVIES_TOP_N = int(os.getenv("SIMILAR_MOVIES_TOP_N", 50))
+
+    # Content-based recommendations
+    CONTENT_BASED_BACKEND = os.getenv("CONTENT_BASED_BACKEND", "cypher")
+
+    # Collaborative recommendations
+    COLLABORATIVE_BACKEND = os.getenv("COLLABORATIVE_BACKEND", "cypher")
+
+    # Likes
+    LIKE_BULK_MAX_SIZE = int(os.getenv("LIKE_BULK_MAX_SIZE", 1000))
+    LIKE_BUFFER_ENABLED = os.getenv("LIKE_BUFFER_ENABLED", "false").lower() == "true"
+    LIKE_BUFFER_SIZE = int(os.getenv("LIKE_BUFFER_SIZE", 500))
+    LIKE_BUFFER_INTERVAL = float(os.getenv("LIKE_BUFFER_INTERVAL", 1))
+    LIKE_BUFFER_MAX_RETRIES = int(os.getenv("LIKE_BUFFER_MAX_RETRIES", 5))
+    LIKE_BUFFER_RETRY_BACKOFF = float(os.getenv("LIKE_BUFFER_RETRY_BACKOFF", 1))
+    LIKE_DEAD_LETTER_PATH = os.getenv(
+        "LIKE_DEAD_LETTER_PATH", os.path.join(ARTIFACTS_DIR, "likes.dead_letter.log")
+    )
+
+    # Recommendations cache
+    RECOMMENDATION_CACHE_BACKEND = os.getenv("RECOMMENDATION_CACHE_BACKEND", "memory")
+    RECOMMENDATION_CACHE_PATH = os.getenv(
+        "RECOMMENDATION_CACHE_PATH", os.path.join(ARTIFACTS_DIR, "recommendations.sqlite")
+    )
+    RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", 10000))
+    RECOMMENDATION_CACHE_TTL = int(os.getenv("RECOMMENDATION_CACHE_TTL", 300))
+    RECOMMENDATION_CACHE_DEPTH = int(os.getenv("RECOMMENDATION_CACHE_DEPTH", 100))
+
+    # Movies cache
+    MOVIE_CACHE_SIZE = int(os.getenv("MOVIE_CACHE_SIZE", 10000))
+    MOVIE_CACHE_TTL = int(os.getenv("MOVIE_CACHE_TTL", 86400))
+    MOVIE_BATCH_MAX_SIZE = int(os.getenv("MOVIE_BATCH_MAX_SIZE", 100))
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 300))
+    CATALOGUE_VERSION_PATH = os.getenv(
+        "CATALOGUE_VERSION_PATH", os.path.join(ARTIFACTS_DIR, "catalogue_version")
+    )
+
+    # IMDB dataset
+    IMDB_CSV_PATH = os.getenv("IMDB_CSV_PATH", os.path.join(IMDB_DIR, "imdb.csv"))
+
+    # Search
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "es")
+    SUGGEST_TIMEOUT = float(os.getenv("SUGGEST_TIMEOUT", 0.05))
+    SUGGEST_MAX_LIMIT = int(os.getenv("SUGGEST_MAX_LIMIT", 10))
+
     # ElasticSearch
-    ES_DATABASE_MOVIE_INDEX = "movie-index"
+    ES_DATABASE_MOVIE_INDEX = os.getenv("ES_DATABASE_MOVIE_INDEX", "movie-index")
+    ES_MOVIE_INDEX_REPLICAS = int(os.getenv("ES_MOVIE_INDEX_REPLICAS", 1))
+    ES_MOVIE_INDEX_KEEP_VERSIONS = int(os.getenv("ES_MOVIE_INDEX_KEEP_VERSIONS", 2))
     ES_DATABASE_HOST = os.getenv("ES_DATABASE_HOST", "localhost")
     ES_DATABASE_PORT = os.getenv("ES_DATABASE_PORT", 9200)
     ES_DATABASE_USER = os.getenv("ES_DATABASE_USER", "peliculas")
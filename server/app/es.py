@@ -2,10 +2,14 @@
 
 
 from app import ES_DRIVER
+from app.metrics import METRICS, BACKEND_DURATION_METRIC, ES_BACKEND, observe_rows
 
 
 QUERY_FIELD = "query"
 MULTI_MATCH_FIELD = "multi_match"
+MATCH_FIELD = "match"
+OPERATOR_FIELD = "operator"
+TRACK_TOTAL_HITS_FIELD = "track_total_hits"
 FIELDS_FIELD = "fields"
 SOURCE_FIELD = "_source"
 HITS_FIELD = "hits"
@@ -38,8 +42,51 @@ class ElasticSearchDriver:
 
         return query
 
+    @staticmethod
+    def format_prefix_query(query, field, projection=None):
+        """Return formatted match query requiring every term in edge n-grams field."""
+        query = {
+            QUERY_FIELD: {
+                MATCH_FIELD: {
+                    field: {
+                        QUERY_FIELD: query,
+                        OPERATOR_FIELD: "and",
+                    }
+                }
+            },
+            TRACK_TOTAL_HITS_FIELD: False,
+        }
+
+        if projection:
+            query[SOURCE_FIELD] = projection
+
+        return query
+
+    @staticmethod
+    def get_search_params(timeout):
+        """Return client params of search, request timeout in seconds if provided."""
+        return {} if timeout is None else {"request_timeout": timeout}
+
+    @staticmethod
+    def time_search(index):
+        """Return timer of search request to index."""
+        return METRICS.timer(
+            BACKEND_DURATION_METRIC, backend=ES_BACKEND, operation="search", query=index
+        )
+
+    @classmethod
+    def format_results(cls, result, index):
+        """Observe count of found movies and return formatted response."""
+        movies = cls.format_response(result)
+        observe_rows(ES_BACKEND, index, len(movies))
+        return movies
+
     @classmethod
-    def search(cls, query, index, limit):
+    def search(cls, query, index, limit, timeout=None):
         """Get search results and format response."""
-        result = cls.driver.search(body=query, index=index, size=limit)
-        return cls.format_response(result)
+        with cls.time_search(index):
+            result = cls.driver.search(
+                body=query, index=index, size=limit, **cls.get_search_params(timeout)
+            )
+
+        return cls.format_results(result, index)
@@ -28,3 +28,15 @@ class DBNoResultFoundError(DatabaseError):
 
 class TokenError(BaseError):
     """Class that represents errors caused on interaction with auth token."""
+
+
+class ValidationError(BaseError):
+    """Class that represents errors caused on wrong request body."""
+
+
+class PaginationError(BaseError):
+    """Class that represents errors caused on wrong pagination params."""
+
+
+class ArtifactError(BaseError):
+    """Class that represents errors caused on reading precomputed artifacts."""
@@ -0,0 +1,133 @@
+"""This module includes matrix factorization model for collaborative recommendations."""
+
+import logging
+
+import numpy as np
+
+from app.artifacts import ArtifactStore
+from app.constants import (
+    EXTERNAL_ID_FIELD,
+    TITLE_FIELD,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+FACTORS_ARTIFACT_NAME = "factors"
+USER_LIKES_COUNTS_ARRAY = "user_likes_counts"
+SCORE_FIELD = "score"
+
+
+def solve_factors(factors, gram, liked_rows, regularization, alpha):
+    """Return implicit ALS factors for every list of liked rows of the other side.
+
+    Each factor solves (YtY + alpha * Yu'Yu + regularization * I) x = (1 + alpha) * sum(Yu),
+    where Yu are factors of liked rows and YtY is precomputed gram matrix of all factors.
+    """
+    factors_count = factors.shape[1]
+    matrices = np.repeat(
+        (gram + regularization * np.eye(factors_count))[np.newaxis], len(liked_rows), axis=0
+    )
+    vectors = np.zeros((len(liked_rows), factors_count))
+    for index, rows in enumerate(liked_rows):
+        liked_factors = factors[rows]
+        matrices[index] += alpha * liked_factors.T @ liked_factors
+        vectors[index] = (1 + alpha) * liked_factors.sum(axis=0)
+
+    return np.linalg.solve(matrices, vectors[..., np.newaxis])[..., 0]
+
+
+class FactorsModel:
+    """Class that represents trained users and items factors."""
+
+    def __init__(self, user_ids, item_ids, titles, user_factors, item_factors, item_gram, params,
+                 user_likes_counts=None):
+        """Initialize model with factors, counts of users likes and parameters of training."""
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+        self.titles = titles
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.item_gram = item_gram
+        self.user_likes_counts = user_likes_counts
+        self.trained_at = int(params["trained_at"])
+        self.regularization = float(params["regularization"])
+        self.alpha = float(params["alpha"])
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        """Load model from memory-mapped artifact published by trainer."""
+        return cls(
+            user_ids=artifact.ids("user_ids"),
+            item_ids=artifact.ids("item_ids"),
+            titles=artifact.strings("titles"),
+            user_factors=artifact.array("user_factors"),
+            item_factors=artifact.array("item_factors"),
+            item_gram=artifact.array("item_gram"),
+            params=artifact.params,
+            user_likes_counts=(
+                artifact.array(USER_LIKES_COUNTS_ARRAY)
+                if USER_LIKES_COUNTS_ARRAY in artifact.meta["arrays"] else None
+            ),
+        )
+
+    def is_trained_user(self, row, liked_rows, last_liked_at):
+        """Return whether user likes are the ones factors were trained with.
+
+        A like after training is detected by its timestamp and an unlike by count of
+        likes, which differs from the trained one unless a later like was added too.
+        Artifacts without likes counts can't detect unlikes, so users are folded in.
+        """
+        return (
+            last_liked_at <= self.trained_at
+            and self.user_likes_counts is not None
+            and len(set(liked_rows)) == self.user_likes_counts[row]
+        )
+
+    def get_user_factors(self, user_id, liked_rows, last_liked_at):
+        """Return trained user factors or fold in users who liked or unliked after training."""
+        row = self.user_ids.get_row(user_id)
+        if row is not None and self.is_trained_user(row, liked_rows, last_liked_at):
+            return self.user_factors[row]
+
+        return solve_factors(
+            self.item_factors, self.item_gram, [liked_rows], self.regularization, self.alpha
+        )[0]
+
+    def get_recommendations(self, user_id, likes, limit):
+        """Return the highest scored movies not liked by user.
+
+        Likes are (external_id, liked_timestamp) pairs of all user's likes.
+        """
+        liked_rows = [self.item_ids.get_row(item_id) for item_id, _ in likes]
+        liked_rows = [row for row in liked_rows if row is not None]
+        if not liked_rows or limit <= 0:
+            return []
+
+        last_liked_at = max(liked_at or 0 for _, liked_at in likes)
+        user_factors = self.get_user_factors(user_id, liked_rows, last_liked_at)
+        scores = self.item_factors @ user_factors
+        scores[liked_rows] = -np.inf
+
+        limit = min(limit, len(scores) - len(set(liked_rows)))
+        if limit <= 0:
+            return []
+
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {
+                EXTERNAL_ID_FIELD: self.item_ids[row],
+                TITLE_FIELD: self.titles[row],
+                SCORE_FIELD: float(scores[row]),
+            }
+            for row in top
+        ]
+
+
+FACTORS_MODEL_STORE = ArtifactStore(FACTORS_ARTIFACT_NAME, FactorsModel.from_artifact)
+
+
+def get_factors_model():
+    """Return factors model from the active artifact trained by data/als.py."""
+    return FACTORS_MODEL_STORE.get()
@@ -0,0 +1,404 @@
+"""This module includes in-process movies graph storage backend built from imdb csv."""
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from app.constants import (
+    EXTERNAL_ID_FIELD,
+    TITLE_FIELD,
+    LIKED_TIMESTAMP_FIELD,
+    IDF_SCORING,
+    LIKE_ACTION,
+    UNLIKE_ACTION,
+    RECENT_LIKED_MOVIES_COUNT,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+SCORE_FIELD = "score"
+USER_EXTERNAL_ID_FIELD = "user_external_id"
+MOVIE_EXTERNAL_ID_FIELD = "movie_external_id"
+
+IMDB_TITLE_ID_FIELD = "imdb_title_id"
+IMDB_LIST_SEPARATOR = ", "
+
+# Movie field, imdb csv field and similarity weight of every relationship kind
+RELATIONSHIP_KINDS = (
+    ("actors", "actors", 1.5),
+    ("writers", "writer", 2),
+    ("directors", "director", 2),
+    ("production_companies", "production_company", 2),
+    ("genres", "genre", 3),
+    ("countries", "country", 1),
+)
+
+
+def make_csr(rows_values, rows_count):
+    """Return indptr and indices arrays of adjacency lists of provided rows."""
+    indptr = np.zeros(rows_count + 1, dtype=np.int64)
+    for row, values in rows_values.items():
+        indptr[row + 1] = len(values)
+    np.cumsum(indptr, out=indptr)
+
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    for row, values in rows_values.items():
+        indices[indptr[row]:indptr[row + 1]] = values
+
+    return indptr, indices
+
+
+def gather(indptr, indices, rows):
+    """Return concatenated adjacency lists of provided rows and their lengths."""
+    lengths = indptr[rows + 1] - indptr[rows]
+    if not len(rows):
+        return indices[:0], lengths
+
+    return np.concatenate([indices[indptr[row]:indptr[row + 1]] for row in rows]), lengths
+
+
+def format_like_log(operations):
+    """Return like operations as lines of like log."""
+    return "".join(json.dumps(operation) + "\n" for operation in operations)
+
+
+class MemoryStorageBackend:
+    """Class that represents movies graph held in process memory.
+
+    Movies and entities are addressed by integer rows and their relationships are
+    stored as array-backed adjacency lists in both directions. Likes are kept in
+    dicts and every like operation is appended to a like log, which is replayed
+    when the graph is built. Worker processes share the like log, so operations
+    appended by other workers are replayed before likes are read or written.
+    """
+
+    def __init__(self, external_ids, titles, entity_names, entity_kinds,
+                 movie_entities, like_log_path=None):
+        """Initialize graph with movies, entities and relationships of every movie."""
+        self.external_ids = external_ids
+        self.titles = titles
+        self.movie_rows = {external_id: row for row, external_id in enumerate(external_ids)}
+        self.entity_names = entity_names
+        self.entity_kinds = np.asarray(entity_kinds, dtype=np.int8)
+        self.kind_weights = np.array([weight for _, _, weight in RELATIONSHIP_KINDS])
+
+        self.movie_indptr, self.movie_entities = make_csr(movie_entities, len(external_ids))
+        entity_movies = defaultdict(list)
+        for movie_row, entity_rows in movie_entities.items():
+            for entity_row in entity_rows:
+                entity_movies[entity_row].append(movie_row)
+        self.entity_indptr, self.entity_movies = make_csr(entity_movies, len(entity_names))
+        self.entity_degrees = np.diff(self.entity_indptr)
+
+        self.user_likes = defaultdict(dict)
+        self.movie_likers = defaultdict(set)
+        self.like_log_path = like_log_path
+        self._lock = threading.Lock()
+        self._last_at = 0
+        self._log_offset = 0
+
+    @classmethod
+    def from_csv(cls, csv_path, like_log_path=None):
+        """Build graph from imdb csv and replay like log."""
+        started_at = time.perf_counter()
+        with open(csv_path, newline="") as file:
+            lines = {line[IMDB_TITLE_ID_FIELD]: line for line in csv.DictReader(file)}
+
+        external_ids, titles, movie_entities = [], [], {}
+        entity_rows, entity_names, entity_kinds = {}, [], []
+        for movie_row, line in enumerate(lines.values()):
+            external_ids.append(line[IMDB_TITLE_ID_FIELD])
+            titles.append(line[TITLE_FIELD])
+            movie_entities[movie_row] = []
+            for kind, (_, csv_field, _) in enumerate(RELATIONSHIP_KINDS):
+                names = (line[csv_field] or "").split(IMDB_LIST_SEPARATOR)
+                for name in dict.fromkeys(name for name in names if name):
+                    if (kind, name) not in entity_rows:
+                        entity_rows[(kind, name)] = len(entity_names)
+                        entity_names.append(name)
+                        entity_kinds.append(kind)
+                    movie_entities[movie_row].append(entity_rows[(kind, name)])
+
+        graph = cls(
+            external_ids, titles, entity_names, entity_kinds, movie_entities, like_log_path
+        )
+        likes_count = graph.replay_like_log() if like_log_path else 0
+        LOGGER.info(
+            "Built in-memory graph of %s movies, %s entities and %s likes in %.2fs.",
+            len(external_ids), len(entity_names), likes_count, time.perf_counter() - started_at
+        )
+        return graph
+
+    def replay_like_log(self):
+        """Apply like operations appended to like log since previous replay, return their count."""
+        with self._lock:
+            return self._replay_like_log()
+
+    def _replay_like_log(self):
+        """Apply new complete lines of like log, it is called with the lock held."""
+        if not self.like_log_path:
+            return 0
+
+        try:
+            if os.stat(self.like_log_path).st_size <= self._log_offset:
+                return 0
+
+            with open(self.like_log_path, "rb") as file:
+                file.seek(self._log_offset)
+                data = file.read()
+        except FileNotFoundError:
+            return 0
+
+        data = data[:data.rfind(b"\n") + 1]
+        self._log_offset += len(data)
+        operations = [json.loads(line) for line in data.splitlines() if line.strip()]
+        for operation in operations:
+            movie_row = self.movie_rows.get(operation[MOVIE_EXTERNAL_ID_FIELD])
+            if movie_row is None:
+                continue
+
+            if operation["action"] == LIKE_ACTION:
+                self._like(operation[USER_EXTERNAL_ID_FIELD], movie_row, operation["at"])
+            else:
+                self._unlike(operation[USER_EXTERNAL_ID_FIELD], movie_row)
+
+        return len(operations)
+
+    def _log(self, operations):
+        """Append like operations to like log, skipping them on replay unless others wrote."""
+        if not self.like_log_path or not operations:
+            return
+
+        data = format_like_log(operations).encode()
+        os.makedirs(os.path.dirname(os.path.abspath(self.like_log_path)), exist_ok=True)
+        with open(self.like_log_path, "ab") as file:
+            file.write(data)
+            end = file.tell()
+
+        if end == self._log_offset + len(data):
+            self._log_offset = end
+
+    def _like(self, user_id, movie_row, at):
+        """Create like unless it exists and return its timestamp."""
+        likes = self.user_likes[user_id]
+        if movie_row not in likes:
+            likes[movie_row] = at
+            self.movie_likers[movie_row].add(user_id)
+            self._last_at = max(self._last_at, at)
+
+        return likes[movie_row]
+
+    def _unlike(self, user_id, movie_row):
+        """Delete like if it exists."""
+        if self.user_likes.get(user_id, {}).pop(movie_row, None) is not None:
+            self.movie_likers[movie_row].discard(user_id)
+
+    def _liked_rows(self, user_id):
+        """Return movies rows liked by user, the most recent first."""
+        likes = self.user_likes.get(user_id, {})
+        return sorted(likes, key=likes.get, reverse=True)
+
+    def _movie(self, movie_row):
+        """Return movie with names of its related entities."""
+        movie = {
+            EXTERNAL_ID_FIELD: self.external_ids[movie_row],
+            TITLE_FIELD: self.titles[movie_row],
+        }
+        for field, _, _ in RELATIONSHIP_KINDS:
+            movie[field] = []
+
+        start, end = self.movie_indptr[movie_row], self.movie_indptr[movie_row + 1]
+        for entity_row in self.movie_entities[start:end]:
+            field = RELATIONSHIP_KINDS[self.entity_kinds[entity_row]][0]
+            movie[field].append(self.entity_names[entity_row])
+
+        return movie
+
+    def _score_shared_entities(self, movie_rows, excluded_rows, limit, scoring=None,
+                               max_degree=None):
+        """Return movies ranked by summed weights of entities shared with provided movies."""
+        entity_rows, _ = gather(self.movie_indptr, self.movie_entities, movie_rows)
+        if scoring == IDF_SCORING:
+            degrees = self.entity_degrees[entity_rows]
+            mask = degrees <= max_degree
+            entity_rows, degrees = entity_rows[mask], degrees[mask]
+            weights = self.kind_weights[self.entity_kinds[entity_rows]] / np.log1p(degrees)
+        else:
+            weights = self.kind_weights[self.entity_kinds[entity_rows]]
+
+        recommended_rows, lengths = gather(self.entity_indptr, self.entity_movies, entity_rows)
+        scores = np.bincount(
+            recommended_rows,
+            weights=np.repeat(weights, lengths),
+            minlength=len(self.external_ids),
+        )
+        scores[list(excluded_rows)] = 0
+        return self._top(scores, limit)
+
+    def _top(self, scores, limit):
+        """Return top movies with positive scores."""
+        rows = np.flatnonzero(scores > 0)
+        if limit <= 0 or not len(rows):
+            return []
+
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+
+        return [
+            {
+                EXTERNAL_ID_FIELD: self.external_ids[row],
+                TITLE_FIELD: self.titles[row],
+                SCORE_FIELD: float(scores[row]),
+            }
+            for row in rows
+        ]
+
+    def create_liked_relationship(self, user_id, movie_id):
+        """Create like of user unless it exists, return created like or empty list."""
+        created = self.apply_like_operations(
+            [{USER_EXTERNAL_ID_FIELD: user_id, MOVIE_EXTERNAL_ID_FIELD: movie_id, "at": None}],
+            [],
+        )
+        return [
+            {LIKED_TIMESTAMP_FIELD: like[LIKED_TIMESTAMP_FIELD], EXTERNAL_ID_FIELD: movie_id}
+            for like in created
+        ]
+
+    def delete_liked_relationship(self, user_id, movie_id):
+        """Delete like of user if it exists."""
+        self.apply_like_operations(
+            [], [{USER_EXTERNAL_ID_FIELD: user_id, MOVIE_EXTERNAL_ID_FIELD: movie_id}]
+        )
+
+    def apply_like_operations(self, likes, unlikes):
+        """Create likes and delete unlikes of existing movies, return created likes."""
+        created, operations = [], []
+        with self._lock:
+            self._replay_like_log()
+            for like in likes:
+                user_id, movie_id = like[USER_EXTERNAL_ID_FIELD], like[MOVIE_EXTERNAL_ID_FIELD]
+                movie_row = self.movie_rows.get(movie_id)
+                if movie_row is None:
+                    continue
+
+                at = like["at"]
+                if at is None:
+                    at = max(int(time.time() * 1000), self._last_at + 1)
+                liked_at = self._like(user_id, movie_row, at)
+                if liked_at == at:
+                    operations.append({**like, "action": LIKE_ACTION, "at": at})
+                created.append({
+                    USER_EXTERNAL_ID_FIELD: user_id,
+                    LIKED_TIMESTAMP_FIELD: liked_at,
+                    EXTERNAL_ID_FIELD: movie_id,
+                })
+
+            for unlike in unlikes:
+                movie_row = self.movie_rows.get(unlike[MOVIE_EXTERNAL_ID_FIELD])
+                if movie_row is not None:
+                    self._unlike(unlike[USER_EXTERNAL_ID_FIELD], movie_row)
+                    operations.append({**unlike, "action": UNLIKE_ACTION})
+
+            self._log(operations)
+
+        return created
+
+    def get_movie(self, movie_id):
+        """Return movie with related entities or None."""
+        movie_row = self.movie_rows.get(movie_id)
+        return None if movie_row is None else self._movie(movie_row)
+
+    def get_movies(self, movie_ids):
+        """Return existing movies with related entities."""
+        return [
+            self._movie(self.movie_rows[movie_id])
+            for movie_id in movie_ids if movie_id in self.movie_rows
+        ]
+
+    def get_user_liked_movies(self, user_id):
+        """Return movies liked by user."""
+        with self._lock:
+            self._replay_like_log()
+            liked_rows = self._liked_rows(user_id)
+
+        return [
+            {EXTERNAL_ID_FIELD: self.external_ids[row], TITLE_FIELD: self.titles[row]}
+            for row in liked_rows
+        ]
+
+    def get_user_likes(self, user_id):
+        """Return external ids and timestamps of user likes, the most recent first."""
+        with self._lock:
+            self._replay_like_log()
+            likes = self.user_likes.get(user_id, {})
+            return [
+                {EXTERNAL_ID_FIELD: self.external_ids[row], LIKED_TIMESTAMP_FIELD: likes[row]}
+                for row in sorted(likes, key=likes.get, reverse=True)
+            ]
+
+    def compute_similar_movies(self, movie_id, limit, scoring=None, max_degree=None):
+        """Return movies with the highest weighted count of shared entities."""
+        movie_row = self.movie_rows.get(movie_id)
+        if movie_row is None:
+            return []
+
+        return self._score_shared_entities(
+            np.array([movie_row]), [movie_row], limit, scoring, max_degree
+        )
+
+    def get_materialized_similar_movies(self, movie_id, limit):
+        """Return similar movies, which are computed on read by in-memory graph."""
+        return self.compute_similar_movies(movie_id, limit)
+
+    def compute_content_based_recommendations(self, user_id, limit):
+        """Return movies sharing the most weighted entities with recently liked movies."""
+        with self._lock:
+            self._replay_like_log()
+            liked_rows = self._liked_rows(user_id)
+
+        recent_rows = np.array(liked_rows[:RECENT_LIKED_MOVIES_COUNT], dtype=np.int64)
+        return self._score_shared_entities(recent_rows, liked_rows, limit)
+
+    def compute_collaborative_recommendations(self, user_id, limit):
+        """Return movies liked by the most users who liked recently liked movies."""
+        with self._lock:
+            self._replay_like_log()
+            liked_rows = self._liked_rows(user_id)
+            similar_users = set().union(
+                *(self.movie_likers[row] for row in liked_rows[:RECENT_LIKED_MOVIES_COUNT])
+            )
+            counts = Counter(
+                row for similar_user in similar_users for row in self.user_likes[similar_user]
+            )
+
+        return self._rank_counts(counts, liked_rows, limit)
+
+    def get_co_liked_recommendations(self, user_id, limit):
+        """Return movies with the highest co-liked counts with recently liked movies."""
+        with self._lock:
+            self._replay_like_log()
+            liked_rows = self._liked_rows(user_id)
+            counts = Counter()
+            for recent_row in liked_rows[:RECENT_LIKED_MOVIES_COUNT]:
+                for liker in self.movie_likers[recent_row]:
+                    counts.update(row for row in self.user_likes[liker] if row != recent_row)
+
+        return self._rank_counts(counts, liked_rows, limit)
+
+    def _rank_counts(self, counts, excluded_rows, limit):
+        """Return movies with the highest counts, except excluded movies."""
+        for row in excluded_rows:
+            counts.pop(row, None)
+
+        return [
+            {EXTERNAL_ID_FIELD: self.external_ids[row], TITLE_FIELD: self.titles[row]}
+            for row, _ in counts.most_common(limit)
+        ]
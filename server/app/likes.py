@@ -0,0 +1,170 @@
+"""This module includes batching of like and unlike operations."""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from app import APP_CONFIG
+from app.constants import LIKE_ACTION
+from app.graph import format_like_log
+from app.models.movie import Movie
+from app.utils.coroutines import run_sync
+
+LOGGER = logging.getLogger(__name__)
+
+
+def current_timestamp():
+    """Return current time in milliseconds as stored in liked relationships."""
+    return int(time.time() * 1000)
+
+
+def collapse_like_operations(operations):
+    """Return likes and unlikes with only the last operation per user and movie.
+
+    Operations are (user_id, movie_id, action, at) tuples in the order they were made.
+    """
+    last_operations = {}
+    for user_id, movie_id, action, at in operations:
+        last_operations.pop((user_id, movie_id), None)
+        last_operations[(user_id, movie_id)] = (action, at)
+
+    likes, unlikes = [], []
+    for (user_id, movie_id), (action, at) in last_operations.items():
+        if action == LIKE_ACTION:
+            likes.append({"user_external_id": user_id, "movie_external_id": movie_id, "at": at})
+        else:
+            unlikes.append({"user_external_id": user_id, "movie_external_id": movie_id})
+
+    return likes, unlikes
+
+
+class LikeBuffer:
+    """Class that queues like operations and writes them to database in batches.
+
+    Batches are flushed by single background thread when max size is reached or
+    every interval seconds, so operations of every user are applied in order.
+    Failed batch is queued back and retried with exponential backoff. After
+    max_retries failed retries, or if the final flush on close fails, it is
+    appended to dead letter log in like log format instead.
+    """
+
+    def __init__(self, apply, max_size, interval, max_retries=0, retry_backoff=0,
+                 dead_letter_path=None):
+        """Initialize buffer with function applying likes and unlikes, batch size and interval."""
+        self.apply = apply
+        self.max_size = max_size
+        self.interval = interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter_path = dead_letter_path
+        self._pending = []
+        self._last_at = 0
+        self._failures = 0
+        self._retry_at = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="like-buffer", daemon=True)
+        self._thread.start()
+
+    def add(self, user_id, movie_id, action, at=None):
+        """Queue like operation and return its timestamp, increasing in order of operations."""
+        with self._lock:
+            at = max(at or current_timestamp(), self._last_at + 1)
+            self._last_at = at
+            self._pending.append((user_id, movie_id, action, at))
+            if len(self._pending) >= self.max_size:
+                self._wakeup.set()
+
+        return at
+
+    def flush(self, final=False):
+        """Apply queued operations in one write transaction."""
+        with self._flush_lock:
+            with self._lock:
+                operations, self._pending = self._pending, []
+
+            if not operations:
+                return
+
+            likes, unlikes = collapse_like_operations(operations)
+            try:
+                self.apply(likes, unlikes)
+            except Exception as err:
+                self._failures += 1
+                LOGGER.error(
+                    "Failed to flush %s like operations, attempt %s. Error: %s",
+                    len(operations), self._failures, err
+                )
+                if final or self._failures > self.max_retries:
+                    self._dead_letter(operations)
+                else:
+                    self._retry_at = (
+                        time.monotonic() + self.retry_backoff * 2 ** (self._failures - 1)
+                    )
+                    with self._lock:
+                        self._pending = operations + self._pending
+                    return
+
+            self._failures = 0
+            self._retry_at = 0
+
+    def _dead_letter(self, operations):
+        """Append operations which failed to apply to dead letter log."""
+        if not self.dead_letter_path:
+            LOGGER.error("Dropped %s like operations: %s", len(operations), operations)
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.dead_letter_path)), exist_ok=True)
+        with open(self.dead_letter_path, "a") as file:
+            file.write(format_like_log(
+                {
+                    "user_external_id": user_id,
+                    "movie_external_id": movie_id,
+                    "action": action,
+                    "at": at,
+                }
+                for user_id, movie_id, action, at in operations
+            ))
+        LOGGER.error(
+            "Wrote %s like operations to dead letter log %s.",
+            len(operations), self.dead_letter_path
+        )
+
+    def _run(self):
+        """Flush operations by size or interval until buffer is closed."""
+        while not self._closed.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if time.monotonic() >= self._retry_at:
+                self.flush()
+
+    def close(self):
+        """Stop background thread and flush remaining operations."""
+        self._closed.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush(final=True)
+
+
+def create_like_buffer():
+    """Return like buffer flushing into database if write-behind mode is enabled."""
+    if not APP_CONFIG.LIKE_BUFFER_ENABLED:
+        return None
+
+    like_buffer = LikeBuffer(
+        lambda likes, unlikes: run_sync(Movie.apply_like_operations(likes, unlikes)),
+        max_size=APP_CONFIG.LIKE_BUFFER_SIZE,
+        interval=APP_CONFIG.LIKE_BUFFER_INTERVAL,
+        max_retries=APP_CONFIG.LIKE_BUFFER_MAX_RETRIES,
+        retry_backoff=APP_CONFIG.LIKE_BUFFER_RETRY_BACKOFF,
+        dead_letter_path=APP_CONFIG.LIKE_DEAD_LETTER_PATH,
+    )
+    atexit.register(like_buffer.close)
+    return like_buffer
+
+
+LIKE_BUFFER = create_like_buffer()
@@ -0,0 +1,218 @@
+"""This module includes in-process metrics rendered in prometheus text format.
+
+Histograms and counters are updated under one lock on the request path, pool gauges
+are computed only when metrics are scraped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from app.utils import cypher_queries
+
+
+REQUEST_DURATION_METRIC = "peliculas_http_request_duration_seconds"
+BACKEND_DURATION_METRIC = "peliculas_backend_duration_seconds"
+BACKEND_ROWS_METRIC = "peliculas_backend_rows"
+SERIALIZE_DURATION_METRIC = "peliculas_serialize_duration_seconds"
+ERRORS_METRIC = "peliculas_errors_total"
+POOL_CONNECTIONS_METRIC = "peliculas_pool_connections"
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+ROWS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+NEO4J_BACKEND = "neo4j"
+ES_BACKEND = "es"
+
+QUERY_NAMES = {
+    query: name for name, query in vars(cypher_queries).items()
+    if name.isupper() and isinstance(query, str)
+}
+UNKNOWN_QUERY_NAME = "UNKNOWN"
+
+
+def get_query_name(query):
+    """Return name of cypher query constant, to be used as metric label."""
+    return QUERY_NAMES.get(query, UNKNOWN_QUERY_NAME)
+
+
+def format_labels(labels):
+    """Return labels in prometheus text format."""
+    if not labels:
+        return ""
+
+    values = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in labels
+    )
+    return f"{{{values}}}"
+
+
+class Histogram:
+    """Class that represents histogram of observed values with fixed buckets."""
+
+    def __init__(self, buckets):
+        """Initialize histogram with upper bounds of buckets."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Add value to the first bucket with upper bound not less than value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        """Return lines of cumulative buckets, sum and count."""
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+
+        lines.append(f"{name}_sum{format_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {self.count}")
+        return lines
+
+
+class Timer:
+    """Class that observes duration of block and counts exceptions raised from it by type."""
+
+    def __init__(self, registry, name, labels):
+        """Initialize timer of histogram with provided labels."""
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.started_at = None
+
+    def __enter__(self):
+        """Start timer."""
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        """Observe duration and count exception of block."""
+        self.registry.observe(self.name, time.perf_counter() - self.started_at, **self.labels)
+        if error_type is not None and issubclass(error_type, Exception):
+            self.registry.increment(ERRORS_METRIC, error=error_type.__name__, **self.labels)
+
+
+class MetricsRegistry:
+    """Class that keeps histograms, counters and gauges of the process."""
+
+    def __init__(self):
+        """Initialize empty registry."""
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(dict)
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._gauges = {}
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """Add value to histogram with provided labels."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = self._histograms[name].get(key)
+            if histogram is None:
+                histogram = self._histograms[name][key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name, value=1, **labels):
+        """Increase counter with provided labels."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._counters[name][key] += value
+
+    def register_gauge(self, name, key, function):
+        """Register function returning (labels, value) pairs of gauge, computed on render."""
+        self._gauges[(name, key)] = function
+
+    def timer(self, name, **labels):
+        """Return context manager observing duration of its block."""
+        return Timer(self, name, labels)
+
+    def render(self):
+        """Return all metrics in prometheus text format."""
+        lines = []
+        with self._lock:
+            for name, histograms in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    lines.extend(histogram.render(name, labels))
+
+            for name, counters in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(counters.items()):
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+
+        gauges = defaultdict(list)
+        for (name, _), function in list(self._gauges.items()):
+            gauges[name].extend(function())
+
+        for name, values in sorted(gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in values:
+                lines.append(f"{name}{format_labels(tuple(sorted(labels.items())))} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def observe_rows(backend, query, count):
+    """Observe count of rows returned by backend query."""
+    METRICS.observe(BACKEND_ROWS_METRIC, count, buckets=ROWS_BUCKETS, backend=backend, query=query)
+
+
+def get_neo4j_pool_connections(driver):
+    """Return counts of in use and idle connections of neo4j driver pools."""
+    counts = {"in_use": 0, "idle": 0}
+    pool = getattr(driver, "_pool", None)
+    if pool is None:
+        return counts
+
+    for connections in list(pool.connections.values()):
+        for connection in list(connections):
+            counts["in_use" if connection.in_use else "idle"] += 1
+
+    return counts
+
+
+def get_es_pool_connections(driver):
+    """Return counts of in use and idle connections of urllib3 pools of es driver."""
+    counts = {"in_use": 0, "idle": 0}
+    for connection in driver.transport.connection_pool.connections:
+        queue = getattr(getattr(connection, "pool", None), "pool", None)
+        if queue is None:
+            continue
+
+        counts["in_use"] += queue.maxsize - queue.qsize()
+        counts["idle"] += sum(pooled is not None for pooled in list(queue.queue))
+
+    return counts
+
+
+def register_pool_gauges(neo4j_driver=None, es_driver=None):
+    """Register gauges of connections pools of provided drivers."""
+    pools = (
+        (NEO4J_BACKEND, neo4j_driver, get_neo4j_pool_connections),
+        (ES_BACKEND, es_driver, get_es_pool_connections),
+    )
+    for backend, driver, get_connections in pools:
+        if driver is None:
+            continue
+
+        METRICS.register_gauge(
+            POOL_CONNECTIONS_METRIC,
+            backend,
+            lambda backend=backend, driver=driver, get_connections=get_connections: [
+                ({"backend": backend, "state": state}, count)
+                for state, count in get_connections(driver).items()
+            ],
+        )
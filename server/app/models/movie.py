@@ -5,44 +5,57 @@ import logging
 from neo4j import exceptions
 from elasticsearch import ElasticsearchException
 
-from app import NEO4J_DRIVER, APP_CONFIG
+from app import APP_CONFIG
+from app.cache import MOVIE_CACHE, RECOMMENDATION_CACHE
+from app.catalogue import get_catalogue_version
+from app.coalescing import coalesced
 from app.es import ElasticSearchDriver
-from app.exceptions import DatabaseError, DBNoResultFoundError
-from app.utils.cypher_queries import (
-    GET_MOVIE,
-    GET_SIMILAR_MOVIES,
-    GET_USER_LIKED_MOVIES,
-    GET_CONTENT_BASED_RECOMMENDATIONS,
-    GET_COLLABORATIVE_RECOMMENDATIONS,
-    CREATE_LIKED_RELATIONSHIP,
-    DELETE_LIKED_RELATIONSHIP,
-)
+from app.factors import FACTORS_MODEL_STORE, get_factors_model
+from app.search import get_search_index
+from app.similarity import SIMILARITY_MATRIX_STORE, get_similarity_matrix
+from app.storage import STORAGE
+from app.utils.coroutines import resolve
+from app.exceptions import ArtifactError, DatabaseError, DBNoResultFoundError
 from app.constants import (
     DESCRIPTION_FIELD,
     TITLE_FIELD,
+    TITLE_PREFIX_FIELD,
     ORIGINAL_TITLE_FIELD,
     EXTERNAL_ID_FIELD,
+    MATERIALIZED_BACKEND,
+    MATRIX_BACKEND,
+    CO_LIKED_BACKEND,
+    FACTORS_BACKEND,
+    EMBEDDED_SEARCH_BACKEND,
+    LIKED_TIMESTAMP_FIELD,
+    RECENT_LIKED_MOVIES_COUNT,
+    COLLABORATIVE_ALGORITHM,
+    CONTENT_BASED_ALGORITHM,
+    SIMILAR_ALGORITHM,
+    MOVIE_CALLS_GROUP,
+    SEARCH_CALLS_GROUP,
+    SUGGEST_CALLS_GROUP,
+    SIMILAR_CALLS_GROUP,
 )
 
 LOGGER = logging.getLogger(__name__)
 
 
 class Movie:
-    """This class includes functionality to work with Movies nodes."""
+    """This class includes functionality to work with Movies nodes.
+
+    Methods are coroutines awaiting storage and es driver calls only if they are
+    awaitable, so with sync backends they never suspend and are run with run_sync.
+    """
 
-    neo4j_driver = NEO4J_DRIVER
+    storage = STORAGE
     es_driver = ElasticSearchDriver
 
     @classmethod
-    def create_liked_relationship(cls, user_id, movie_id):
+    async def create_liked_relationship(cls, user_id, movie_id):
         """Create liked relationship between user and movie."""
         try:
-            with cls.neo4j_driver.session() as session:
-                result = session.run(
-                    CREATE_LIKED_RELATIONSHIP,
-                    user_external_id=user_id,
-                    movie_external_id=movie_id,
-                ).data()
+            result = await resolve(cls.storage.create_liked_relationship(user_id, movie_id))
         except exceptions.Neo4jError as err:
             LOGGER.error(
                 "Failed to create liked relationship between user=%s and movie=%s. Error: %s",
@@ -53,18 +66,14 @@ class Movie:
         if not result:
             raise DBNoResultFoundError(f"The movie does not exist: external_id={movie_id}")
 
+        RECOMMENDATION_CACHE.invalidate(user_id)
         return result
 
     @classmethod
-    def delete_liked_relationship(cls, user_id, movie_id):
+    async def delete_liked_relationship(cls, user_id, movie_id):
         """Delete liked relationship between user and movie."""
         try:
-            with cls.neo4j_driver.session() as session:
-                session.run(
-                    DELETE_LIKED_RELATIONSHIP,
-                    user_external_id=user_id,
-                    movie_external_id=movie_id,
-                )
+            await resolve(cls.storage.delete_liked_relationship(user_id, movie_id))
         except exceptions.Neo4jError as err:
             LOGGER.error(
                 "Failed to delete liked relationship between user=%s and movie=%s. Error: %s",
@@ -72,16 +81,110 @@ class Movie:
             )
             raise DatabaseError("Failed to delete liked relationship")
 
+        RECOMMENDATION_CACHE.invalidate(user_id)
+
+    @classmethod
+    async def apply_like_operations(cls, likes, unlikes):
+        """Create likes and delete unlikes of users in one write transaction."""
+        try:
+            created = await resolve(cls.storage.apply_like_operations(likes, unlikes))
+        except exceptions.Neo4jError as err:
+            LOGGER.error(
+                "Failed to apply %s likes and %s unlikes. Error: %s",
+                len(likes), len(unlikes), err
+            )
+            raise DatabaseError("Failed to apply like operations")
+
+        for user_id in {like["user_external_id"] for like in likes + unlikes}:
+            RECOMMENDATION_CACHE.invalidate(user_id)
+
+        return created
+
+    @classmethod
+    def get_ranking_version(cls, algorithm):
+        """Return version of catalogue and artifact ranked lists of algorithm are computed from."""
+        if algorithm == COLLABORATIVE_ALGORITHM:
+            uses_artifact = APP_CONFIG.COLLABORATIVE_BACKEND == FACTORS_BACKEND
+            store = FACTORS_MODEL_STORE
+        elif algorithm == CONTENT_BASED_ALGORITHM:
+            uses_artifact = APP_CONFIG.CONTENT_BASED_BACKEND == MATRIX_BACKEND
+            store = SIMILARITY_MATRIX_STORE
+        else:
+            uses_artifact = APP_CONFIG.SIMILAR_MOVIES_BACKEND == MATRIX_BACKEND
+            store = SIMILARITY_MATRIX_STORE
+
+        if not uses_artifact:
+            return get_catalogue_version()
+
+        try:
+            return f"{get_catalogue_version()}:{store.get_version()}"
+        except ArtifactError as err:
+            LOGGER.error(
+                "Failed to get version of %s artifact for %s recommendations. Error: %s",
+                store.name, algorithm, err
+            )
+            raise DatabaseError(f"Failed to get {algorithm} recommendations")
+
     @classmethod
-    def get_collaborative_recommendations(cls, user_id, limit):
+    async def get_collaborative_recommendations(cls, user_id, limit):
         """Get movies recommendations based on collaborative filtering."""
+        return await RECOMMENDATION_CACHE.get_or_compute(
+            COLLABORATIVE_ALGORITHM,
+            user_id,
+            cls.get_ranking_version(COLLABORATIVE_ALGORITHM),
+            limit,
+            lambda depth: cls.rank_collaborative_recommendations(user_id, depth),
+        )
+
+    @classmethod
+    async def get_ranked_collaborative_recommendations(cls, user_id):
+        """Get cached ranked list of collaborative recommendations for pagination."""
+        return await RECOMMENDATION_CACHE.get_ranked(
+            COLLABORATIVE_ALGORITHM,
+            user_id,
+            cls.get_ranking_version(COLLABORATIVE_ALGORITHM),
+            lambda depth: cls.rank_collaborative_recommendations(user_id, depth),
+        )
+
+    @classmethod
+    async def rank_collaborative_recommendations(cls, user_id, limit):
+        """Rank collaborative recommendations with configured backend."""
+        if APP_CONFIG.COLLABORATIVE_BACKEND == CO_LIKED_BACKEND:
+            return await cls.get_co_liked_recommendations(user_id, limit)
+
+        if APP_CONFIG.COLLABORATIVE_BACKEND == FACTORS_BACKEND:
+            likes = [
+                (like[EXTERNAL_ID_FIELD], like[LIKED_TIMESTAMP_FIELD])
+                for like in await cls.get_user_likes(user_id)
+            ]
+            try:
+                return get_factors_model().get_recommendations(user_id, likes, limit)
+            except ArtifactError as err:
+                LOGGER.error(
+                    "Failed to get collaborative recommendations for user=%s from factors. "
+                    "Error: %s", user_id, err
+                )
+                raise DatabaseError("Failed to get collaborative recommendations")
+
+        return await cls.compute_collaborative_recommendations(user_id, limit)
+
+    @classmethod
+    async def get_co_liked_recommendations(cls, user_id, limit):
+        """Get collaborative recommendations from co-liked movies counts of recent likes."""
         try:
-            with cls.neo4j_driver.session() as session:
-                return session.run(
-                    GET_COLLABORATIVE_RECOMMENDATIONS,
-                    user_external_id=user_id,
-                    limit=limit,
-                ).data()
+            return await resolve(cls.storage.get_co_liked_recommendations(user_id, limit))
+        except exceptions.Neo4jError as err:
+            LOGGER.error(
+                "Failed to get co-liked recommendations for user=%s. Error: %s",
+                user_id, err
+            )
+            raise DatabaseError("Failed to get collaborative recommendations")
+
+    @classmethod
+    async def compute_collaborative_recommendations(cls, user_id, limit):
+        """Compute collaborative recommendations by traversing users with common likes."""
+        try:
+            return await resolve(cls.storage.compute_collaborative_recommendations(user_id, limit))
         except exceptions.Neo4jError as err:
             LOGGER.error(
                 "Failed to get collaborative recommendations for user=%s. Error: %s",
@@ -90,15 +193,51 @@ class Movie:
             raise DatabaseError("Failed to get collaborative recommendations")
 
     @classmethod
-    def get_content_based_recommendations(cls, user_id, limit):
+    async def get_content_based_recommendations(cls, user_id, limit):
         """Get content-based movies recommendations."""
-        try:
-            with cls.neo4j_driver.session() as session:
-                return session.run(
-                    GET_CONTENT_BASED_RECOMMENDATIONS,
-                    user_external_id=user_id,
+        return await RECOMMENDATION_CACHE.get_or_compute(
+            CONTENT_BASED_ALGORITHM,
+            user_id,
+            cls.get_ranking_version(CONTENT_BASED_ALGORITHM),
+            limit,
+            lambda depth: cls.rank_content_based_recommendations(user_id, depth),
+        )
+
+    @classmethod
+    async def get_ranked_content_based_recommendations(cls, user_id):
+        """Get cached ranked list of content-based recommendations for pagination."""
+        return await RECOMMENDATION_CACHE.get_ranked(
+            CONTENT_BASED_ALGORITHM,
+            user_id,
+            cls.get_ranking_version(CONTENT_BASED_ALGORITHM),
+            lambda depth: cls.rank_content_based_recommendations(user_id, depth),
+        )
+
+    @classmethod
+    async def rank_content_based_recommendations(cls, user_id, limit):
+        """Rank content-based recommendations with configured backend."""
+        if APP_CONFIG.CONTENT_BASED_BACKEND == MATRIX_BACKEND:
+            liked_movie_ids = await cls.get_user_liked_movies_ids(user_id)
+            try:
+                return get_similarity_matrix().get_recommendations(
+                    liked_movie_ids[:RECENT_LIKED_MOVIES_COUNT],
+                    excluded_movie_ids=liked_movie_ids,
                     limit=limit,
-                ).data()
+                )
+            except ArtifactError as err:
+                LOGGER.error(
+                    "Failed to get content-based recommendations for user=%s from matrix. "
+                    "Error: %s", user_id, err
+                )
+                raise DatabaseError("Failed to get content-based recommendations")
+
+        return await cls.compute_content_based_recommendations(user_id, limit)
+
+    @classmethod
+    async def compute_content_based_recommendations(cls, user_id, limit):
+        """Compute content-based recommendations by traversing liked movies relationships."""
+        try:
+            return await resolve(cls.storage.compute_content_based_recommendations(user_id, limit))
         except exceptions.Neo4jError as err:
             LOGGER.error(
                 "Failed to get content-based recommendations for user=%s. Error: %s",
@@ -107,15 +246,67 @@ class Movie:
             raise DatabaseError("Failed to get content-based recommendations")
 
     @classmethod
-    def get_similar_movies(cls, movie_id, limit):
+    async def get_similar_movies(cls, movie_id, limit):
         """Get similar movies to provided movie external id."""
+        return await RECOMMENDATION_CACHE.get_or_compute(
+            SIMILAR_ALGORITHM,
+            movie_id,
+            cls.get_ranking_version(SIMILAR_ALGORITHM),
+            limit,
+            lambda depth: cls.rank_similar_movies(movie_id, depth),
+        )
+
+    @classmethod
+    async def get_ranked_similar_movies(cls, movie_id):
+        """Get cached ranked list of similar movies for pagination."""
+        return await RECOMMENDATION_CACHE.get_ranked(
+            SIMILAR_ALGORITHM,
+            movie_id,
+            cls.get_ranking_version(SIMILAR_ALGORITHM),
+            lambda depth: cls.rank_similar_movies(movie_id, depth),
+        )
+
+    @classmethod
+    @coalesced(SIMILAR_CALLS_GROUP)
+    async def rank_similar_movies(cls, movie_id, limit):
+        """Rank similar movies with configured backend."""
+        if APP_CONFIG.SIMILAR_MOVIES_BACKEND == MATERIALIZED_BACKEND:
+            return await cls.get_materialized_similar_movies(movie_id, limit)
+
+        if APP_CONFIG.SIMILAR_MOVIES_BACKEND == MATRIX_BACKEND:
+            try:
+                return get_similarity_matrix().get_similar_movies(movie_id, limit)
+            except ArtifactError as err:
+                LOGGER.error(
+                    "Failed to get similar movies for external_id=%s from matrix. Error: %s",
+                    movie_id, err
+                )
+                raise DatabaseError("Failed to get similar movies")
+
+        return await cls.compute_similar_movies(movie_id, limit)
+
+    @classmethod
+    async def get_materialized_similar_movies(cls, movie_id, limit):
+        """Get similar movies from precomputed SIMILAR_TO relationships."""
+        try:
+            return await resolve(cls.storage.get_materialized_similar_movies(movie_id, limit))
+        except exceptions.Neo4jError as err:
+            LOGGER.error(
+                "Failed to get materialized similar movies for external_id=%s. Error: %s",
+                movie_id, err
+            )
+            raise DatabaseError("Failed to get similar movies")
+
+    @classmethod
+    async def compute_similar_movies(cls, movie_id, limit):
+        """Compute similar movies by traversing shared movie relationships."""
         try:
-            with cls.neo4j_driver.session() as session:
-                return session.run(
-                    GET_SIMILAR_MOVIES,
-                    movie_external_id=movie_id,
-                    limit=limit
-                ).data()
+            return await resolve(cls.storage.compute_similar_movies(
+                movie_id,
+                limit,
+                scoring=APP_CONFIG.SIMILAR_MOVIES_SCORING,
+                max_degree=APP_CONFIG.SIMILAR_MOVIES_MAX_DEGREE,
+            ))
         except exceptions.Neo4jError as err:
             LOGGER.error(
                 "Failed to get similar movies for external_id=%s. Error: %s",
@@ -124,16 +315,16 @@ class Movie:
             raise DatabaseError("Failed to get similar movies")
 
     @classmethod
-    def get_movie(cls, movie_id):
+    @coalesced(MOVIE_CALLS_GROUP)
+    async def get_movie(cls, movie_id):
         """Return movie by provided movie external id."""
-        try:
-            with cls.neo4j_driver.session() as session:
-                movie = session.run(
-                    GET_MOVIE,
-                    movie_external_id=movie_id,
-                ).single().data()
+        cache_key = f"{get_catalogue_version()}:{movie_id}"
+        movie = MOVIE_CACHE.get(cache_key)
+        if movie is not None:
+            return movie
 
-                return movie
+        try:
+            movie = await resolve(cls.storage.get_movie(movie_id))
         except exceptions.Neo4jError as err:
             LOGGER.error(
                 "Failed to get movie by external_id=%s. Error: %s",
@@ -141,15 +332,46 @@ class Movie:
             )
             raise DatabaseError("Failed to get movie by external id")
 
+        if movie is None:
+            raise DBNoResultFoundError(f"The movie does not exist: external_id={movie_id}")
+
+        MOVIE_CACHE.set(cache_key, movie)
+        return movie
+
+    @classmethod
+    async def get_movies(cls, movie_ids):
+        """Return found movies keyed by external id for provided movies external ids."""
+        catalogue_version = get_catalogue_version()
+        movies = {}
+        for movie_id in movie_ids:
+            movie = MOVIE_CACHE.get(f"{catalogue_version}:{movie_id}")
+            if movie is not None:
+                movies[movie_id] = movie
+
+        missed_movie_ids = [movie_id for movie_id in movie_ids if movie_id not in movies]
+        if not missed_movie_ids:
+            return movies
+
+        try:
+            records = await resolve(cls.storage.get_movies(missed_movie_ids))
+        except exceptions.Neo4jError as err:
+            LOGGER.error(
+                "Failed to get movies by external_ids=%s. Error: %s",
+                missed_movie_ids, err
+            )
+            raise DatabaseError("Failed to get movies by external ids")
+
+        for movie in records:
+            MOVIE_CACHE.set(f"{catalogue_version}:{movie[EXTERNAL_ID_FIELD]}", movie)
+            movies[movie[EXTERNAL_ID_FIELD]] = movie
+
+        return movies
+
     @classmethod
-    def get_user_liked_movies(cls, user_id):
+    async def get_user_liked_movies(cls, user_id):
         """Get liked movies for provided user."""
         try:
-            with cls.neo4j_driver.session() as session:
-                return session.run(
-                    GET_USER_LIKED_MOVIES,
-                    user_external_id=user_id,
-                ).data()
+            return await resolve(cls.storage.get_user_liked_movies(user_id))
         except exceptions.Neo4jError as err:
             LOGGER.error(
                 "Failed to get liked movies for user=%s. Error: %s",
@@ -158,19 +380,47 @@ class Movie:
             raise DatabaseError("Failed to get user liked movies")
 
     @classmethod
-    def search_movies(cls, query, limit):
-        """Get movies from elastic search by provided query."""
+    async def get_user_likes(cls, user_id):
+        """Get external ids and timestamps of user likes, the most recent first."""
+        try:
+            return await resolve(cls.storage.get_user_likes(user_id))
+        except exceptions.Neo4jError as err:
+            LOGGER.error(
+                "Failed to get likes for user=%s. Error: %s",
+                user_id, err
+            )
+            raise DatabaseError("Failed to get user liked movies")
+
+    @classmethod
+    async def get_user_liked_movies_ids(cls, user_id):
+        """Get external ids of movies liked by provided user, the most recent first."""
+        return [like[EXTERNAL_ID_FIELD] for like in await cls.get_user_likes(user_id)]
+
+    @classmethod
+    @coalesced(SEARCH_CALLS_GROUP)
+    async def search_movies(cls, query, limit):
+        """Get movies from configured search backend by provided query."""
+        if APP_CONFIG.SEARCH_BACKEND == EMBEDDED_SEARCH_BACKEND:
+            try:
+                return get_search_index().search(query, limit)
+            except ArtifactError as err:
+                LOGGER.error(
+                    "Failed to search movies by query=%s from search index. Error: %s",
+                    query, err
+                )
+                raise DatabaseError("Failed to search movies by query")
+
         try:
             query = cls.es_driver.format_multi_match_query(
                 query=query,
                 fields=(TITLE_FIELD, DESCRIPTION_FIELD),
                 projection=(EXTERNAL_ID_FIELD, ORIGINAL_TITLE_FIELD),
             )
-            movies = cls.es_driver.search(
+            movies = await resolve(cls.es_driver.search(
                 query=query,
                 index=APP_CONFIG.ES_DATABASE_MOVIE_INDEX,
                 limit=limit
-            )
+            ))
         except ElasticsearchException as err:
             LOGGER.error(
                 "Failed to search movies by query=%s from es. Error: %s",
@@ -179,3 +429,38 @@ class Movie:
             raise DatabaseError("Failed to search movies by query")
 
         return movies
+
+    @classmethod
+    @coalesced(SUGGEST_CALLS_GROUP)
+    async def suggest_movies(cls, query, limit, timeout):
+        """Get movies with titles starting with provided query words."""
+        if APP_CONFIG.SEARCH_BACKEND == EMBEDDED_SEARCH_BACKEND:
+            try:
+                return get_search_index().suggest(query, limit)
+            except ArtifactError as err:
+                LOGGER.error(
+                    "Failed to suggest movies by query=%s from search index. Error: %s",
+                    query, err
+                )
+                raise DatabaseError("Failed to suggest movies by query")
+
+        try:
+            query = cls.es_driver.format_prefix_query(
+                query=query,
+                field=TITLE_PREFIX_FIELD,
+                projection=(EXTERNAL_ID_FIELD, ORIGINAL_TITLE_FIELD),
+            )
+            movies = await resolve(cls.es_driver.search(
+                query=query,
+                index=APP_CONFIG.ES_DATABASE_MOVIE_INDEX,
+                limit=limit,
+                timeout=timeout,
+            ))
+        except ElasticsearchException as err:
+            LOGGER.error(
+                "Failed to suggest movies by query=%s from es. Error: %s",
+                query, err
+            )
+            raise DatabaseError("Failed to suggest movies by query")
+
+        return movies
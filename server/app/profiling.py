@@ -0,0 +1,113 @@
+"""This module includes sampling of cypher queries with PROFILE and slow queries log.
+
+Sampled and slow queries are written as json lines into rotating local file,
+benchmarks/query_log.py shows them grouped by query name.
+"""
+
+import json
+import logging
+import random
+import time
+from logging.handlers import RotatingFileHandler
+
+from app import APP_CONFIG
+
+
+QUERY_LOGGER_NAME = "peliculas.queries"
+
+
+def summarize_plan(plan):
+    """Return total db hits, rows and operators of profiled plan tree."""
+    summary = {"db_hits": plan.get("dbHits", 0), "rows": plan.get("rows", 0)}
+    operators = {plan["operatorType"]}
+    for child in plan.get("children", ()):
+        child_summary = summarize_plan(child)
+        summary["db_hits"] += child_summary["db_hits"]
+        summary["rows"] += child_summary["rows"]
+        operators.update(child_summary["operators"])
+
+    summary["operators"] = sorted(operators)
+    return summary
+
+
+def describe_plan(plan, depth=0):
+    """Return indented lines with rows and db hits of every operator of plan tree."""
+    lines = [
+        "{}{} rows={} db_hits={}".format(
+            "  " * depth, plan["operatorType"], plan.get("rows", 0), plan.get("dbHits", 0)
+        )
+    ]
+    for child in plan.get("children", ()):
+        lines.extend(describe_plan(child, depth + 1))
+
+    return lines
+
+
+class QueryProfiler:
+    """Class that decides which queries run with PROFILE and logs sampled and slow queries."""
+
+    def __init__(self, sample_rate, slow_threshold, path, max_bytes, backup_count):
+        """Initialize profiler with share of profiled queries and slow query threshold."""
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._logger = None
+
+    @property
+    def logger(self):
+        """Return logger writing into rotating file, the file is opened on first record."""
+        if self._logger is None:
+            logger = logging.getLogger(QUERY_LOGGER_NAME)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            if not logger.handlers:
+                logger.addHandler(RotatingFileHandler(
+                    self.path,
+                    maxBytes=self.max_bytes,
+                    backupCount=self.backup_count,
+                    delay=True,
+                ))
+            self._logger = logger
+
+        return self._logger
+
+    def prepare(self, query):
+        """Return query to run, prefixed with PROFILE if it is sampled, and sampled flag."""
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return f"PROFILE {query}", True
+
+        return query, False
+
+    def should_record(self, duration, profiled):
+        """Return True if query was sampled or took longer than slow threshold."""
+        return profiled or 0 < self.slow_threshold <= duration
+
+    def record(self, name, parameters, duration, rows, summary, profiled):
+        """Write query with its timings and plan summary from result summary, if any, into log."""
+        entry = {
+            "at": time.time(),
+            "query": name,
+            "duration": duration,
+            "profiled": profiled,
+            "rows": rows,
+            "parameters": parameters,
+        }
+        if summary is not None:
+            entry["result_available_after"] = summary.result_available_after
+            entry["result_consumed_after"] = summary.result_consumed_after
+        if summary is not None and summary.profile:
+            entry.update(summarize_plan(summary.profile))
+            entry["plan"] = describe_plan(summary.profile)
+
+        self.logger.info(json.dumps(entry, default=str))
+
+
+QUERY_PROFILER = QueryProfiler(
+    sample_rate=APP_CONFIG.QUERY_PROFILE_SAMPLE_RATE,
+    slow_threshold=APP_CONFIG.SLOW_QUERY_THRESHOLD,
+    path=APP_CONFIG.QUERY_LOG_PATH,
+    max_bytes=APP_CONFIG.QUERY_LOG_MAX_BYTES,
+    backup_count=APP_CONFIG.QUERY_LOG_BACKUP_COUNT,
+)
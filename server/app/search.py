@@ -0,0 +1,181 @@
+"""This module includes in-process BM25 search index of movies titles and descriptions.
+
+Fields are analyzed the same way as by the elasticsearch movie index: titles with
+the simple analyzer and descriptions with lowercase, porter stemmer and english
+stopwords filters. Queries are scored like multi_match of best_fields type,
+suggestions match every query word as a prefix of title words like edge n-grams.
+"""
+
+import re
+
+import numpy as np
+import snowballstemmer
+
+from app.artifacts import ArtifactStore
+from app.constants import (
+    EXTERNAL_ID_FIELD,
+    ORIGINAL_TITLE_FIELD,
+    TITLE_FIELD,
+    DESCRIPTION_FIELD,
+)
+
+
+SEARCH_INDEX_ARTIFACT_NAME = "search_index"
+SEARCH_FIELDS = (TITLE_FIELD, DESCRIPTION_FIELD)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Default stopwords of elasticsearch _english_ stop filter
+ENGLISH_STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into",
+    "is", "it", "no", "not", "of", "on", "or", "such", "that", "the", "their", "then",
+    "there", "these", "they", "this", "to", "was", "will", "with",
+))
+
+LETTERS_PATTERN = re.compile(r"[^\W\d_]+")
+WORDS_PATTERN = re.compile(r"\w+(?:[.'’]\w+)*")
+
+STEMMER = snowballstemmer.stemmer("porter")
+
+
+def analyze_title(text):
+    """Return terms of the simple analyzer: lowercased runs of letters."""
+    return LETTERS_PATTERN.findall(text.lower())
+
+
+def analyze_description(text):
+    """Return terms of description analyzer: words lowercased, stemmed, without stopwords."""
+    terms = STEMMER.stemWords(WORDS_PATTERN.findall(text.lower()))
+    return [term for term in terms if term not in ENGLISH_STOPWORDS]
+
+
+ANALYZERS = {
+    TITLE_FIELD: analyze_title,
+    DESCRIPTION_FIELD: analyze_description,
+}
+
+
+class FieldIndex:
+    """Class that represents inverted index of one field with postings stored as CSR arrays."""
+
+    def __init__(self, terms, indptr, docs, frequencies, lengths, average_length):
+        """Initialize index with terms, postings of every term and fields lengths."""
+        self.terms = terms
+        self.indptr = indptr
+        self.docs = docs
+        self.frequencies = frequencies
+        self.lengths = lengths
+        self.average_length = average_length
+
+    def score(self, terms, scores):
+        """Add BM25 scores of provided query terms to scores of documents."""
+        docs_count = len(self.lengths)
+        for term in terms:
+            row = self.terms.get_row(term)
+            if row is None:
+                continue
+
+            start, end = self.indptr[row], self.indptr[row + 1]
+            docs, frequencies = self.docs[start:end], self.frequencies[start:end]
+            idf = np.log(1 + (docs_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            norms = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[docs] / self.average_length)
+            scores[docs] += idf * frequencies / (frequencies + norms)
+
+    def get_prefix_docs(self, prefix):
+        """Return documents containing any term starting with provided prefix."""
+        key = prefix.encode()
+        sorted_ids = self.terms.sorted_ids
+        if len(key) >= sorted_ids.dtype.itemsize:
+            row = self.terms.get_row(prefix)
+            rows = () if row is None else (row,)
+        else:
+            start, end = np.searchsorted(sorted_ids, (key, key + b"\xff"))
+            rows = self.terms.sorted_rows[start:end]
+
+        if not len(rows):
+            return np.empty(0, dtype=self.docs.dtype)
+
+        return np.concatenate([self.docs[self.indptr[row]:self.indptr[row + 1]] for row in rows])
+
+
+class SearchIndex:
+    """Class that represents BM25 search index of movies fields."""
+
+    def __init__(self, external_ids, original_titles, fields):
+        """Initialize index with movies ids, original titles and index of every field."""
+        self.external_ids = external_ids
+        self.original_titles = original_titles
+        self.fields = fields
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        """Load search index from memory-mapped artifact."""
+        fields = {
+            field: FieldIndex(
+                terms=artifact.ids(f"{field}_terms"),
+                indptr=artifact.array(f"{field}_indptr"),
+                docs=artifact.array(f"{field}_docs"),
+                frequencies=artifact.array(f"{field}_frequencies"),
+                lengths=artifact.array(f"{field}_lengths"),
+                average_length=artifact.params["average_lengths"][field],
+            )
+            for field in SEARCH_FIELDS
+        }
+        return cls(artifact.ids("movie_ids"), artifact.strings("original_titles"), fields)
+
+    def search(self, query, limit):
+        """Return movies with the best score of any field for provided query."""
+        best_scores = np.zeros(len(self.external_ids))
+        for field, index in self.fields.items():
+            scores = np.zeros(len(self.external_ids))
+            index.score(ANALYZERS[field](query), scores)
+            np.maximum(best_scores, scores, out=best_scores)
+
+        rows = np.flatnonzero(best_scores > 0)
+        if limit <= 0 or not len(rows):
+            return []
+
+        if len(rows) > limit:
+            rows = np.sort(rows[np.argpartition(-best_scores[rows], limit - 1)[:limit]])
+        rows = rows[np.argsort(-best_scores[rows], kind="stable")]
+
+        return self.format_movies(rows)
+
+    def suggest(self, query, limit):
+        """Return movies with title terms starting with every query term, shorter titles first."""
+        index = self.fields[TITLE_FIELD]
+        terms = analyze_title(query)
+        if limit <= 0 or not terms:
+            return []
+
+        matched = np.ones(len(self.external_ids), dtype=bool)
+        for term in terms:
+            term_matched = np.zeros(len(self.external_ids), dtype=bool)
+            term_matched[index.get_prefix_docs(term)] = True
+            matched &= term_matched
+
+        rows = np.flatnonzero(matched)
+        if len(rows) > limit:
+            rows = np.sort(rows[np.argpartition(index.lengths[rows], limit - 1)[:limit]])
+        rows = rows[np.argsort(index.lengths[rows], kind="stable")]
+
+        return self.format_movies(rows)
+
+    def format_movies(self, rows):
+        """Return external ids and original titles of movies rows."""
+        return [
+            {
+                EXTERNAL_ID_FIELD: self.external_ids[row],
+                ORIGINAL_TITLE_FIELD: self.original_titles[row],
+            }
+            for row in rows
+        ]
+
+
+SEARCH_INDEX_STORE = ArtifactStore(SEARCH_INDEX_ARTIFACT_NAME, SearchIndex.from_artifact)
+
+
+def get_search_index():
+    """Return search index from the active artifact built by data/search_index.py."""
+    return SEARCH_INDEX_STORE.get()
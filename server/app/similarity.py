@@ -0,0 +1,100 @@
+"""This module includes in-process content similarity engine based on sparse matrices."""
+
+import logging
+
+import numpy as np
+from scipy import sparse
+
+from app.artifacts import ArtifactStore
+from app.constants import (
+    EXTERNAL_ID_FIELD,
+    TITLE_FIELD,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+SIMILARITY_ARTIFACT_NAME = "similarity"
+SCORE_FIELD = "score"
+
+
+class SimilarityMatrix:
+    """Class that represents movie x relationship sparse matrix of relationships weights."""
+
+    def __init__(self, external_ids, titles, weighted_matrix):
+        """Initialize similarity matrix with movies ids, titles and weighted features."""
+        self.external_ids = external_ids
+        self.titles = titles
+        self.weighted_matrix = weighted_matrix
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        """Load similarity matrix from memory-mapped artifact."""
+        weighted_matrix = sparse.csr_matrix(
+            (artifact.array("data"), artifact.array("indices"), artifact.array("indptr")),
+            shape=tuple(artifact.params["shape"]),
+            copy=False,
+        )
+        return cls(artifact.ids("movie_ids"), artifact.strings("titles"), weighted_matrix)
+
+    def get_similar_movies(self, movie_id, limit):
+        """Return movies with the highest weighted count of shared relationships."""
+        row = self.external_ids.get_row(movie_id)
+        if row is None:
+            return []
+
+        return self._score(self._features([row]), excluded_rows=[row], limit=limit)
+
+    def get_recommendations(self, liked_movie_ids, excluded_movie_ids, limit):
+        """Return movies similar to provided liked movies, except excluded movies."""
+        liked_rows = self._rows(liked_movie_ids)
+        if not liked_rows:
+            return []
+
+        excluded_rows = self._rows(excluded_movie_ids)
+        return self._score(self._features(liked_rows), excluded_rows=excluded_rows, limit=limit)
+
+    def _rows(self, movie_ids):
+        """Return rows of existing movies."""
+        rows = (self.external_ids.get_row(movie_id) for movie_id in movie_ids)
+        return [row for row in rows if row is not None]
+
+    def _features(self, rows):
+        """Return count of provided movies related to every feature."""
+        features = self.weighted_matrix[rows]
+        features.data = np.ones_like(features.data)
+        return sparse.csr_matrix(features.sum(axis=0))
+
+    def _score(self, vector, excluded_rows, limit):
+        """Return top scored movies for provided features vector."""
+        scores = (self.weighted_matrix @ vector.T).tocoo()
+        rows, values = scores.row, scores.data
+        mask = values > 0
+        if excluded_rows:
+            mask &= ~np.isin(rows, excluded_rows)
+        rows, values = rows[mask], values[mask]
+
+        if limit <= 0 or not len(rows):
+            return []
+
+        if len(rows) > limit:
+            top = np.argpartition(-values, limit - 1)[:limit]
+            rows, values = rows[top], values[top]
+
+        order = np.argsort(-values, kind="stable")
+        return [
+            {
+                EXTERNAL_ID_FIELD: self.external_ids[rows[index]],
+                TITLE_FIELD: self.titles[rows[index]],
+                SCORE_FIELD: float(values[index]),
+            }
+            for index in order
+        ]
+
+
+SIMILARITY_MATRIX_STORE = ArtifactStore(SIMILARITY_ARTIFACT_NAME, SimilarityMatrix.from_artifact)
+
+
+def get_similarity_matrix():
+    """Return similarity matrix from the active artifact built by data/similarity_matrix.py."""
+    return SIMILARITY_MATRIX_STORE.get()
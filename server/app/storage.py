@@ -0,0 +1,232 @@
+"""This module includes storage backends of movies graph used by Movie model."""
+
+import time
+
+from app import NEO4J_DRIVER, APP_CONFIG
+from app.graph import MemoryStorageBackend
+from app.metrics import (
+    METRICS,
+    BACKEND_DURATION_METRIC,
+    NEO4J_BACKEND,
+    get_query_name,
+    observe_rows,
+)
+from app.profiling import QUERY_PROFILER
+from app.constants import (
+    IDF_SCORING,
+    CO_LIKED_BACKEND,
+    RECENT_LIKED_MOVIES_COUNT,
+    MEMORY_STORAGE_BACKEND,
+)
+from app.utils.cypher_queries import (
+    GET_MOVIE,
+    GET_MOVIES,
+    GET_SIMILAR_MOVIES,
+    GET_SIMILAR_MOVIES_IDF,
+    GET_MATERIALIZED_SIMILAR_MOVIES,
+    GET_USER_LIKED_MOVIES,
+    GET_USER_LIKES,
+    GET_CONTENT_BASED_RECOMMENDATIONS,
+    GET_COLLABORATIVE_RECOMMENDATIONS,
+    CREATE_LIKED_RELATIONSHIP,
+    DELETE_LIKED_RELATIONSHIP,
+    CREATE_LIKED_RELATIONSHIP_WITH_CO_LIKES,
+    DELETE_LIKED_RELATIONSHIP_WITH_CO_LIKES,
+    GET_CO_LIKED_RECOMMENDATIONS,
+    BULK_CREATE_LIKED_RELATIONSHIPS,
+    BULK_DELETE_LIKED_RELATIONSHIPS,
+    BULK_CREATE_LIKED_RELATIONSHIPS_WITH_CO_LIKES,
+    BULK_DELETE_LIKED_RELATIONSHIPS_WITH_CO_LIKES,
+)
+
+
+class BaseNeo4jStorageBackend:
+    """Class that represents movies graph stored in neo4j database.
+
+    Methods choose queries and return result of run() or write_likes() as is, which
+    subclasses implement with sync or async driver returning records as dicts and
+    raising neo4j errors as is.
+    """
+
+    def __init__(self, driver):
+        """Initialize backend with neo4j driver."""
+        self.driver = driver
+
+    def run(self, query, single=False, **parameters):
+        """Run cypher query and return its records as dicts, or the first one with single flag."""
+        raise NotImplementedError
+
+    def write_likes(self, create_query, delete_query, likes, unlikes):
+        """Create likes and delete unlikes in one write transaction, return created likes."""
+        raise NotImplementedError
+
+    @staticmethod
+    def time_query(operation, name):
+        """Return timer of query operation."""
+        return METRICS.timer(
+            BACKEND_DURATION_METRIC, backend=NEO4J_BACKEND, operation=operation, query=name
+        )
+
+    @staticmethod
+    def select_records(name, records, single):
+        """Observe count of records and return them, or the first one or None with single flag."""
+        observe_rows(NEO4J_BACKEND, name, len(records))
+        if single:
+            return records[0] if records else None
+
+        return records
+
+    @staticmethod
+    def record_write(name, likes, unlikes, duration, created):
+        """Log slow write transaction of likes and unlikes."""
+        if QUERY_PROFILER.should_record(duration, profiled=False):
+            QUERY_PROFILER.record(
+                name,
+                {"likes": len(likes), "unlikes": len(unlikes)},
+                duration,
+                len(created),
+                summary=None,
+                profiled=False,
+            )
+
+    @staticmethod
+    def maintains_co_likes():
+        """Return True if likes have to update co-liked counts."""
+        return APP_CONFIG.COLLABORATIVE_BACKEND == CO_LIKED_BACKEND
+
+    def create_liked_relationship(self, user_id, movie_id):
+        """Create like of user unless it exists, return created like or empty list."""
+        query = CREATE_LIKED_RELATIONSHIP
+        if self.maintains_co_likes():
+            query = CREATE_LIKED_RELATIONSHIP_WITH_CO_LIKES
+
+        return self.run(query, user_external_id=user_id, movie_external_id=movie_id)
+
+    def delete_liked_relationship(self, user_id, movie_id):
+        """Delete like of user if it exists."""
+        query = DELETE_LIKED_RELATIONSHIP
+        if self.maintains_co_likes():
+            query = DELETE_LIKED_RELATIONSHIP_WITH_CO_LIKES
+
+        return self.run(query, user_external_id=user_id, movie_external_id=movie_id)
+
+    def apply_like_operations(self, likes, unlikes):
+        """Create likes and delete unlikes in one write transaction, return created likes."""
+        if self.maintains_co_likes():
+            return self.write_likes(
+                BULK_CREATE_LIKED_RELATIONSHIPS_WITH_CO_LIKES,
+                BULK_DELETE_LIKED_RELATIONSHIPS_WITH_CO_LIKES,
+                likes,
+                unlikes,
+            )
+
+        return self.write_likes(
+            BULK_CREATE_LIKED_RELATIONSHIPS, BULK_DELETE_LIKED_RELATIONSHIPS, likes, unlikes
+        )
+
+    def get_movie(self, movie_id):
+        """Return movie with related entities or None."""
+        return self.run(GET_MOVIE, single=True, movie_external_id=movie_id)
+
+    def get_movies(self, movie_ids):
+        """Return existing movies with related entities."""
+        return self.run(GET_MOVIES, movie_external_ids=movie_ids)
+
+    def get_user_liked_movies(self, user_id):
+        """Return movies liked by user."""
+        return self.run(GET_USER_LIKED_MOVIES, user_external_id=user_id)
+
+    def get_user_likes(self, user_id):
+        """Return external ids and timestamps of user likes, the most recent first."""
+        return self.run(GET_USER_LIKES, user_external_id=user_id)
+
+    def compute_similar_movies(self, movie_id, limit, scoring=None, max_degree=None):
+        """Return movies with the highest weighted count of shared entities."""
+        if scoring == IDF_SCORING:
+            return self.run(
+                GET_SIMILAR_MOVIES_IDF,
+                movie_external_id=movie_id,
+                max_degree=max_degree,
+                limit=limit,
+            )
+
+        return self.run(GET_SIMILAR_MOVIES, movie_external_id=movie_id, limit=limit)
+
+    def get_materialized_similar_movies(self, movie_id, limit):
+        """Return similar movies from precomputed SIMILAR_TO relationships."""
+        return self.run(GET_MATERIALIZED_SIMILAR_MOVIES, movie_external_id=movie_id, limit=limit)
+
+    def compute_content_based_recommendations(self, user_id, limit):
+        """Return movies sharing the most weighted entities with recently liked movies."""
+        return self.run(GET_CONTENT_BASED_RECOMMENDATIONS, user_external_id=user_id, limit=limit)
+
+    def compute_collaborative_recommendations(self, user_id, limit):
+        """Return movies liked by the most users who liked recently liked movies."""
+        return self.run(GET_COLLABORATIVE_RECOMMENDATIONS, user_external_id=user_id, limit=limit)
+
+    def get_co_liked_recommendations(self, user_id, limit):
+        """Return movies with the highest co-liked counts with recently liked movies."""
+        return self.run(
+            GET_CO_LIKED_RECOMMENDATIONS,
+            user_external_id=user_id,
+            recent_liked_count=RECENT_LIKED_MOVIES_COUNT,
+            limit=limit,
+        )
+
+
+class Neo4jStorageBackend(BaseNeo4jStorageBackend):
+    """Class that represents movies graph stored in neo4j database with sync driver."""
+
+    def run(self, query, single=False, **parameters):
+        """Run cypher query in new session and return its records as dicts.
+
+        With single flag only the first record is returned, or None if there are no records.
+        """
+        name = get_query_name(query)
+        profiled_query, profiled = QUERY_PROFILER.prepare(query)
+        with self.driver.session() as session:
+            started_at = time.perf_counter()
+            with self.time_query("run", name):
+                result = session.run(profiled_query, **parameters)
+            with self.time_query("data", name):
+                records = result.data()
+
+            duration = time.perf_counter() - started_at
+            if QUERY_PROFILER.should_record(duration, profiled):
+                summary = result.consume()
+                QUERY_PROFILER.record(name, parameters, duration, len(records), summary, profiled)
+
+        return self.select_records(name, records, single)
+
+    def write_likes(self, create_query, delete_query, likes, unlikes):
+        """Create likes and delete unlikes in one write transaction, return created likes."""
+
+        def apply(transaction):
+            """Create likes and delete unlikes in provided transaction."""
+            created = []
+            if likes:
+                created = transaction.run(create_query, likes=likes).data()
+            if unlikes:
+                transaction.run(delete_query, unlikes=unlikes).consume()
+
+            return created
+
+        name = get_query_name(create_query)
+        started_at = time.perf_counter()
+        with self.driver.session() as session:
+            with self.time_query("transaction", name):
+                created = session.execute_write(apply)
+
+        self.record_write(name, likes, unlikes, time.perf_counter() - started_at, created)
+        return created
+
+
+def create_storage_backend():
+    """Return storage backend of movies graph with configured backend."""
+    if APP_CONFIG.STORAGE_BACKEND == MEMORY_STORAGE_BACKEND:
+        return MemoryStorageBackend.from_csv(APP_CONFIG.IMDB_CSV_PATH, APP_CONFIG.LIKE_LOG_PATH)
+
+    return Neo4jStorageBackend(NEO4J_DRIVER)
+
+
+STORAGE = create_storage_backend()
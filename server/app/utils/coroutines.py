@@ -0,0 +1,38 @@
+"""This module provides helpers to share coroutine code between sync and asyncio serving modes.
+
+Movie model and views are written once as coroutines. Over sync backends they never
+suspend, so the sync app runs them to completion with run_sync, while the asyncio app
+awaits them with async backends.
+"""
+
+import asyncio
+import inspect
+
+
+def run_sync(coroutine):
+    """Return result of coroutine which completes without suspending."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    coroutine.close()
+    raise RuntimeError("The coroutine was suspended, it has to be awaited in event loop.")
+
+
+async def resolve(value):
+    """Return awaited value if it is awaitable, value itself otherwise."""
+    if inspect.isawaitable(value):
+        return await value
+
+    return value
+
+
+def has_running_loop():
+    """Return whether it is called from coroutine running in event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+
+    return True
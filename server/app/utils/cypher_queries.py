@@ -2,22 +2,33 @@
 
 GET_MOVIE = """
     MATCH (movie:Movie {external_id: $movie_external_id})
-    MATCH (movie)<-[:ACTED_IN]-(actors)
-    MATCH (movie)<-[:WROTE]-(writers)
-    MATCH (movie)<-[:DIRECTED]-(directors)
-    MATCH (movie)<-[:PRODUCED]-(production_companies)
-    MATCH (movie)-[:IN_GENRE]->(genres)
-    MATCH (movie)-[:IN_COUNTRY]->(countries)
 
     RETURN 
         movie.external_id as external_id, 
         movie.title as title, 
-        collect(distinct actors.name) as actors,
-        collect(distinct writers.name) as writers,
-        collect(distinct directors.name) as directors,
-        collect(distinct production_companies.name) as production_companies,
-        collect(distinct genres.name) as genres,
-        collect(distinct countries.name) as countries
+        [(movie)<-[:ACTED_IN]-(actor) | actor.name] as actors,
+        [(movie)<-[:WROTE]-(writer) | writer.name] as writers,
+        [(movie)<-[:DIRECTED]-(director) | director.name] as directors,
+        [(movie)<-[:PRODUCED]-(production_company) | production_company.name]
+            as production_companies,
+        [(movie)-[:IN_GENRE]->(genre) | genre.name] as genres,
+        [(movie)-[:IN_COUNTRY]->(country) | country.name] as countries
+"""
+
+GET_MOVIES = """
+    UNWIND $movie_external_ids AS movie_external_id
+    MATCH (movie:Movie {external_id: movie_external_id})
+
+    RETURN 
+        movie.external_id as external_id, 
+        movie.title as title, 
+        [(movie)<-[:ACTED_IN]-(actor) | actor.name] as actors,
+        [(movie)<-[:WROTE]-(writer) | writer.name] as writers,
+        [(movie)<-[:DIRECTED]-(director) | director.name] as directors,
+        [(movie)<-[:PRODUCED]-(production_company) | production_company.name]
+            as production_companies,
+        [(movie)-[:IN_GENRE]->(genre) | genre.name] as genres,
+        [(movie)-[:IN_COUNTRY]->(country) | country.name] as countries
 """
 
 GET_USER_LIKED_MOVIES = """
@@ -25,6 +36,12 @@ GET_USER_LIKED_MOVIES = """
     RETURN movie.external_id as external_id, movie.title as title
 """
 
+GET_USER_LIKES = """
+    MATCH (:User {external_id: $user_external_id})-[liked:LIKED]->(movie:Movie)
+    RETURN movie.external_id as external_id, liked.at as liked_timestamp
+    ORDER BY liked.at DESC
+"""
+
 GET_SIMILAR_MOVIES = """
     MATCH (movie:Movie {external_id: $movie_external_id})
         -[:ACTED_IN|WROTE|DIRECTED|PRODUCED|IN_GENRE|IN_COUNTRY]-(relationships)
@@ -50,6 +67,196 @@ GET_SIMILAR_MOVIES = """
     LIMIT $limit
 """
 
+GET_SIMILAR_MOVIES_IDF = """
+    MATCH (movie:Movie {external_id: $movie_external_id})
+        -[:ACTED_IN|WROTE|DIRECTED|PRODUCED|IN_GENRE|IN_COUNTRY]-(relationship)
+    WITH movie, relationship,
+        coalesce(relationship.degree, COUNT { (relationship)--(:Movie) }) as degree
+    WHERE degree <= $max_degree
+    WITH movie, relationship,
+        CASE
+            WHEN relationship:Country THEN 1
+            WHEN relationship:Actor THEN 1.5
+            WHEN relationship:Writer THEN 2
+            WHEN relationship:Director THEN 2
+            WHEN relationship:ProductionCompany THEN 2
+            WHEN relationship:Genre THEN 3
+        END / log(1.0 + degree) as weight
+    MATCH (relationship)
+        -[:ACTED_IN|WROTE|DIRECTED|PRODUCED|IN_GENRE|IN_COUNTRY]-(recommendations:Movie)
+    WHERE recommendations <> movie
+
+    RETURN
+        recommendations.external_id as external_id,
+        recommendations.title as title,
+        sum(weight) as score
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+GET_MATERIALIZED_SIMILAR_MOVIES = """
+    MATCH (movie:Movie {external_id: $movie_external_id})-[similar:SIMILAR_TO]->(recommendations)
+    RETURN
+        recommendations.external_id as external_id,
+        recommendations.title as title,
+        similar.score as score
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+UPSERT_MOVIES = """
+    UNWIND $movies AS row
+    MERGE (movie:Movie {external_id: row.external_id})
+    SET movie.title = row.title
+    WITH movie, row
+    CALL {
+        WITH movie, row
+        MATCH (movie)<-[relationship:ACTED_IN]-(actor:Actor)
+        WHERE NOT actor.name IN row.actors
+        DELETE relationship
+        SET actor.degree = coalesce(
+            actor.degree - 1, COUNT { (actor)--(:Movie) }
+        )
+        RETURN count(*) as deleted_actors
+    }
+    FOREACH (actor_name IN row.actors |
+        MERGE (actor:Actor {name: actor_name})
+        ON CREATE SET actor.degree = 0
+        MERGE (movie)<-[:ACTED_IN]-(actor)
+        ON CREATE SET actor.degree = coalesce(
+            actor.degree + 1, COUNT { (actor)--(:Movie) }
+        ))
+    CALL {
+        WITH movie, row
+        MATCH (movie)<-[relationship:WROTE]-(writer:Writer)
+        WHERE NOT writer.name IN row.writers
+        DELETE relationship
+        SET writer.degree = coalesce(
+            writer.degree - 1, COUNT { (writer)--(:Movie) }
+        )
+        RETURN count(*) as deleted_writers
+    }
+    FOREACH (writer_name IN row.writers |
+        MERGE (writer:Writer {name: writer_name})
+        ON CREATE SET writer.degree = 0
+        MERGE (movie)<-[:WROTE]-(writer)
+        ON CREATE SET writer.degree = coalesce(
+            writer.degree + 1, COUNT { (writer)--(:Movie) }
+        ))
+    CALL {
+        WITH movie, row
+        MATCH (movie)<-[relationship:DIRECTED]-(director:Director)
+        WHERE NOT director.name IN row.directors
+        DELETE relationship
+        SET director.degree = coalesce(
+            director.degree - 1, COUNT { (director)--(:Movie) }
+        )
+        RETURN count(*) as deleted_directors
+    }
+    FOREACH (director_name IN row.directors |
+        MERGE (director:Director {name: director_name})
+        ON CREATE SET director.degree = 0
+        MERGE (movie)<-[:DIRECTED]-(director)
+        ON CREATE SET director.degree = coalesce(
+            director.degree + 1, COUNT { (director)--(:Movie) }
+        ))
+    CALL {
+        WITH movie, row
+        MATCH (movie)<-[relationship:PRODUCED]-(production_company:ProductionCompany)
+        WHERE NOT production_company.name IN row.production_companies
+        DELETE relationship
+        SET production_company.degree = coalesce(
+            production_company.degree - 1, COUNT { (production_company)--(:Movie) }
+        )
+        RETURN count(*) as deleted_production_companies
+    }
+    FOREACH (production_company_name IN row.production_companies |
+        MERGE (production_company:ProductionCompany {name: production_company_name})
+        ON CREATE SET production_company.degree = 0
+        MERGE (movie)<-[:PRODUCED]-(production_company)
+        ON CREATE SET production_company.degree = coalesce(
+            production_company.degree + 1, COUNT { (production_company)--(:Movie) }
+        ))
+    CALL {
+        WITH movie, row
+        MATCH (movie)-[relationship:IN_GENRE]->(genre:Genre)
+        WHERE NOT genre.name IN row.genres
+        DELETE relationship
+        SET genre.degree = coalesce(
+            genre.degree - 1, COUNT { (genre)--(:Movie) }
+        )
+        RETURN count(*) as deleted_genres
+    }
+    FOREACH (genre_name IN row.genres |
+        MERGE (genre:Genre {name: genre_name})
+        ON CREATE SET genre.degree = 0
+        MERGE (movie)-[:IN_GENRE]->(genre)
+        ON CREATE SET genre.degree = coalesce(
+            genre.degree + 1, COUNT { (genre)--(:Movie) }
+        ))
+    CALL {
+        WITH movie, row
+        MATCH (movie)-[relationship:IN_COUNTRY]->(country:Country)
+        WHERE NOT country.name IN row.countries
+        DELETE relationship
+        SET country.degree = coalesce(
+            country.degree - 1, COUNT { (country)--(:Movie) }
+        )
+        RETURN count(*) as deleted_countries
+    }
+    FOREACH (country_name IN row.countries |
+        MERGE (country:Country {name: country_name})
+        ON CREATE SET country.degree = 0
+        MERGE (movie)-[:IN_COUNTRY]->(country)
+        ON CREATE SET country.degree = coalesce(
+            country.degree + 1, COUNT { (country)--(:Movie) }
+        ))
+"""
+
+DELETE_MOVIES = """
+    UNWIND $movie_external_ids AS movie_external_id
+    MATCH (movie:Movie {external_id: movie_external_id})
+    CALL {
+        WITH movie
+        MATCH (movie)-[:ACTED_IN|WROTE|DIRECTED|PRODUCED|IN_GENRE|IN_COUNTRY]-(entity)
+        SET entity.degree = coalesce(entity.degree, COUNT { (entity)--(:Movie) }) - 1
+        RETURN count(*) as updated_degrees
+    }
+    DETACH DELETE movie
+"""
+
+GET_MOVIES_EXTERNAL_IDS = """
+    MATCH (movie:Movie)
+    WHERE movie.external_id > $after_external_id
+    RETURN movie.external_id as external_id
+    ORDER BY external_id
+    LIMIT $limit
+"""
+
+GET_SIMILAR_TO_REFERRERS = """
+    MATCH (movie:Movie)-[:SIMILAR_TO]->(similar:Movie)
+    WHERE similar.external_id IN $movie_external_ids
+    RETURN DISTINCT movie.external_id as external_id
+"""
+
+GET_MOVIES_SHARING_ENTITIES = """
+    MATCH (movie:Movie)-[:ACTED_IN|WROTE|DIRECTED|PRODUCED|IN_GENRE|IN_COUNTRY]-(entity)
+    WHERE movie.external_id IN $movie_external_ids AND entity.degree <= $max_degree
+    MATCH (entity)-[:ACTED_IN|WROTE|DIRECTED|PRODUCED|IN_GENRE|IN_COUNTRY]-(neighbour:Movie)
+    RETURN DISTINCT neighbour.external_id as external_id
+"""
+
+REPLACE_SIMILAR_TO_RELATIONSHIPS = """
+    UNWIND $similar_movies AS similar_movie
+    MATCH (movie:Movie {external_id: similar_movie.external_id})
+    OPTIONAL MATCH (movie)-[outdated:SIMILAR_TO]->()
+    DELETE outdated
+    WITH DISTINCT movie, similar_movie
+    UNWIND similar_movie.recommendations AS recommendation
+    MATCH (recommended:Movie {external_id: recommendation.external_id})
+    CREATE (movie)-[:SIMILAR_TO {score: recommendation.score}]->(recommended)
+"""
+
 GET_CONTENT_BASED_RECOMMENDATIONS = """
     CALL {
         MATCH (user:User {external_id: $user_external_id})-[liked:LIKED]->(recent_liked:Movie)
@@ -110,3 +317,178 @@ GET_COLLABORATIVE_RECOMMENDATIONS = """
     ORDER BY similar_user_count DESC
     LIMIT $limit
 """
+
+CREATE_LIKED_RELATIONSHIP_WITH_CO_LIKES = """
+    MATCH (movie:Movie {external_id: $movie_external_id})
+    WITH movie
+    MERGE (user:User {external_id: $user_external_id})
+    SET user._lock = true
+    REMOVE user._lock
+    WITH movie, user, EXISTS { (user)-[:LIKED]->(movie) } AS already_liked
+    MERGE (user)-[liked:LIKED]->(movie)
+    ON CREATE SET liked.at = timestamp()
+    WITH movie, user, liked, already_liked
+    CALL {
+        WITH movie, user, already_liked
+        MATCH (user)-[:LIKED]->(co_liked:Movie)
+        WHERE NOT already_liked AND co_liked <> movie
+        WITH CASE WHEN movie.external_id < co_liked.external_id
+                THEN [movie, co_liked] ELSE [co_liked, movie] END AS pair
+        WITH pair[0] AS first, pair[1] AS second
+        MERGE (first)-[co:CO_LIKED]->(second)
+        ON CREATE SET co.count = 0
+        SET co.count = co.count + 1
+        RETURN count(co) as co_liked_count
+    }
+    RETURN liked.at as liked_timestamp,
+        movie.external_id as external_id
+"""
+
+DELETE_LIKED_RELATIONSHIP_WITH_CO_LIKES = """
+    MATCH (user:User {external_id: $user_external_id})
+    SET user._lock = true
+    REMOVE user._lock
+    WITH user
+    MATCH (user)-[liked:LIKED]->(movie:Movie {external_id: $movie_external_id})
+    DELETE liked
+    WITH user, movie
+    MATCH (user)-[:LIKED]->(co_liked:Movie)
+    MATCH (movie)-[co:CO_LIKED]-(co_liked)
+    SET co.count = co.count - 1
+    WITH co
+    WHERE co.count <= 0
+    DELETE co
+"""
+
+BULK_CREATE_LIKED_RELATIONSHIPS = """
+    UNWIND $likes AS like
+    MATCH (movie:Movie {external_id: like.movie_external_id})
+    MERGE (user:User {external_id: like.user_external_id})
+    MERGE (user)-[liked:LIKED]->(movie)
+    ON CREATE SET liked.at = like.at
+    RETURN user.external_id as user_external_id,
+        liked.at as liked_timestamp,
+        movie.external_id as external_id
+"""
+
+BULK_DELETE_LIKED_RELATIONSHIPS = """
+    UNWIND $unlikes AS unlike
+    MATCH (user:User)-[liked:LIKED]->(movie:Movie)
+    WHERE user.external_id=unlike.user_external_id
+        AND movie.external_id=unlike.movie_external_id
+    DELETE liked
+"""
+
+BULK_CREATE_LIKED_RELATIONSHIPS_WITH_CO_LIKES = """
+    UNWIND $likes AS like
+    CALL {
+        WITH like
+        MATCH (movie:Movie {external_id: like.movie_external_id})
+        MERGE (user:User {external_id: like.user_external_id})
+        SET user._lock = true
+        REMOVE user._lock
+        WITH like, movie, user, EXISTS { (user)-[:LIKED]->(movie) } AS already_liked
+        MERGE (user)-[liked:LIKED]->(movie)
+        ON CREATE SET liked.at = like.at
+        WITH movie, user, liked, already_liked
+        CALL {
+            WITH movie, user, already_liked
+            MATCH (user)-[:LIKED]->(co_liked:Movie)
+            WHERE NOT already_liked AND co_liked <> movie
+            WITH CASE WHEN movie.external_id < co_liked.external_id
+                    THEN [movie, co_liked] ELSE [co_liked, movie] END AS pair
+            WITH pair[0] AS first, pair[1] AS second
+            MERGE (first)-[co:CO_LIKED]->(second)
+            ON CREATE SET co.count = 0
+            SET co.count = co.count + 1
+            RETURN count(co) as co_liked_count
+        }
+        RETURN user.external_id as user_external_id,
+            liked.at as liked_timestamp,
+            movie.external_id as external_id
+    }
+    RETURN user_external_id, liked_timestamp, external_id
+"""
+
+BULK_DELETE_LIKED_RELATIONSHIPS_WITH_CO_LIKES = """
+    UNWIND $unlikes AS unlike
+    CALL {
+        WITH unlike
+        MATCH (user:User {external_id: unlike.user_external_id})
+        SET user._lock = true
+        REMOVE user._lock
+        WITH unlike, user
+        MATCH (user)-[liked:LIKED]->(movie:Movie {external_id: unlike.movie_external_id})
+        DELETE liked
+        WITH user, movie
+        MATCH (user)-[:LIKED]->(co_liked:Movie)
+        MATCH (movie)-[co:CO_LIKED]-(co_liked)
+        SET co.count = co.count - 1
+        WITH co
+        WHERE co.count <= 0
+        DELETE co
+        RETURN count(*) as deleted_co_liked_count
+    }
+    RETURN sum(deleted_co_liked_count) as deleted_co_liked_count
+"""
+
+GET_CO_LIKED_RECOMMENDATIONS = """
+    CALL {
+        MATCH (user:User {external_id: $user_external_id})-[liked:LIKED]->(recent_liked:Movie)
+        RETURN user, recent_liked ORDER BY liked.at DESC LIMIT $recent_liked_count
+    }
+    MATCH (recent_liked)-[co:CO_LIKED]-(recommended_movies:Movie)
+    WHERE NOT (user)-[:LIKED]->(recommended_movies)
+    WITH recommended_movies, sum(co.count) as score
+    RETURN
+        recommended_movies.external_id as external_id,
+        recommended_movies.title as title
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+DELETE_CO_LIKED_RELATIONSHIPS = """
+    MATCH ()-[co:CO_LIKED]->()
+    WITH co LIMIT $limit
+    DELETE co
+    RETURN count(co) as deleted_count
+"""
+
+CREATE_CO_LIKED_RELATIONSHIPS = """
+    UNWIND $movie_external_ids AS movie_external_id
+    MATCH (movie:Movie {external_id: movie_external_id})<-[:LIKED]-(:User)-[:LIKED]->(co_liked:Movie)
+    WHERE movie.external_id < co_liked.external_id
+    WITH movie, co_liked, count(*) as count
+    CREATE (movie)-[:CO_LIKED {count: count}]->(co_liked)
+"""
+
+GET_INCONSISTENT_CO_LIKED_RELATIONSHIPS = """
+    UNWIND $movie_external_ids AS movie_external_id
+    MATCH (movie:Movie {external_id: movie_external_id})
+    CALL {
+        WITH movie
+        MATCH (movie)<-[:LIKED]-(:User)-[:LIKED]->(co_liked:Movie)
+        RETURN co_liked, count(*) as actual_count
+        UNION
+        WITH movie
+        MATCH (movie)-[:CO_LIKED]-(co_liked:Movie)
+        RETURN co_liked, 0 as actual_count
+    }
+    WITH movie, co_liked, max(actual_count) as actual_count
+    OPTIONAL MATCH (movie)-[co:CO_LIKED]-(co_liked)
+    WITH movie, co_liked, actual_count, coalesce(co.count, 0) as stored_count
+    WHERE actual_count <> stored_count
+    RETURN
+        movie.external_id as external_id,
+        co_liked.external_id as co_liked_external_id,
+        stored_count,
+        actual_count
+"""
+
+GET_LIKED_RELATIONSHIPS = """
+    MATCH (user:User)-[:LIKED]->(movie:Movie)
+    RETURN
+        user.external_id as user_external_id,
+        movie.external_id as movie_external_id,
+        movie.title as title
+"""
@@ -0,0 +1,31 @@
+"""This module provides HTTP caching helpers for static responses."""
+
+import hashlib
+from http import HTTPStatus
+
+from werkzeug.http import quote_etag
+
+from app import APP_CONFIG
+
+
+def make_etag(*parts):
+    """Return strong etag built from parts that identify response representation."""
+    return hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def is_not_modified(if_none_match, etag):
+    """Return whether client already has response with provided etag."""
+    return if_none_match.contains(etag)
+
+
+def make_cache_headers(etag):
+    """Return ETag and Cache-Control headers."""
+    return {
+        "ETag": quote_etag(etag),
+        "Cache-Control": f"public, max-age={APP_CONFIG.HTTP_CACHE_MAX_AGE}",
+    }
+
+
+def make_not_modified_response(etag):
+    """Return empty 304 response with cache headers."""
+    return "", HTTPStatus.NOT_MODIFIED, make_cache_headers(etag)
@@ -1,10 +1,12 @@
 """This module provides helper functionality with JWT."""
 
+from http import HTTPStatus
 
 import jwt
 
 from app import APP_CONFIG
 from app.exceptions import TokenError
+from app.utils.response import make_response
 
 
 def decode_token(token):
@@ -15,3 +17,25 @@ def decode_token(token):
         raise TokenError("The token is invalid.")
     except jwt.ExpiredSignatureError:
         raise TokenError("The token has expired.")
+
+
+def authenticate(authorization):
+    """Return user id of authorization header and None, or None and UNAUTHORIZED response."""
+    if not authorization:
+        return None, make_response(
+            success=False,
+            message="You aren't authorized. Please provide authorization token.",
+            http_status=HTTPStatus.UNAUTHORIZED,
+        )
+
+    token = authorization.split("Bearer ")[-1]
+    try:
+        payload = decode_token(token)
+    except TokenError as err:
+        return None, make_response(
+            success=False,
+            message=f"Wrong credentials. {str(err)}",
+            http_status=HTTPStatus.UNAUTHORIZED,
+        )
+
+    return payload["user_id"], None
@@ -0,0 +1,78 @@
+"""This module provides cursor pagination over ranked lists."""
+
+import base64
+import binascii
+import hashlib
+import json
+
+from app.constants import EXTERNAL_ID_FIELD
+from app.exceptions import PaginationError
+
+
+CURSOR_PARAM = "cursor"
+PAGE_SIZE_PARAM = "page_size"
+OFFSET_FIELD = "offset"
+VERSION_FIELD = "version"
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+def get_list_version(ranked):
+    """Return fingerprint of order of ranked list items."""
+    external_ids = "\x1f".join(str(item[EXTERNAL_ID_FIELD]) for item in ranked)
+    return hashlib.sha1(external_ids.encode()).hexdigest()[:16]
+
+
+def encode_cursor(offset, version):
+    """Return opaque cursor pointing to provided offset of provided ranked list version."""
+    payload = json.dumps({OFFSET_FIELD: offset, VERSION_FIELD: version}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor):
+    """Return offset and ranked list version from opaque cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset, version = payload[OFFSET_FIELD], payload[VERSION_FIELD]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise PaginationError("The cursor is invalid.")
+
+    if not isinstance(offset, int) or offset < 0 or not isinstance(version, str):
+        raise PaginationError("The cursor is invalid.")
+
+    return offset, version
+
+
+def is_paginated_request(args):
+    """Return whether request query params ask for cursor pagination."""
+    return CURSOR_PARAM in args or PAGE_SIZE_PARAM in args
+
+
+def get_page_params(args):
+    """Return offset, page size and ranked list version from request query params."""
+    cursor = args.get(CURSOR_PARAM, type=str, default=None)
+    page_size = args.get(PAGE_SIZE_PARAM, type=int, default=DEFAULT_PAGE_SIZE)
+    if not 0 < page_size <= MAX_PAGE_SIZE:
+        raise PaginationError(f"The page_size must be between 1 and {MAX_PAGE_SIZE}.")
+
+    offset, version = decode_cursor(cursor) if cursor else (0, None)
+    return offset, page_size, version
+
+
+def paginate(ranked, offset, page_size, version=None):
+    """Return page of ranked list and pagination info with cursor of the next page.
+
+    Cursor of a page of another version of the list raises PaginationError, as its
+    offset may skip or repeat items of the current one.
+    """
+    list_version = get_list_version(ranked)
+    if version is not None and version != list_version:
+        raise PaginationError("The cursor is outdated, the list has changed. Restart pagination.")
+
+    page = ranked[offset:offset + page_size]
+    next_offset = offset + page_size
+    next_cursor = (
+        encode_cursor(next_offset, list_version) if next_offset < len(ranked) else None
+    )
+    return page, {"next_cursor": next_cursor, "page_size": page_size}
@@ -1,9 +1,34 @@
-"""This module provides response utility."""
+"""This module provides response utility shared by sync and asyncio serving modes."""
 
-from flask import jsonify
+import json
 
+from app.metrics import METRICS, SERIALIZE_DURATION_METRIC
 
-def make_response(success, http_status, data=None, message=None):
-    """Return formatted json response."""
-    json_result = jsonify({"success": success, "message": message, "data": data})
-    return json_result, http_status
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def format_response(success, data=None, message=None, pagination=None):
+    """Return response envelope."""
+    result = {"success": success, "message": message, "data": data}
+    if pagination is not None:
+        result["pagination"] = pagination
+
+    return result
+
+
+def make_response(success, http_status, data=None, message=None, pagination=None, headers=None):
+    """Return formatted json response, serialized the same way as by jsonify."""
+    with METRICS.timer(SERIALIZE_DURATION_METRIC):
+        body = json.dumps(
+            format_response(success, data, message, pagination),
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+
+    return f"{body}\n", http_status, {**(headers or {}), "Content-Type": JSON_CONTENT_TYPE}
+
+
+def make_error_response(err, http_status):
+    """Return json response with message of provided error."""
+    return make_response(success=False, message=str(err), http_status=http_status)
@@ -0,0 +1,54 @@
+"""This module provides validation of request bodies."""
+
+from app import APP_CONFIG
+from app.constants import LIKE_ACTION, UNLIKE_ACTION
+from app.exceptions import ValidationError
+
+
+MOVIE_IDS_FIELD = "movie_ids"
+OPERATIONS_FIELD = "operations"
+MOVIE_ID_FIELD = "movie_id"
+ACTION_FIELD = "action"
+
+
+def get_batch_movie_ids(body):
+    """Return deduplicated movies external ids of batch request body in requested order."""
+    movie_ids = body.get(MOVIE_IDS_FIELD) if isinstance(body, dict) else None
+    if not isinstance(movie_ids, list) or not movie_ids:
+        raise ValidationError(f"Required field {MOVIE_IDS_FIELD} must be non-empty list.")
+
+    if not all(isinstance(movie_id, str) for movie_id in movie_ids):
+        raise ValidationError(f"The {MOVIE_IDS_FIELD} must contain only strings.")
+
+    movie_ids = list(dict.fromkeys(movie_ids))
+    if len(movie_ids) > APP_CONFIG.MOVIE_BATCH_MAX_SIZE:
+        raise ValidationError(
+            f"The {MOVIE_IDS_FIELD} must contain at most {APP_CONFIG.MOVIE_BATCH_MAX_SIZE} ids."
+        )
+
+    return movie_ids
+
+
+def get_like_operations(body):
+    """Return movies external ids and actions of bulk like request body in requested order."""
+    operations = body.get(OPERATIONS_FIELD) if isinstance(body, dict) else None
+    if not isinstance(operations, list) or not operations:
+        raise ValidationError(f"Required field {OPERATIONS_FIELD} must be non-empty list.")
+
+    if len(operations) > APP_CONFIG.LIKE_BULK_MAX_SIZE:
+        raise ValidationError(
+            f"The {OPERATIONS_FIELD} must contain at most {APP_CONFIG.LIKE_BULK_MAX_SIZE} items."
+        )
+
+    for operation in operations:
+        if (
+            not isinstance(operation, dict)
+            or not isinstance(operation.get(MOVIE_ID_FIELD), str)
+            or operation.get(ACTION_FIELD) not in (LIKE_ACTION, UNLIKE_ACTION)
+        ):
+            raise ValidationError(
+                f"Every operation must contain {MOVIE_ID_FIELD} string and "
+                f"{ACTION_FIELD} equal to {LIKE_ACTION} or {UNLIKE_ACTION}."
+            )
+
+    return [(operation[MOVIE_ID_FIELD], operation[ACTION_FIELD]) for operation in operations]
@@ -0,0 +1,24 @@
+"""This package contains views shared by sync and asyncio serving modes."""
+
+from http import HTTPStatus
+
+from app import APP_CONFIG
+
+
+API_URL_PREFIX = "/api/v1"
+
+
+def register_api(app, index, movie):
+    """Register blueprints, error handlers and request hooks of serving mode api modules."""
+    app.register_blueprint(index.internal_blueprint, url_prefix=API_URL_PREFIX)
+    app.register_blueprint(movie.movies_blueprint, url_prefix=API_URL_PREFIX)
+
+    app.register_error_handler(HTTPStatus.NOT_FOUND, index.handle_404)
+    app.register_error_handler(HTTPStatus.METHOD_NOT_ALLOWED, index.handle_405)
+    app.register_error_handler(HTTPStatus.INTERNAL_SERVER_ERROR, index.handle_500)
+
+    app.config.from_object(APP_CONFIG)
+
+    app.before_request(index.start_request_timer)
+    app.before_request(index.validate_body)
+    app.after_request(index.observe_request_duration)
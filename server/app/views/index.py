@@ -0,0 +1,99 @@
+"""This module provides basic server views shared by sync and asyncio serving modes."""
+
+import logging
+import time
+from http import HTTPStatus
+
+from app.cache import RECOMMENDATION_CACHE
+from app.coalescing import SINGLE_FLIGHT
+from app.metrics import METRICS, REQUEST_DURATION_METRIC, ERRORS_METRIC
+from app.utils.response import make_response
+
+
+LOGGER = logging.getLogger(__name__)
+SAFE_REQUEST_METHODS = ("GET", "HEAD", "OPTIONS")
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "unmatched"
+
+
+def health(url):
+    """Return health OK http status."""
+    return make_response(success=True, message=f"OK. URL: {str(url)}", http_status=HTTPStatus.OK)
+
+
+def cache_stats():
+    """Return recommendation cache hits and misses counters."""
+    return make_response(success=True, data=RECOMMENDATION_CACHE.stats(), http_status=HTTPStatus.OK)
+
+
+def coalescing_stats():
+    """Return counters of backend calls and calls coalesced with identical in-flight ones."""
+    return make_response(success=True, data=SINGLE_FLIGHT.stats(), http_status=HTTPStatus.OK)
+
+
+def metrics():
+    """Return latency histograms, error counters and pool gauges in prometheus text format."""
+    return METRICS.render(), HTTPStatus.OK, {"Content-Type": METRICS_CONTENT_TYPE}
+
+
+def observe_request_duration(request, started_at, response):
+    """Observe duration of request by route, method and response status."""
+    if started_at is not None:
+        METRICS.observe(
+            REQUEST_DURATION_METRIC,
+            time.perf_counter() - started_at,
+            route=request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE,
+            method=request.method,
+            status=response.status_code,
+        )
+
+    return response
+
+
+def is_body_required(method):
+    """Return whether request json body is required for request method."""
+    return method not in SAFE_REQUEST_METHODS
+
+
+def validate_body(body):
+    """Validate request json body of request which requires it."""
+    if body is None:
+        return make_response(
+            success=False,
+            message="Wrong input. Couldn't found json body.",
+            http_status=HTTPStatus.BAD_REQUEST,
+        )
+
+
+def not_found(path):
+    """Return custom response for 404 http status code."""
+    return make_response(
+        success=False,
+        message=f"The endpoint ({path}) you are trying to access could not be found on the server.",
+        http_status=HTTPStatus.NOT_FOUND,
+    )
+
+
+def method_not_allowed(method):
+    """Return custom response for 405 http status code."""
+    return make_response(
+        success=False,
+        message=f"The method ({method}) you are trying to use for this URL is not supported.",
+        http_status=HTTPStatus.METHOD_NOT_ALLOWED,
+    )
+
+
+def server_error(error, url):
+    """Return custom response for 500 http status code."""
+    LOGGER.error("Unhandled 500x error: %s", error)
+    METRICS.increment(
+        ERRORS_METRIC,
+        source="unhandled",
+        error=type(getattr(error, "original_exception", None) or error).__name__,
+    )
+
+    return make_response(
+        success=False,
+        message=f"Something has gone wrong on the server side (URL - {str(url)}). Please, try again later.",
+        http_status=HTTPStatus.INTERNAL_SERVER_ERROR,
+    )
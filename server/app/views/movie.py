@@ -0,0 +1,289 @@
+"""This module provides movies views shared by sync and asyncio serving modes.
+
+Views are coroutines taking movie model and request data. The sync app runs them
+with run_sync over Movie, the asyncio app awaits them over AsyncMovie.
+"""
+
+from http import HTTPStatus
+
+from app import APP_CONFIG
+from app.catalogue import get_catalogue_version
+from app.constants import (
+    LIKE_ACTION,
+    UNLIKE_ACTION,
+    EXTERNAL_ID_FIELD,
+    LIKED_TIMESTAMP_FIELD,
+    SIMILAR_ALGORITHM,
+)
+from app.exceptions import (
+    DatabaseError,
+    DBNoResultFoundError,
+    PaginationError,
+    ValidationError,
+)
+from app.likes import LIKE_BUFFER, collapse_like_operations, current_timestamp
+from app.utils.http_cache import (
+    make_etag,
+    is_not_modified,
+    make_cache_headers,
+    make_not_modified_response,
+)
+from app.utils.pagination import is_paginated_request, get_page_params, paginate
+from app.utils.response import make_response, make_error_response
+from app.utils.validation import get_batch_movie_ids, get_like_operations
+
+
+DEFAULT_LIMIT = 10
+
+
+def get_query(args):
+    """Return required query of request query params."""
+    query = args.get("query", type=str, default=None)
+    if not query:
+        raise ValidationError("Required field query is not provided in the query params.")
+
+    return query
+
+
+def get_limit(args, default=DEFAULT_LIMIT):
+    """Return positive limit of request query params."""
+    limit = args.get("limit", type=int, default=default)
+    if limit < 1:
+        raise ValidationError("Field limit of the query params must be positive.")
+
+    return limit
+
+
+async def get_ranked_items(args, get_top, get_ranked):
+    """Return page of ranked list and pagination if requested, or top limit items and None."""
+    if is_paginated_request(args):
+        offset, page_size, version = get_page_params(args)
+        return paginate(await get_ranked(), offset, page_size, version)
+
+    return await get_top(get_limit(args)), None
+
+
+async def get_user_liked_movies(model, user_id):
+    """Return movies liked by user."""
+    try:
+        liked_movies = await model.get_user_liked_movies(user_id)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(success=True, data=liked_movies, http_status=HTTPStatus.OK)
+
+
+async def apply_user_like_operations(model, user_id, body):
+    """Apply list of like and unlike operations of user in one transaction."""
+    try:
+        operations = get_like_operations(body)
+        at = current_timestamp()
+        likes, unlikes = collapse_like_operations(
+            (user_id, movie_id, action, at + position)
+            for position, (movie_id, action) in enumerate(operations)
+        )
+        created = await model.apply_like_operations(likes, unlikes)
+    except ValidationError as err:
+        return make_error_response(err, HTTPStatus.UNPROCESSABLE_ENTITY)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    liked = [
+        {
+            EXTERNAL_ID_FIELD: like[EXTERNAL_ID_FIELD],
+            LIKED_TIMESTAMP_FIELD: like[LIKED_TIMESTAMP_FIELD],
+        }
+        for like in created
+    ]
+    liked_movie_ids = {like[EXTERNAL_ID_FIELD] for like in created}
+    return make_response(
+        success=True,
+        data={
+            "liked": liked,
+            "unliked": [unlike["movie_external_id"] for unlike in unlikes],
+            "missing": [
+                like["movie_external_id"] for like in likes
+                if like["movie_external_id"] not in liked_movie_ids
+            ],
+        },
+        http_status=HTTPStatus.OK,
+    )
+
+
+async def search_movies(model, args):
+    """Return results from elastic search by provided query."""
+    try:
+        movies = await model.search_movies(get_query(args), limit=get_limit(args))
+    except ValidationError as err:
+        return make_error_response(err, HTTPStatus.UNPROCESSABLE_ENTITY)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(success=True, data=movies, http_status=HTTPStatus.OK)
+
+
+def get_suggest_timeout(args):
+    """Return positive suggest timeout of request query params capped by configured one."""
+    timeout = args.get("timeout", type=float, default=APP_CONFIG.SUGGEST_TIMEOUT)
+    if not timeout > 0:
+        raise ValidationError("Field timeout of the query params must be positive.")
+
+    return min(timeout, APP_CONFIG.SUGGEST_TIMEOUT)
+
+
+async def suggest_movies(model, args):
+    """Return movies with titles starting with provided query words."""
+    try:
+        limit = min(get_limit(args, APP_CONFIG.SUGGEST_MAX_LIMIT), APP_CONFIG.SUGGEST_MAX_LIMIT)
+        timeout = get_suggest_timeout(args)
+        movies = await model.suggest_movies(get_query(args), limit=limit, timeout=timeout)
+    except ValidationError as err:
+        return make_error_response(err, HTTPStatus.UNPROCESSABLE_ENTITY)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(success=True, data=movies, http_status=HTTPStatus.OK)
+
+
+async def get_movie(model, request, movie_id):
+    """Return movie data by provided movie external id."""
+    etag = make_etag(get_catalogue_version(), request.full_path)
+    if is_not_modified(request.if_none_match, etag):
+        return make_not_modified_response(etag)
+
+    try:
+        movie = await model.get_movie(movie_id)
+    except DBNoResultFoundError as err:
+        return make_error_response(err, HTTPStatus.NOT_FOUND)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(
+        success=True, data=movie, http_status=HTTPStatus.OK, headers=make_cache_headers(etag)
+    )
+
+
+async def get_movies_batch(model, body):
+    """Return movies data by provided movies external ids and list of missing ids."""
+    try:
+        movie_ids = get_batch_movie_ids(body)
+        movies = await model.get_movies(movie_ids)
+    except ValidationError as err:
+        return make_error_response(err, HTTPStatus.UNPROCESSABLE_ENTITY)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    missing = [movie_id for movie_id in movie_ids if movie_id not in movies]
+    return make_response(
+        success=True,
+        data={"movies": movies, "missing": missing},
+        http_status=HTTPStatus.OK,
+    )
+
+
+async def like_movie(model, user_id, movie_id):
+    """Create like for provided movie and user."""
+    if LIKE_BUFFER:
+        try:
+            await model.get_movie(movie_id)
+        except DatabaseError as err:
+            return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+        liked_timestamp = LIKE_BUFFER.add(user_id, movie_id, LIKE_ACTION)
+        return make_response(
+            success=True,
+            data=[{EXTERNAL_ID_FIELD: movie_id, LIKED_TIMESTAMP_FIELD: liked_timestamp}],
+            http_status=HTTPStatus.ACCEPTED,
+        )
+
+    try:
+        result = await model.create_liked_relationship(user_id, movie_id)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(success=True, data=result, http_status=HTTPStatus.CREATED)
+
+
+async def unlike_movie(model, user_id, movie_id):
+    """Delete like for provided movie and user."""
+    if LIKE_BUFFER:
+        LIKE_BUFFER.add(user_id, movie_id, UNLIKE_ACTION)
+        return make_response(success=True, http_status=HTTPStatus.ACCEPTED)
+
+    try:
+        await model.delete_liked_relationship(user_id, movie_id)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(success=True, http_status=HTTPStatus.NO_CONTENT)
+
+
+async def get_similar_movies(model, request, movie_id):
+    """Return list of similar movies to provided movie_id."""
+    try:
+        etag = make_etag(
+            model.get_ranking_version(SIMILAR_ALGORITHM),
+            APP_CONFIG.SIMILAR_MOVIES_BACKEND,
+            APP_CONFIG.SIMILAR_MOVIES_SCORING,
+            request.full_path,
+        )
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    if is_not_modified(request.if_none_match, etag):
+        return make_not_modified_response(etag)
+
+    try:
+        movies, pagination = await get_ranked_items(
+            request.args,
+            lambda limit: model.get_similar_movies(movie_id, limit=limit),
+            lambda: model.get_ranked_similar_movies(movie_id),
+        )
+    except (ValidationError, PaginationError) as err:
+        return make_error_response(err, HTTPStatus.UNPROCESSABLE_ENTITY)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(
+        success=True,
+        data=movies,
+        pagination=pagination,
+        http_status=HTTPStatus.OK,
+        headers=make_cache_headers(etag),
+    )
+
+
+async def get_collaborative_recommendations(model, user_id, args):
+    """Return collaborative recommendations for provided user."""
+    try:
+        movies, pagination = await get_ranked_items(
+            args,
+            lambda limit: model.get_collaborative_recommendations(user_id, limit=limit),
+            lambda: model.get_ranked_collaborative_recommendations(user_id),
+        )
+    except (ValidationError, PaginationError) as err:
+        return make_error_response(err, HTTPStatus.UNPROCESSABLE_ENTITY)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(
+        success=True, data=movies, pagination=pagination, http_status=HTTPStatus.OK
+    )
+
+
+async def get_content_based_recommendations(model, user_id, args):
+    """Return content-based recommendations for provided user."""
+    try:
+        movies, pagination = await get_ranked_items(
+            args,
+            lambda limit: model.get_content_based_recommendations(user_id, limit=limit),
+            lambda: model.get_ranked_content_based_recommendations(user_id),
+        )
+    except (ValidationError, PaginationError) as err:
+        return make_error_response(err, HTTPStatus.UNPROCESSABLE_ENTITY)
+    except DatabaseError as err:
+        return make_error_response(err, HTTPStatus.BAD_REQUEST)
+
+    return make_response(
+        success=True, data=movies, pagination=pagination, http_status=HTTPStatus.OK
+    )
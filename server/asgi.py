@@ -0,0 +1,33 @@
+"""This module is entrypoint of app in asyncio serving mode.
+
+Run it with an ASGI server, e.g. `hypercorn asgi:app --bind 0.0.0.0:5555`.
+"""
+
+from quart import Quart
+from quart_cors import cors
+
+from app import APP_CONFIG
+from app.aio import ASYNC_NEO4J_DRIVER, close_async_drivers
+from app.aio.api import index, movie
+from app.metrics import register_pool_gauges
+from app.views import register_api
+
+
+def create_app():
+    """Create the quart application and initialize it."""
+    app = Quart(__name__)
+    app = cors(app)
+
+    register_api(app, index, movie)
+    app.after_serving(close_async_drivers)
+
+    register_pool_gauges(neo4j_driver=ASYNC_NEO4J_DRIVER)
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    app.run(host=APP_CONFIG.SERVER_HOST, port=APP_CONFIG.SERVER_PORT)
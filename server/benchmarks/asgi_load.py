@@ -0,0 +1,277 @@
+"""This module load tests sync and asyncio serving modes against local database stand-ins.
+
+Every serving mode runs in its own process with Neo4j driver replaced by stand-in
+which waits provided latency before returning canned records, so the recommendation
+endpoints are I/O bound the same way for both modes. The report includes throughput
+and requests per second of server CPU time.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import resource
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import jwt
+import numpy as np
+
+
+SYNC_MODE = "sync"
+ASYNC_MODE = "async"
+
+HOST = "127.0.0.1"
+ENDPOINTS = (
+    "/api/v1/movies/recommendations/collaborative",
+    "/api/v1/movies/recommendations/content-based",
+    "/api/v1/movies/{movie_id}/similar",
+)
+JWT_SECRET_KEY = "load-test"
+
+
+def make_records(limit):
+    """Return canned movies records."""
+    return [{"external_id": f"tt{row:07d}", "title": f"Movie {row}"} for row in range(limit)]
+
+
+class StandInSummary:
+    """Class that represents summary of stand-in query without server timings and plan."""
+
+    result_available_after = None
+    result_consumed_after = None
+    profile = None
+
+
+class StandInResult:
+    """Class that represents result of stand-in query."""
+
+    def __init__(self, records):
+        """Initialize result with its records."""
+        self.records = records
+
+    def data(self):
+        """Return records as dicts."""
+        return self.records
+
+    def consume(self):
+        """Return summary of query."""
+        return StandInSummary()
+
+
+class StandInSession:
+    """Class that represents Neo4j session which waits latency on every query."""
+
+    def __init__(self, latency):
+        """Initialize session with latency of query in seconds."""
+        self.latency = latency
+
+    def __enter__(self):
+        """Return session."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close session."""
+
+    def run(self, query, **parameters):
+        """Wait latency and return canned records."""
+        time.sleep(self.latency)
+        return StandInResult(make_records(parameters.get("limit", 10)))
+
+
+class AsyncStandInResult(StandInResult):
+    """Class that represents result of async stand-in query."""
+
+    async def data(self):
+        """Return records as dicts."""
+        return self.records
+
+    async def consume(self):
+        """Return summary of query."""
+        return StandInSummary()
+
+
+class AsyncStandInSession(StandInSession):
+    """Class that represents async Neo4j session which waits latency on every query."""
+
+    async def __aenter__(self):
+        """Return session."""
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Close session."""
+
+    async def run(self, query, **parameters):
+        """Wait latency and return canned records."""
+        await asyncio.sleep(self.latency)
+        return AsyncStandInResult(make_records(parameters.get("limit", 10)))
+
+
+class StandInDriver:
+    """Class that represents Neo4j driver creating stand-in sessions."""
+
+    def __init__(self, session_class, latency):
+        """Initialize driver with session class and latency of query in seconds."""
+        self.session_class = session_class
+        self.latency = latency
+
+    def session(self):
+        """Return new stand-in session."""
+        return self.session_class(self.latency)
+
+
+def configure_environment():
+    """Set config of served app: disabled caches and cypher backends."""
+    os.environ["JWT_SECRET_KEY"] = JWT_SECRET_KEY
+    os.environ["RECOMMENDATION_CACHE_BACKEND"] = "none"
+    os.environ["SIMILAR_MOVIES_BACKEND"] = "cypher"
+    os.environ["CONTENT_BASED_BACKEND"] = "cypher"
+    os.environ["COLLABORATIVE_BACKEND"] = "cypher"
+
+
+def serve_sync(port, latency, threads):
+    """Serve flask app with bounded pool of worker threads."""
+    configure_environment()
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    from werkzeug.serving import BaseWSGIServer
+
+    from app.models.movie import Movie
+    from app.storage import Neo4jStorageBackend
+    from run import create_app
+
+    class ThreadPoolWSGIServer(BaseWSGIServer):
+        """Class that represents WSGI server handling requests in bounded threads pool."""
+
+        executor = ThreadPoolExecutor(max_workers=threads)
+
+        def process_request(self, request, client_address):
+            """Handle request in pool thread."""
+            self.executor.submit(self.process_request_thread, request, client_address)
+
+        def process_request_thread(self, request, client_address):
+            """Handle request and close its connection."""
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    Movie.storage = Neo4jStorageBackend(StandInDriver(StandInSession, latency))
+    ThreadPoolWSGIServer(HOST, port, create_app()).serve_forever()
+
+
+def serve_async(port, latency):
+    """Serve quart app with hypercorn in single event loop."""
+    configure_environment()
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    from app.aio.models.movie import AsyncMovie
+    from app.aio.storage import AsyncNeo4jStorageBackend
+    from asgi import app
+
+    AsyncMovie.storage = AsyncNeo4jStorageBackend(StandInDriver(AsyncStandInSession, latency))
+    config = Config()
+    config.bind = [f"{HOST}:{port}"]
+    config.accesslog = None
+    asyncio.run(serve(app, config))
+
+
+def wait_for_port(port, timeout=30):
+    """Wait until server accepts connections on provided port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+
+    raise TimeoutError(f"The server did not start on port {port}.")
+
+
+async def run_load(port, concurrency, duration, users):
+    """Return latencies in milliseconds and count of failed requests."""
+    tokens = [
+        jwt.encode({"user_id": f"user-{user}"}, JWT_SECRET_KEY, algorithm="HS256")
+        for user in range(users)
+    ]
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+
+    async def worker(worker_id):
+        nonlocal errors
+        sent = 0
+        while time.monotonic() < deadline:
+            path = ENDPOINTS[sent % len(ENDPOINTS)].format(movie_id=f"tt{sent:07d}")
+            token = tokens[(worker_id + sent) % len(tokens)]
+            started_at = time.perf_counter()
+            try:
+                async with session.get(
+                    f"http://{HOST}:{port}{path}",
+                    headers={"Authorization": f"Bearer {token}"},
+                ) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            sent += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency, force_close=True)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+
+    return latencies, errors
+
+
+def benchmark(mode, args):
+    """Run server of provided mode under load and print its throughput."""
+    context = multiprocessing.get_context("spawn")
+    if mode == SYNC_MODE:
+        process = context.Process(target=serve_sync, args=(args.port, args.latency, args.threads))
+    else:
+        process = context.Process(target=serve_async, args=(args.port, args.latency))
+
+    process.start()
+    try:
+        wait_for_port(args.port)
+        cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        latencies, errors = asyncio.run(
+            run_load(args.port, args.concurrency, args.duration, args.users)
+        )
+    finally:
+        process.terminate()
+        process.join()
+
+    cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_seconds = (
+        cpu_after.ru_utime + cpu_after.ru_stime - cpu_before.ru_utime - cpu_before.ru_stime
+    )
+    p50, p99 = np.percentile(latencies, (50, 99))
+    throughput = len(latencies) / args.duration
+    print(
+        f"{mode:<6} requests={len(latencies):<7} errors={errors:<5} "
+        f"rps={throughput:9.1f} p50={p50:8.2f}ms p99={p99:8.2f}ms "
+        f"server_cpu={cpu_seconds:6.2f}s rps_per_core={len(latencies) / cpu_seconds:9.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test sync and asyncio serving modes.")
+    parser.add_argument("--modes", nargs="+", default=(SYNC_MODE, ASYNC_MODE))
+    parser.add_argument("--port", type=int, default=5556)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in query latency.")
+    parser.add_argument("--threads", type=int, default=32, help="Threads of sync server.")
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        benchmark(mode, args)
@@ -0,0 +1,418 @@
+"""This module benchmarks every endpoint of the app created by run.create_app.
+
+Requests are sent through flask test clients from a pool of threads at several
+concurrency levels, so the whole request path runs except the network. Backends:
+
+* live (default): app drivers connected to local Neo4j and ES containers, --load-fixture
+  loads benchmarks/fixtures/imdb.csv with likes of fixture users into them and
+  --record saves responses of storage backend and es client into a file;
+* replay: storage backend and es client are replaced by fakes returning recorded
+  responses, so only python overhead of the request path is measured. The same
+  config and the same or smaller --requests as in the recording run have to be
+  used. Recordings are local and not committed, so record them first with
+  --backend live --record.
+
+Caches are disabled unless --caches is provided. Results are written as json and
+can be compared with results of previous run with --compare.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import numpy as np
+
+
+LIVE_BACKEND = "live"
+REPLAY_BACKEND = "replay"
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_CSV_PATH = os.path.join(BENCHMARKS_DIR, "fixtures", "imdb.csv")
+RECORDINGS_PATH = os.path.join(BENCHMARKS_DIR, "endpoints_recordings.json")
+RESULTS_PATH = os.path.join(BENCHMARKS_DIR, "endpoints_results.json")
+
+JWT_SECRET_KEY = "benchmark"
+FIXTURE_USERS_COUNT = 20
+BATCH_SIZE = 10
+DEFAULT_CONCURRENCY_LEVELS = (1, 8, 32)
+DEFAULT_TOLERANCE = 0.2
+BENCHMARKED_BLUEPRINTS = ("pl-movies", "ct-internal")
+IGNORED_METHODS = ("HEAD", "OPTIONS")
+VOLATILE_FIELDS = ("at",)
+
+Endpoint = namedtuple("Endpoint", ("method", "rule", "query", "make_body", "authorized"))
+
+ENDPOINTS = (
+    Endpoint("GET", "/api/v1/health", "", None, False),
+    Endpoint("GET", "/api/v1/cache", "", None, False),
+    Endpoint("GET", "/api/v1/coalescing", "", None, False),
+    Endpoint("GET", "/api/v1/metrics", "", None, False),
+    Endpoint("GET", "/api/v1/user/movies", "", None, True),
+    Endpoint(
+        "POST",
+        "/api/v1/user/likes",
+        "",
+        lambda movie_ids: {
+            "operations": [
+                {"movie_id": movie_ids[0], "action": "like"},
+                {"movie_id": movie_ids[1], "action": "unlike"},
+            ],
+        },
+        True,
+    ),
+    Endpoint("GET", "/api/v1/movies", "query=city", None, False),
+    Endpoint("GET", "/api/v1/movies/suggest", "query=cit", None, False),
+    Endpoint("GET", "/api/v1/movies/<movie_id>", "", None, False),
+    Endpoint(
+        "POST",
+        "/api/v1/movies/batch",
+        "",
+        lambda movie_ids: {"movie_ids": movie_ids[:BATCH_SIZE]},
+        False,
+    ),
+    Endpoint("POST", "/api/v1/movies/<movie_id>/like", "", lambda movie_ids: {}, True),
+    Endpoint("DELETE", "/api/v1/movies/<movie_id>/like", "", lambda movie_ids: {}, True),
+    Endpoint("GET", "/api/v1/movies/<movie_id>/similar", "limit=10", None, False),
+    Endpoint("GET", "/api/v1/movies/recommendations/collaborative", "limit=10", None, True),
+    Endpoint("GET", "/api/v1/movies/recommendations/content-based", "limit=10", None, True),
+)
+
+
+def get_endpoint_name(endpoint):
+    """Return name of endpoint used in report and results."""
+    return f"{endpoint.method} {endpoint.rule}"
+
+
+def strip_volatile_fields(value):
+    """Return value without fields which differ between runs, e.g. like timestamps."""
+    if isinstance(value, dict):
+        return {
+            key: strip_volatile_fields(item)
+            for key, item in value.items() if key not in VOLATILE_FIELDS
+        }
+    if isinstance(value, (list, tuple)):
+        return [strip_volatile_fields(item) for item in value]
+
+    return value
+
+
+def make_recording_key(*args):
+    """Return key of recorded response for method name and its arguments."""
+    return json.dumps(strip_volatile_fields(args), sort_keys=True, default=str)
+
+
+class RecordingStorageBackend:
+    """Class that records responses of wrapped storage backend."""
+
+    def __init__(self, backend, recordings):
+        """Initialize recorder of backend responses into recordings dict."""
+        self.backend = backend
+        self.recordings = recordings
+
+    def __getattr__(self, name):
+        """Return method of wrapped backend which records its responses."""
+        method = getattr(self.backend, name)
+
+        def call(*args, **kwargs):
+            """Record and return response of wrapped backend method."""
+            result = method(*args, **kwargs)
+            self.recordings[make_recording_key(name, args, kwargs)] = result
+            return result
+
+        return call
+
+
+class ReplayStorageBackend:
+    """Class that represents storage backend returning recorded responses."""
+
+    def __init__(self, recordings):
+        """Initialize backend with recorded responses."""
+        self.recordings = recordings
+
+    def __getattr__(self, name):
+        """Return method returning recorded response of provided arguments."""
+
+        def call(*args, **kwargs):
+            """Return recorded response, raise KeyError if it was not recorded."""
+            return self.recordings[make_recording_key(name, args, kwargs)]
+
+        return call
+
+
+class RecordingEsClient:
+    """Class that records search responses of wrapped elasticsearch client."""
+
+    def __init__(self, client, recordings):
+        """Initialize recorder of client responses into recordings dict."""
+        self.client = client
+        self.recordings = recordings
+
+    def search(self, **kwargs):
+        """Record and return search response."""
+        result = self.client.search(**kwargs)
+        self.recordings[make_recording_key("search", kwargs)] = result
+        return result
+
+
+class ReplayEsClient:
+    """Class that represents elasticsearch client returning recorded search responses."""
+
+    def __init__(self, recordings):
+        """Initialize client with recorded responses."""
+        self.recordings = recordings
+
+    def search(self, **kwargs):
+        """Return recorded search response, raise KeyError if it was not recorded."""
+        return self.recordings[make_recording_key("search", kwargs)]
+
+
+def configure_environment(caches):
+    """Set config of benchmarked app unless it is provided in environment."""
+    os.environ["JWT_SECRET_KEY"] = JWT_SECRET_KEY
+    os.environ.setdefault("ES_MOVIE_INDEX_REPLICAS", "0")
+    os.environ.setdefault("LIKE_BUFFER_ENABLED", "false")
+    if not caches:
+        os.environ.setdefault("RECOMMENDATION_CACHE_BACKEND", "none")
+        os.environ.setdefault("MOVIE_CACHE_SIZE", "0")
+
+
+def load_fixture(reset):
+    """Load fixture catalogue and likes into local neo4j and es."""
+    from app import APP_CONFIG, NEO4J_DRIVER
+    from benchmarks import query_plans
+    from data.es import es_build_movie_index
+
+    with NEO4J_DRIVER.session() as session:
+        if session.run(query_plans.COUNT_NODES).single()["count"]:
+            if not reset:
+                sys.exit("The database is not empty, use --reset to replace its data.")
+            session.run(query_plans.DELETE_ALL).consume()
+
+        query_plans.load_fixture(session)
+
+    with tempfile.TemporaryDirectory() as directory:
+        es_build_movie_index(
+            FIXTURE_CSV_PATH,
+            os.path.join(directory, "es_ingestion.checkpoint"),
+            APP_CONFIG.ES_DATABASE_MOVIE_INDEX,
+            restart=True,
+        )
+
+
+def install_backends(backend, recordings_path, record):
+    """Replace storage backend and es client of app, return recordings to save or None."""
+    from app.es import ElasticSearchDriver
+    from app.models.movie import Movie
+
+    if backend == REPLAY_BACKEND:
+        if not os.path.exists(recordings_path):
+            sys.exit(
+                f"The recordings {recordings_path} do not exist. Record them with "
+                "--backend live --record before replaying."
+            )
+
+        with open(recordings_path) as file:
+            recordings = json.load(file)
+        Movie.storage = ReplayStorageBackend(recordings["storage"])
+        ElasticSearchDriver.driver = ReplayEsClient(recordings["es"])
+        return None
+
+    if not record:
+        return None
+
+    recordings = {"storage": {}, "es": {}}
+    Movie.storage = RecordingStorageBackend(Movie.storage, recordings["storage"])
+    ElasticSearchDriver.driver = RecordingEsClient(ElasticSearchDriver.driver, recordings["es"])
+    return recordings
+
+
+def check_coverage(app):
+    """Raise ValueError if some routes of benchmarked blueprints have no endpoint."""
+    routes = {
+        (method, rule.rule)
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint.split(".")[0] in BENCHMARKED_BLUEPRINTS
+        for method in rule.methods - set(IGNORED_METHODS)
+    }
+    missing = sorted(routes - {(endpoint.method, endpoint.rule) for endpoint in ENDPOINTS})
+    if missing:
+        raise ValueError(
+            "Endpoints are not provided for: "
+            + ", ".join(f"{method} {rule}" for method, rule in missing)
+        )
+
+
+def make_request(endpoint, movie_ids, index, tokens):
+    """Return path, json body and headers of request number index to endpoint."""
+    movie_id = movie_ids[index % len(movie_ids)]
+    path = endpoint.rule.replace("<movie_id>", movie_id)
+    if endpoint.query:
+        path = f"{path}?{endpoint.query}"
+
+    body = None
+    if endpoint.make_body is not None:
+        shifted = movie_ids[index % len(movie_ids):] + movie_ids[:index % len(movie_ids)]
+        body = endpoint.make_body(shifted)
+
+    headers = {}
+    if endpoint.authorized:
+        headers["Authorization"] = f"Bearer {tokens[index % len(tokens)]}"
+
+    return path, body, headers
+
+
+def run_level(app, endpoint, movie_ids, tokens, concurrency, requests_count, warmup):
+    """Send requests to endpoint from concurrent threads and return its result."""
+    local = threading.local()
+
+    def send(index):
+        """Send request and return its latency in milliseconds and status code."""
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+
+        path, body, headers = make_request(endpoint, movie_ids, index, tokens)
+        started_at = time.perf_counter()
+        response = client.open(path, method=endpoint.method, json=body, headers=headers)
+        return (time.perf_counter() - started_at) * 1000, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(warmup)))
+        started_at = time.perf_counter()
+        responses = list(executor.map(send, range(requests_count)))
+        elapsed = time.perf_counter() - started_at
+
+    latencies = [latency for latency, _ in responses]
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99))
+    return {
+        "endpoint": get_endpoint_name(endpoint),
+        "concurrency": concurrency,
+        "requests": requests_count,
+        "errors": sum(status >= 500 for _, status in responses),
+        "client_errors": sum(400 <= status < 500 for _, status in responses),
+        "throughput": requests_count / elapsed,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+    }
+
+
+def report(result):
+    """Print throughput and latencies of endpoint at concurrency level."""
+    print(
+        f"{result['endpoint']:<55} c={result['concurrency']:<4} "
+        f"rps={result['throughput']:9.1f} p50={result['p50']:8.2f}ms "
+        f"p95={result['p95']:8.2f}ms p99={result['p99']:8.2f}ms "
+        f"errors={result['errors']} client_errors={result['client_errors']}"
+    )
+
+
+def compare(results, baseline, tolerance):
+    """Print results compared with baseline and return count of regressed results."""
+    expected_results = {
+        (result["endpoint"], result["concurrency"]): result for result in baseline["results"]
+    }
+    regressed = 0
+    for result in results:
+        expected = expected_results.get((result["endpoint"], result["concurrency"]))
+        status = "new"
+        if expected:
+            status = (
+                f"rps {result['throughput'] / expected['throughput'] - 1:+.1%} "
+                f"p99 {result['p99'] / expected['p99'] - 1:+.1%}"
+            )
+            if (
+                result["p99"] > expected["p99"] * (1 + tolerance)
+                or result["throughput"] < expected["throughput"] * (1 - tolerance)
+            ):
+                status = f"{status} regressed"
+                regressed += 1
+
+        print(f"{result['endpoint']:<55} c={result['concurrency']:<4} {status}")
+
+    return regressed
+
+
+def run_suite(args):
+    """Benchmark every endpoint at every concurrency level and return results."""
+    configure_environment(args.caches)
+    if args.load_fixture:
+        load_fixture(args.reset)
+
+    from data.imdb import read_movies_rows
+    from run import create_app
+
+    recordings = install_backends(args.backend, args.recordings, args.record)
+    app = create_app()
+    check_coverage(app)
+
+    movie_ids = list(read_movies_rows(FIXTURE_CSV_PATH))
+    tokens = [
+        jwt.encode({"user_id": f"user-{user}"}, JWT_SECRET_KEY, algorithm="HS256")
+        for user in range(1, FIXTURE_USERS_COUNT + 1)
+    ]
+    results = []
+    for endpoint in ENDPOINTS:
+        for concurrency in args.concurrency:
+            result = run_level(
+                app, endpoint, movie_ids, tokens, concurrency, args.requests, args.warmup
+            )
+            report(result)
+            results.append(result)
+
+    if recordings is not None:
+        with open(args.recordings, "w") as file:
+            json.dump(recordings, file)
+        print(f"Responses of {len(recordings['storage'])} storage calls and "
+              f"{len(recordings['es'])} searches were recorded to {args.recordings}.")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every endpoint of the app.")
+    parser.add_argument(
+        "--backend", choices=(LIVE_BACKEND, REPLAY_BACKEND), default=LIVE_BACKEND
+    )
+    parser.add_argument("--recordings", default=RECORDINGS_PATH)
+    parser.add_argument(
+        "--record", action="store_true", help="Record responses of live backends."
+    )
+    parser.add_argument(
+        "--load-fixture", action="store_true", help="Load fixture into live backends."
+    )
+    parser.add_argument(
+        "--reset", action="store_true",
+        help="Delete existing data of non-empty database before loading fixture.",
+    )
+    parser.add_argument("--caches", action="store_true", help="Keep app caches enabled.")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY_LEVELS
+    )
+    parser.add_argument("--requests", type=int, default=500, help="Requests per level.")
+    parser.add_argument("--warmup", type=int, default=20, help="Warmup requests per level.")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--compare", help="Results of previous run to compare with.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    suite_results = run_suite(args)
+    with open(args.output, "w") as file:
+        json.dump(
+            {"backend": args.backend, "caches": args.caches, "results": suite_results},
+            file,
+            indent=2,
+        )
+    print(f"Results of {len(suite_results)} runs were written to {args.output}.")
+
+    if args.compare:
+        with open(args.compare) as file:
+            if compare(suite_results, json.load(file), args.tolerance):
+                sys.exit(1)
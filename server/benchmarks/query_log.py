@@ -0,0 +1,83 @@
+"""This module shows sampled and slow cypher queries logged by app.profiling.
+
+Without --query it prints one line per query name with counts, latencies and
+the highest db hits. With --query it prints the slowest logged calls of the
+query with their parameters and profiled plans.
+"""
+
+import argparse
+import glob
+import json
+from collections import defaultdict
+
+import numpy as np
+
+from app import APP_CONFIG
+
+
+def read_entries(path):
+    """Return logged queries from log file and its rotated backups, the oldest first."""
+    backups = [
+        backup for backup in glob.glob(f"{glob.escape(path)}.*")
+        if backup.rsplit(".", 1)[1].isdigit()
+    ]
+    paths = sorted(backups, key=lambda backup: -int(backup.rsplit(".", 1)[1])) + [path]
+    entries = []
+    for log_path in paths:
+        try:
+            with open(log_path) as file:
+                entries.extend(json.loads(line) for line in file if line.strip())
+        except FileNotFoundError:
+            continue
+
+    return entries
+
+
+def report_queries(entries):
+    """Print counts, latencies and the highest db hits of every query name."""
+    grouped = defaultdict(list)
+    for entry in entries:
+        grouped[entry["query"]].append(entry)
+
+    for name, calls in sorted(
+        grouped.items(), key=lambda item: -max(call["duration"] for call in item[1])
+    ):
+        durations = [call["duration"] * 1000 for call in calls]
+        p50, p99 = np.percentile(durations, (50, 99))
+        db_hits = [call["db_hits"] for call in calls if "db_hits" in call]
+        print(
+            f"{name:<45} calls={len(calls):<6} "
+            f"profiled={sum(call['profiled'] for call in calls):<6} "
+            f"p50={p50:9.1f}ms p99={p99:9.1f}ms max={max(durations):9.1f}ms "
+            f"max_db_hits={max(db_hits) if db_hits else '-'}"
+        )
+
+
+def report_query(entries, name, limit):
+    """Print the slowest logged calls of query with their parameters and plans."""
+    calls = sorted(
+        (entry for entry in entries if entry["query"] == name),
+        key=lambda entry: -entry["duration"],
+    )
+    for call in calls[:limit]:
+        print(
+            f"duration={call['duration'] * 1000:.1f}ms rows={call['rows']} "
+            f"db_hits={call.get('db_hits', '-')} profiled={call['profiled']}"
+        )
+        print(f"  parameters: {json.dumps(call['parameters'])}")
+        for line in call.get("plan", ()):
+            print(f"    {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show sampled and slow cypher queries.")
+    parser.add_argument("--path", default=APP_CONFIG.QUERY_LOG_PATH)
+    parser.add_argument("--query", help="Name of query to show the slowest calls of.")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    logged_entries = read_entries(args.path)
+    if args.query:
+        report_query(logged_entries, args.query, args.limit)
+    else:
+        report_queries(logged_entries)
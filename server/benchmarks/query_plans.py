@@ -0,0 +1,241 @@
+"""This module profiles cypher queries against fixture catalogue and checks plan regressions.
+
+The harness loads benchmarks/fixtures/imdb.csv into local Neo4j, runs every query
+of app.utils.cypher_queries with PROFILE inside a rolled back transaction and
+compares total db hits and rows of its plan with the stored baseline. The first
+run records the baseline when it does not exist yet, later runs fail on regressed
+queries and queries missing in it. Record it again with --update-baseline after an
+intended plan change and commit benchmarks/query_plans.json.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from app import NEO4J_DRIVER
+from app.constants import RECENT_LIKED_MOVIES_COUNT
+from app.profiling import summarize_plan
+from app.utils import cypher_queries
+from data.co_liked import rebuild_co_liked_relationships, check_co_liked_counts
+from data.imdb import load_catalogue, read_movies_rows
+from data.similar import materialize_all
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_CSV_PATH = os.path.join(BENCHMARKS_DIR, "fixtures", "imdb.csv")
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "query_plans.json")
+
+FIXTURE_USERS_COUNT = 20
+FIXTURE_SIMILAR_TOP_N = 10
+DEFAULT_TOLERANCE = 0.1
+
+FIXTURE_MOVIE_ID = "tt0000001"
+FIXTURE_USER_ID = "user-1"
+
+COUNT_NODES = "MATCH (n) RETURN count(n) as count"
+DELETE_ALL = "MATCH (n) DETACH DELETE n"
+
+LOAD_LIKES = """
+    UNWIND $likes AS like
+    MATCH (movie:Movie {external_id: like.movie_external_id})
+    MERGE (user:User {external_id: like.user_external_id})
+    CREATE (user)-[:LIKED {at: like.at}]->(movie)
+"""
+
+
+def make_fixture_likes(movie_ids):
+    """Return deterministic likes of fixture users with increasing timestamps."""
+    likes = []
+    for user_index in range(1, FIXTURE_USERS_COUNT + 1):
+        for movie_index, movie_id in enumerate(movie_ids):
+            if (movie_index * 7 + user_index) % 5 == 0:
+                likes.append({
+                    "user_external_id": f"user-{user_index}",
+                    "movie_external_id": movie_id,
+                    "at": len(likes),
+                })
+
+    return likes
+
+
+def load_fixture(session):
+    """Load fixture catalogue, likes, co-likes and similar movies into empty database.
+
+    Co-likes and similar movies are built with data.co_liked and data.similar
+    maintenance jobs, so every harness run goes through their batch iteration.
+    """
+    load_catalogue(FIXTURE_CSV_PATH)
+    movie_ids = list(read_movies_rows(FIXTURE_CSV_PATH))
+
+    session.run(LOAD_LIKES, likes=make_fixture_likes(movie_ids)).consume()
+    rebuild_co_liked_relationships()
+    if check_co_liked_counts():
+        sys.exit("Rebuilt CO_LIKED relationships of fixture are inconsistent with likes.")
+
+    materialize_all(FIXTURE_SIMILAR_TOP_N)
+
+
+def get_queries_parameters():
+    """Return parameters of every profiled query run against fixture catalogue."""
+    movie = {"movie_external_id": FIXTURE_MOVIE_ID}
+    user = {"user_external_id": FIXTURE_USER_ID}
+    movie_ids = {"movie_external_ids": [FIXTURE_MOVIE_ID, "tt0000002", "tt0000003"]}
+    like = {**movie, "user_external_id": "user-2"}
+    bulk_likes = {
+        "likes": [
+            {"user_external_id": "user-2", "movie_external_id": movie_id, "at": at}
+            for at, movie_id in enumerate(movie_ids["movie_external_ids"])
+        ],
+    }
+    bulk_unlikes = {
+        "unlikes": [
+            {"user_external_id": "user-2", "movie_external_id": movie_id}
+            for movie_id in movie_ids["movie_external_ids"]
+        ],
+    }
+    return {
+        "GET_MOVIE": movie,
+        "GET_MOVIES": movie_ids,
+        "GET_USER_LIKED_MOVIES": user,
+        "GET_USER_LIKES": user,
+        "GET_SIMILAR_MOVIES": {**movie, "limit": 10},
+        "GET_SIMILAR_MOVIES_IDF": {**movie, "limit": 10, "max_degree": 5000},
+        "GET_MATERIALIZED_SIMILAR_MOVIES": {**movie, "limit": 10},
+        "GET_MOVIES_EXTERNAL_IDS": {"after_external_id": "", "limit": 1000},
+        "GET_SIMILAR_TO_REFERRERS": movie_ids,
+        "GET_MOVIES_SHARING_ENTITIES": {**movie_ids, "max_degree": 5000},
+        "REPLACE_SIMILAR_TO_RELATIONSHIPS": {
+            "similar_movies": [{
+                "external_id": FIXTURE_MOVIE_ID,
+                "recommendations": [{"external_id": "tt0000002", "score": 1}],
+            }],
+        },
+        "GET_CONTENT_BASED_RECOMMENDATIONS": {**user, "limit": 10},
+        "CREATE_LIKED_RELATIONSHIP": like,
+        "DELETE_LIKED_RELATIONSHIP": like,
+        "GET_COLLABORATIVE_RECOMMENDATIONS": {**user, "limit": 10},
+        "CREATE_LIKED_RELATIONSHIP_WITH_CO_LIKES": like,
+        "DELETE_LIKED_RELATIONSHIP_WITH_CO_LIKES": like,
+        "BULK_CREATE_LIKED_RELATIONSHIPS": bulk_likes,
+        "BULK_DELETE_LIKED_RELATIONSHIPS": bulk_unlikes,
+        "BULK_CREATE_LIKED_RELATIONSHIPS_WITH_CO_LIKES": bulk_likes,
+        "BULK_DELETE_LIKED_RELATIONSHIPS_WITH_CO_LIKES": bulk_unlikes,
+        "GET_CO_LIKED_RECOMMENDATIONS": {
+            **user, "limit": 10, "recent_liked_count": RECENT_LIKED_MOVIES_COUNT,
+        },
+        "DELETE_CO_LIKED_RELATIONSHIPS": {"limit": 1000},
+        "CREATE_CO_LIKED_RELATIONSHIPS": movie_ids,
+        "GET_INCONSISTENT_CO_LIKED_RELATIONSHIPS": movie_ids,
+        "GET_LIKED_RELATIONSHIPS": {},
+        "UPSERT_MOVIES": {
+            "movies": [{
+                "external_id": FIXTURE_MOVIE_ID,
+                "title": "Broken City",
+                "genres": ["Drama"],
+                "countries": ["Japan"],
+                "directors": ["Frank Ito"],
+                "writers": ["Frank Jansen"],
+                "production_companies": [],
+                "actors": ["Clara Costa", "Anna Engel"],
+            }],
+        },
+        "DELETE_MOVIES": movie_ids,
+    }
+
+
+def get_queries():
+    """Return cypher queries by their names."""
+    return {
+        name: query for name, query in vars(cypher_queries).items()
+        if name.isupper() and isinstance(query, str)
+    }
+
+
+def profile_query(session, query, parameters):
+    """Return plan summary of query profiled in rolled back transaction."""
+    transaction = session.begin_transaction()
+    try:
+        plan = transaction.run(f"PROFILE {query}", **parameters).consume().profile
+    finally:
+        transaction.rollback()
+
+    return summarize_plan(plan)
+
+
+def profile_queries(session):
+    """Return plan summaries of every cypher query."""
+    queries_parameters = get_queries_parameters()
+    missing = sorted(set(get_queries()) - set(queries_parameters))
+    if missing:
+        raise ValueError(f"Profiled parameters are not provided for: {', '.join(missing)}")
+
+    return {
+        name: profile_query(session, query, queries_parameters[name])
+        for name, query in sorted(get_queries().items())
+    }
+
+
+def load_baseline():
+    """Return stored plan summaries by query names or None if baseline was never recorded."""
+    if not os.path.exists(BASELINE_PATH):
+        return None
+
+    with open(BASELINE_PATH) as file:
+        return json.load(file)
+
+
+def check_regressions(profiles, baseline, tolerance):
+    """Print profiles compared with baseline and return names of regressed or new queries."""
+    regressed = []
+    for name, profile in profiles.items():
+        expected = baseline.get(name)
+        status = "missing in baseline, record it with --update-baseline"
+        if not expected:
+            regressed.append(name)
+        else:
+            status = "ok"
+            for metric in ("db_hits", "rows"):
+                if profile[metric] > expected[metric] * (1 + tolerance):
+                    status = f"regressed {metric}: {expected[metric]} -> {profile[metric]}"
+                    regressed.append(name)
+                    break
+
+        print(
+            f"{name:<45} db_hits={profile['db_hits']:<8} rows={profile['rows']:<8} {status}"
+        )
+        if "CartesianProduct" in profile["operators"]:
+            print(f"{'':<45} plan contains CartesianProduct")
+
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile cypher queries on fixture catalogue.")
+    parser.add_argument(
+        "--reset", action="store_true",
+        help="Delete existing data of non-empty database before loading fixture.",
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline = None if args.update_baseline else load_baseline()
+    with NEO4J_DRIVER.session() as session:
+        if session.run(COUNT_NODES).single()["count"]:
+            if not args.reset:
+                sys.exit("The database is not empty, use --reset to replace its data.")
+            session.run(DELETE_ALL).consume()
+
+        load_fixture(session)
+        profiles = profile_queries(session)
+
+    if baseline is None:
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(profiles, file, indent=2, sort_keys=True)
+        print(
+            f"Baseline of {len(profiles)} queries was written to {BASELINE_PATH}, "
+            "commit it to check regressions against it."
+        )
+    elif check_regressions(profiles, baseline, args.tolerance):
+        sys.exit(1)
@@ -0,0 +1,108 @@
+"""This module benchmarks embedded search index against elasticsearch.
+
+Queries are sampled from titles and descriptions of indexed movies, or read from
+a file with one query per line. The report includes latencies of both backends and
+overlap of their top results.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app import APP_CONFIG
+from app.constants import EXTERNAL_ID_FIELD, TITLE_FIELD, DESCRIPTION_FIELD, ORIGINAL_TITLE_FIELD
+from app.es import ElasticSearchDriver
+from app.search import get_search_index
+from data.search_index import read_movies_docs
+
+QUERY_WORDS_COUNTS = (1, 2, 3)
+
+
+def sample_queries(csv_path, count, seed):
+    """Return queries of a few consecutive words of sampled titles and descriptions."""
+    _, lines = read_movies_docs(csv_path)
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count:
+        words = rng.choice(lines)[rng.choice((TITLE_FIELD, DESCRIPTION_FIELD))].split()
+        if not words:
+            continue
+
+        words_count = min(rng.choice(QUERY_WORDS_COUNTS), len(words))
+        start = rng.randrange(len(words) - words_count + 1)
+        queries.append(" ".join(words[start:start + words_count]))
+
+    return queries
+
+
+def search_es(query, limit):
+    """Return movies found by elasticsearch multi match query."""
+    return ElasticSearchDriver.search(
+        query=ElasticSearchDriver.format_multi_match_query(
+            query=query,
+            fields=(TITLE_FIELD, DESCRIPTION_FIELD),
+            projection=(EXTERNAL_ID_FIELD, ORIGINAL_TITLE_FIELD),
+        ),
+        index=APP_CONFIG.ES_DATABASE_MOVIE_INDEX,
+        limit=limit,
+    )
+
+
+def measure(search, queries, limit):
+    """Return latencies in milliseconds and found external ids of every query."""
+    latencies, results = [], []
+    for query in queries:
+        started_at = time.perf_counter()
+        movies = search(query, limit)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+        results.append([movie[EXTERNAL_ID_FIELD] for movie in movies])
+
+    return latencies, results
+
+
+def report(name, latencies):
+    """Print p50 and p99 latencies."""
+    p50, p99 = np.percentile(latencies, (50, 99))
+    print(f"{name:<30} calls={len(latencies):<6} p50={p50:9.3f}ms p99={p99:9.3f}ms")
+
+
+def report_overlap(es_results, embedded_results, limit):
+    """Print mean overlap of top results and share of queries with the same top result."""
+    overlaps, same_top = [], []
+    for es_ids, embedded_ids in zip(es_results, embedded_results):
+        if not es_ids and not embedded_ids:
+            continue
+
+        common_count = len(set(es_ids) & set(embedded_ids))
+        overlaps.append(common_count / max(len(es_ids), len(embedded_ids)))
+        same_top.append(es_ids[:1] == embedded_ids[:1])
+
+    print(
+        f"overlap@{limit}={np.mean(overlaps):.3f} same_top={np.mean(same_top):.3f} "
+        f"queries={len(overlaps)}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark embedded search index against es.")
+    parser.add_argument("--csv", default=APP_CONFIG.IMDB_CSV_PATH)
+    parser.add_argument("--queries", help="File with queries, one per line.")
+    parser.add_argument("--count", type=int, default=500, help="Count of sampled queries.")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.queries:
+        with open(args.queries) as file:
+            queries = [line.strip() for line in file if line.strip()]
+    else:
+        queries = sample_queries(args.csv, args.count, args.seed)
+
+    index = get_search_index()
+    es_latencies, es_results = measure(search_es, queries, args.limit)
+    embedded_latencies, embedded_results = measure(index.search, queries, args.limit)
+    report("search: es", es_latencies)
+    report("search: embedded", embedded_latencies)
+    report_overlap(es_results, embedded_results, args.limit)
@@ -0,0 +1,85 @@
+"""This module benchmarks similarity matrix backend against cypher queries."""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.constants import RECENT_LIKED_MOVIES_COUNT
+from app.models.movie import Movie
+from app.similarity import get_similarity_matrix
+from app.utils.coroutines import run_sync
+
+
+def measure(function, arguments):
+    """Return latencies in milliseconds of calling function with every provided argument."""
+    latencies = []
+    for argument in arguments:
+        started_at = time.perf_counter()
+        function(argument)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+
+    return latencies
+
+
+def report(name, latencies):
+    """Print p50 and p99 latencies."""
+    p50, p99 = np.percentile(latencies, (50, 99))
+    print(f"{name:<40} calls={len(latencies):<6} p50={p50:9.3f}ms p99={p99:9.3f}ms")
+
+
+def benchmark_similar_movies(movie_ids, limit):
+    """Compare similar movies latency of cypher and matrix backends."""
+    matrix = get_similarity_matrix()
+    report(
+        "similar movies: cypher",
+        measure(
+            lambda movie_id: run_sync(Movie.compute_similar_movies(movie_id, limit)), movie_ids
+        ),
+    )
+    report(
+        "similar movies: matrix",
+        measure(lambda movie_id: matrix.get_similar_movies(movie_id, limit), movie_ids),
+    )
+
+
+def recommend_with_matrix(matrix, user_id, limit):
+    """Return content-based recommendations scored by similarity matrix."""
+    liked_movie_ids = run_sync(Movie.get_user_liked_movies_ids(user_id))
+    return matrix.get_recommendations(
+        liked_movie_ids[:RECENT_LIKED_MOVIES_COUNT], liked_movie_ids, limit
+    )
+
+
+def benchmark_content_based_recommendations(user_ids, limit):
+    """Compare content-based recommendations latency of cypher and matrix backends."""
+    matrix = get_similarity_matrix()
+    report(
+        "content-based: cypher",
+        measure(
+            lambda user_id: run_sync(Movie.compute_content_based_recommendations(user_id, limit)),
+            user_ids,
+        ),
+    )
+    report(
+        "content-based: matrix",
+        measure(lambda user_id: recommend_with_matrix(matrix, user_id, limit), user_ids),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark similarity backends.")
+    parser.add_argument("--movies", type=int, default=200, help="Count of sampled movies.")
+    parser.add_argument("--users", nargs="*", default=(), help="Users external ids.")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    movie_ids = get_similarity_matrix().external_ids
+    sampled_movie_ids = [
+        movie_ids[row] for row in random.Random(args.seed).sample(range(len(movie_ids)), args.movies)
+    ]
+    benchmark_similar_movies(sampled_movie_ids, args.limit)
+    if args.users:
+        benchmark_content_based_recommendations(args.users, args.limit)
@@ -0,0 +1,125 @@
+"""This module includes implicit feedback ALS trainer for collaborative recommendations."""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from app import NEO4J_DRIVER
+from app.artifacts import ArtifactWriter
+from app.factors import FACTORS_ARTIFACT_NAME, USER_LIKES_COUNTS_ARRAY, solve_factors
+from app.utils.cypher_queries import GET_LIKED_RELATIONSHIPS
+
+LOGGER = logging.getLogger(__name__)
+
+
+ALS_FACTORS = 64
+ALS_ITERATIONS = 15
+ALS_REGULARIZATION = 0.1
+ALS_ALPHA = 40.0
+ALS_CHUNK_SIZE = 512
+
+
+def read_likes():
+    """Return users ids, movies ids, movies titles and sparse users x movies likes matrix."""
+    user_rows, item_rows = {}, {}
+    titles = []
+    rows, columns = [], []
+    with NEO4J_DRIVER.session() as session:
+        for record in session.run(GET_LIKED_RELATIONSHIPS):
+            rows.append(user_rows.setdefault(record["user_external_id"], len(user_rows)))
+            item_row = item_rows.setdefault(record["movie_external_id"], len(item_rows))
+            if item_row == len(titles):
+                titles.append(record["title"] or "")
+            columns.append(item_row)
+
+    likes = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(user_rows), len(item_rows)),
+    )
+    return list(user_rows), list(item_rows), titles, likes
+
+
+def solve_side(executor, likes, factors, regularization, alpha):
+    """Return factors for every row of likes matrix given fixed factors of its columns."""
+    gram = factors.T @ factors
+    liked_rows = np.split(likes.indices, likes.indptr[1:-1])
+    chunks = [
+        liked_rows[start:start + ALS_CHUNK_SIZE]
+        for start in range(0, len(liked_rows), ALS_CHUNK_SIZE)
+    ]
+    solved = executor.map(
+        lambda chunk: solve_factors(factors, gram, chunk, regularization, alpha), chunks
+    )
+    return np.vstack(list(solved))
+
+
+def train(likes, factors_count, iterations, regularization, alpha, workers, seed=0):
+    """Return users and items factors trained with alternating least squares."""
+    random = np.random.default_rng(seed)
+    user_factors = random.normal(scale=0.01, size=(likes.shape[0], factors_count))
+    item_factors = random.normal(scale=0.01, size=(likes.shape[1], factors_count))
+    item_likes = likes.T.tocsr()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for iteration in range(iterations):
+            started_at = time.perf_counter()
+            user_factors = solve_side(executor, likes, item_factors, regularization, alpha)
+            item_factors = solve_side(executor, item_likes, user_factors, regularization, alpha)
+            LOGGER.info(
+                "ALS iteration %s/%s took %.2fs.",
+                iteration + 1, iterations, time.perf_counter() - started_at
+            )
+
+    return user_factors.astype(np.float32), item_factors.astype(np.float32)
+
+
+def publish_factors(user_ids, item_ids, titles, likes, user_factors, item_factors, params):
+    """Publish trained factors, counts of users likes and model parameters as artifact."""
+    writer = ArtifactWriter(FACTORS_ARTIFACT_NAME)
+    writer.add_ids("user_ids", user_ids)
+    writer.add_array(USER_LIKES_COUNTS_ARRAY, np.diff(likes.indptr))
+    writer.add_ids("item_ids", item_ids)
+    writer.add_strings("titles", titles)
+    writer.add_array("user_factors", user_factors)
+    writer.add_array("item_factors", item_factors)
+    writer.add_array("item_gram", item_factors.T.astype(np.float64) @ item_factors)
+    return writer.publish(params=params)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Train implicit ALS factors from likes.")
+    parser.add_argument("--factors", type=int, default=ALS_FACTORS)
+    parser.add_argument("--iterations", type=int, default=ALS_ITERATIONS)
+    parser.add_argument("--regularization", type=float, default=ALS_REGULARIZATION)
+    parser.add_argument("--alpha", type=float, default=ALS_ALPHA)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    try:
+        trained_at = int(time.time() * 1000)
+        user_ids, item_ids, titles, likes = read_likes()
+        LOGGER.info(
+            "Read likes: users=%s, movies=%s, likes=%s",
+            len(user_ids), len(item_ids), likes.nnz
+        )
+        user_factors, item_factors = train(
+            likes, args.factors, args.iterations, args.regularization, args.alpha, args.workers
+        )
+        version = publish_factors(
+            user_ids, item_ids, titles, likes, user_factors, item_factors,
+            params={
+                "trained_at": trained_at,
+                "regularization": args.regularization,
+                "alpha": args.alpha,
+            },
+        )
+    except Exception as exc:
+        LOGGER.exception("Failed to train ALS factors: ")
+    else:
+        LOGGER.info("ALS factors %s were successfully published.", version)
@@ -0,0 +1,12 @@
+"""This module bumps catalogue version after the catalogue was reloaded."""
+
+import logging
+
+from app.catalogue import bump_catalogue_version
+
+LOGGER = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    LOGGER.info("Catalogue version was bumped to %s.", bump_catalogue_version())
@@ -0,0 +1,110 @@
+"""This module includes functionality for rebuilding and checking CO_LIKED relationships."""
+
+import argparse
+import logging
+import sys
+
+from app import NEO4J_DRIVER
+from app.models.movie import Movie
+from app.utils.coroutines import run_sync
+from app.utils.cypher_queries import (
+    DELETE_CO_LIKED_RELATIONSHIPS,
+    CREATE_CO_LIKED_RELATIONSHIPS,
+    GET_INCONSISTENT_CO_LIKED_RELATIONSHIPS,
+)
+from data.similar import iter_movies_external_ids
+
+LOGGER = logging.getLogger(__name__)
+
+
+NEO4J_DELETE_BATCH_SIZE = 10000
+
+
+def delete_co_liked_relationships():
+    """Delete all CO_LIKED relationships in batches."""
+    deleted_count = 0
+    while True:
+        with NEO4J_DRIVER.session() as session:
+            batch_count = session.run(
+                DELETE_CO_LIKED_RELATIONSHIPS,
+                limit=NEO4J_DELETE_BATCH_SIZE,
+            ).single()["deleted_count"]
+
+        deleted_count += batch_count
+        if batch_count < NEO4J_DELETE_BATCH_SIZE:
+            return deleted_count
+
+
+def rebuild_co_liked_relationships():
+    """Recreate CO_LIKED relationships with counts of users who liked both movies."""
+    LOGGER.info("Deleted %s CO_LIKED relationships.", delete_co_liked_relationships())
+
+    movies_count = 0
+    for movie_ids in iter_movies_external_ids():
+        with NEO4J_DRIVER.session() as session:
+            session.run(CREATE_CO_LIKED_RELATIONSHIPS, movie_external_ids=movie_ids).consume()
+
+        movies_count += len(movie_ids)
+        LOGGER.info("Rebuilt CO_LIKED relationships for %s movies.", movies_count)
+
+
+def check_co_liked_counts():
+    """Return CO_LIKED relationships whose counts differ from actual common likes."""
+    inconsistencies = []
+    for movie_ids in iter_movies_external_ids():
+        with NEO4J_DRIVER.session() as session:
+            inconsistencies.extend(session.run(
+                GET_INCONSISTENT_CO_LIKED_RELATIONSHIPS,
+                movie_external_ids=movie_ids,
+            ).data())
+
+    return inconsistencies
+
+
+def check_recommendations(user_ids, limit):
+    """Return overlap of co-liked and cypher collaborative recommendations per user."""
+    overlaps = {}
+    for user_id in user_ids:
+        co_liked_ids = {
+            movie["external_id"]
+            for movie in run_sync(Movie.get_co_liked_recommendations(user_id, limit))
+        }
+        cypher_ids = {
+            movie["external_id"]
+            for movie in run_sync(Movie.compute_collaborative_recommendations(user_id, limit))
+        }
+        overlaps[user_id] = len(co_liked_ids & cypher_ids) / max(len(cypher_ids), 1)
+
+    return overlaps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain CO_LIKED relationships.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="Rebuild all CO_LIKED relationships from likes.")
+    check_parser = subparsers.add_parser("check", help="Check CO_LIKED against likes.")
+    check_parser.add_argument(
+        "--users", nargs="*", default=(),
+        help="Users external ids to compare recommendations with cypher traversal.",
+    )
+    check_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        try:
+            rebuild_co_liked_relationships()
+        except Exception as exc:
+            LOGGER.exception("Failed to rebuild CO_LIKED relationships: ")
+        else:
+            LOGGER.info("CO_LIKED relationships were successfully rebuilt.")
+    else:
+        inconsistent_records = check_co_liked_counts()
+        for record in inconsistent_records:
+            print(
+                f"{record['external_id']} - {record['co_liked_external_id']}: "
+                f"stored={record['stored_count']} actual={record['actual_count']}"
+            )
+        for user_id, overlap in check_recommendations(args.users, args.limit).items():
+            print(f"user={user_id} overlap@{args.limit}={overlap:.2f}")
+
+        sys.exit(1 if inconsistent_records else 0)
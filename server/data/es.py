@@ -1,11 +1,17 @@
 """This module includes functionally for populating elasticsearch database."""
 
+import argparse
 import csv
+import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 
-from elasticsearch.helpers import bulk
+from elasticsearch import TransportError
+from elasticsearch.helpers import streaming_bulk
 
-from app import ES_DRIVER
+from app import ES_DRIVER, APP_CONFIG
 
 LOGGER = logging.getLogger(__name__)
 
@@ -14,123 +20,353 @@ IMDB_TITLE_ID_FIELD = "imdb_title_id"
 IMDB_TITLE_FIELD = "title"
 IMDB_ORIGINAL_TITLE_FIELD = "original_title"
 IMDB_DESCRIPTION_FIELD = "description"
-IMDB_DIRECTOR_FIELD = "director"
-IMDB_WRITER_FIELD = "writer"
-IMDB_ACTORS_FIELD = "actors"
-IMDB_PRODUCTION_COMPANY_FIELD = "production_company"
 
 ES_EXTERNAL_ID_FIELD = "external_id"
 ES_TITLE_FIELD = "title"
 ES_ORIGINAL_TITLE_FIELD = "original_title"
 ES_DESCRIPTION_FIELD = "description"
 
-MOVIE_INDEX_NAME = "movie-index"
-
 ES_MAX_INSERT_COUNT = 1000
+ES_IN_FLIGHT_REQUESTS = 4
+ES_MAX_RETRIES = 5
+ES_INITIAL_BACKOFF = 1
+ES_MIN_COUNT_RATIO = 0.9
+ES_INDEX_VERSION_FORMAT = "%Y%m%d%H%M%S"
+
+MOVIE_INDEX_CONFIGS = {
+    "settings": {
+        "analysis": {
+            "analyzer": {
+                "description_analyzer": {
+                    "type": "custom",
+                    "tokenizer": "standard",
+                    "filter": ["lowercase", "stemmer", "stop"],
+                    "stopwords": "_english_",
+                },
+                "title_prefix_analyzer": {
+                    "type": "custom",
+                    "tokenizer": "lowercase",
+                    "filter": ["title_prefix_filter"],
+                },
+            },
+            "filter": {
+                "title_prefix_filter": {
+                    "type": "edge_ngram",
+                    "min_gram": 1,
+                    "max_gram": 20,
+                }
+            },
+        }
+    },
+    "mappings": {
+        "properties": {
+            "external_id": {"type": "keyword"},
+            "title": {
+                "type": "text",
+                "analyzer": "simple",
+                "fields": {
+                    "prefix": {
+                        "type": "text",
+                        "analyzer": "title_prefix_analyzer",
+                        "search_analyzer": "simple",
+                    }
+                },
+            },
+            "original_title": {"type": "keyword"},
+            "description": {"type": "text", "analyzer": "description_analyzer"},
+        }
+    },
+}
 
 
-def es_create_movie_index():
-    """Create movie index in elasticsearch."""
+def make_index_name(alias):
+    """Return name of new versioned index behind provided alias."""
+    return f"{alias}-{time.strftime(ES_INDEX_VERSION_FORMAT)}"
+
+
+def es_create_movie_index(index):
+    """Create movie index with settings optimised for bulk indexing."""
     index_configs = {
+        **MOVIE_INDEX_CONFIGS,
         "settings": {
-            "analysis": {
-                "analyzer": {
-                    "description_analyzer": {
-                        "type": "custom",
-                        "tokenizer": "standard",
-                        "filter": ["lowercase", "stemmer", "stop"],
-                        "stopwords": "_english_",
-                    }
-                }
-            }
-        },
-        "mappings": {
-            "properties": {
-                "title": {"type": "text"},
-                "description": {"type": "text", "analyzer": "description_analyzer"},
-                "stuff": {"type": "text"},
-            }
+            **MOVIE_INDEX_CONFIGS["settings"],
+            "refresh_interval": "-1",
+            "number_of_replicas": 0,
         },
     }
-    ES_DRIVER.indices.create(index="movie_index", ignore=400, body=index_configs)
+    ES_DRIVER.indices.create(index=index, body=index_configs)
 
 
-def es_create_stuff_index():
-    """Create movie index in elasticsearch."""
-    index_configs = {
-        "settings": {
-            "analysis": {
-                "analyzer": {
-                    "description_analyzer": {
-                        "type": "custom",
-                        "tokenizer": "standard",
-                        "filter": ["lowercase", "stemmer", "stop"],
-                        "stopwords": "_english_",
-                    }
-                }
-            }
-        },
-        "mappings": {
-            "properties": {
-                "external_id": {"type": "keyword"},
-                "title": {"type": "text", "analyzer": "simple"},
-                "original_title": {"type": "keyword"},
-                "description": {"type": "text", "analyzer": "description_analyzer"},
-            }
-        },
+def es_finalize_movie_index(index, replicas):
+    """Restore refresh interval and replicas of built index and refresh it."""
+    ES_DRIVER.indices.put_settings(
+        index=index,
+        body={"index": {"refresh_interval": None, "number_of_replicas": replicas}},
+    )
+    ES_DRIVER.indices.refresh(index=index)
+
+
+def es_check_movie_index(index, alias, expected_count, min_ratio=ES_MIN_COUNT_RATIO):
+    """Raise ValueError if built index misses docs or shrinks compared to the live one."""
+    count = ES_DRIVER.count(index=index)["count"]
+    if count < expected_count:
+        raise ValueError(f"The index {index} has {count} docs, expected {expected_count}.")
+
+    if ES_DRIVER.indices.exists(index=alias):
+        live_count = ES_DRIVER.count(index=alias)["count"]
+        if count < live_count * min_ratio:
+            raise ValueError(
+                f"The index {index} has {count} docs, live {alias} has {live_count}."
+            )
+
+    return count
+
+
+def es_swap_alias(alias, index):
+    """Atomically point alias to provided index, replacing legacy concrete index of its name."""
+    actions = [{"add": {"index": index, "alias": alias}}]
+    if ES_DRIVER.indices.exists_alias(name=alias):
+        actions.insert(0, {"remove": {"index": "*", "alias": alias}})
+    elif ES_DRIVER.indices.exists(index=alias):
+        actions.insert(0, {"remove_index": {"index": alias}})
+
+    ES_DRIVER.indices.update_aliases(body={"actions": actions})
+
+
+def es_prune_movie_indices(alias, keep):
+    """Delete the oldest versioned indices of alias keeping provided count of the newest."""
+    indices = sorted(ES_DRIVER.indices.get(index=f"{alias}-*"), reverse=True)
+    live_indices = set(ES_DRIVER.indices.get_alias(name=alias)) if (
+        ES_DRIVER.indices.exists_alias(name=alias)
+    ) else set()
+    for index in indices[keep:]:
+        if index not in live_indices:
+            ES_DRIVER.indices.delete(index=index)
+            LOGGER.info("Deleted outdated index %s.", index)
+
+
+def count_csv_movies(csv_path):
+    """Return count of distinct movies in csv."""
+    with open(csv_path, newline="") as file:
+        return len({line[IMDB_TITLE_ID_FIELD] for line in csv.DictReader(file)})
+
+
+class Checkpoint:
+    """Class that tracks the contiguous offset of acknowledged csv rows in a file.
+
+    Chunks are acknowledged out of order by parallel workers, so the stored offset
+    only advances past chunks whose predecessors are acknowledged as well.
+    """
+
+    def __init__(self, path, csv_path, index, offset=0):
+        """Initialize checkpoint file, ingested csv path, built index and acknowledged offset."""
+        self.path = path
+        self.csv_path = csv_path
+        self.index = index
+        self.offset = offset
+        self._acknowledged = {}
+
+    @classmethod
+    def load(cls, path, csv_path):
+        """Return checkpoint of previous interrupted run of provided csv or None."""
+        try:
+            with open(path) as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+
+        if state["csv_path"] != os.path.abspath(csv_path):
+            return None
+
+        return cls(path, csv_path, state["index"], state["offset"])
+
+    def acknowledge(self, start_offset, end_offset):
+        """Mark chunk rows as acknowledged and store advanced contiguous offset."""
+        self._acknowledged[start_offset] = end_offset
+        offset = self.offset
+        while offset in self._acknowledged:
+            offset = self._acknowledged.pop(offset)
+
+        if offset != self.offset:
+            self.offset = offset
+            self.save()
+
+    def save(self):
+        """Atomically write acknowledged offset."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(
+                {
+                    "csv_path": os.path.abspath(self.csv_path),
+                    "index": self.index,
+                    "offset": self.offset,
+                },
+                file,
+            )
+        os.replace(temporary_path, self.path)
+
+    def delete(self):
+        """Delete checkpoint file after the whole csv was ingested."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def make_movie_doc(line):
+    """Return movie doc of imdb csv row."""
+    return {
+        ES_EXTERNAL_ID_FIELD: line[IMDB_TITLE_ID_FIELD],
+        ES_TITLE_FIELD: line[IMDB_TITLE_FIELD],
+        ES_DESCRIPTION_FIELD: line[IMDB_DESCRIPTION_FIELD],
+        ES_ORIGINAL_TITLE_FIELD: line[IMDB_TITLE_FIELD],
     }
-    ES_DRIVER.indices.create(index=MOVIE_INDEX_NAME, ignore=400, body=index_configs)
 
 
-def es_insert_movies():
-    """Insert imdb records into elasticsearch."""
-    es_docs_count = 0
-    es_docs = []
-    with open("imdb.csv") as file:
-        csv_reader = csv.DictReader(file)
-        for line in csv_reader:
-            external_id = line[IMDB_TITLE_ID_FIELD]
-            title = line[IMDB_TITLE_FIELD]
-            description = line[IMDB_DESCRIPTION_FIELD]
+def iter_movies_actions(csv_path, index, start_offset=0):
+    """Yield csv row offsets and bulk index actions of movies, starting from provided offset."""
+    with open(csv_path, newline="") as file:
+        for offset, line in enumerate(csv.DictReader(file)):
+            if offset < start_offset:
+                continue
+
+            yield offset, {
+                "_index": index,
+                "_id": line[IMDB_TITLE_ID_FIELD],
+                "_source": make_movie_doc(line),
+            }
+
+
+def iter_chunks(offsets_actions, chunk_size):
+    """Yield start offset, end offset and actions of consecutive chunks."""
+    chunk, start_offset = [], None
+    for offset, action in offsets_actions:
+        if start_offset is None:
+            start_offset = offset
+        chunk.append(action)
+        if len(chunk) == chunk_size:
+            yield start_offset, offset + 1, chunk
+            chunk, start_offset = [], None
+
+    if chunk:
+        yield start_offset, offset + 1, chunk
+
 
-            stuff = set()
-            directors = line[IMDB_DIRECTOR_FIELD].strip()
-            if directors:
-                stuff.update(directors.split(", "))
+def index_chunk(actions, max_retries):
+    """Index chunk and return counts of indexed and failed docs.
 
-            writer = line[IMDB_WRITER_FIELD]
-            if writer:
-                stuff.update(writer.split(", "))
+    Docs rejected with 429 are retried by streaming bulk, failed requests are retried
+    as a whole; it is safe since docs are identified by external id.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            indexed, failed = 0, 0
+            for ok, item in streaming_bulk(
+                ES_DRIVER,
+                actions,
+                chunk_size=len(actions),
+                max_retries=max_retries,
+                initial_backoff=ES_INITIAL_BACKOFF,
+                raise_on_error=False,
+            ):
+                if ok:
+                    indexed += 1
+                else:
+                    failed += 1
+                    LOGGER.error("Failed to index doc: %s", item)
 
-            actors = line[IMDB_ACTORS_FIELD]
-            if actors:
-                stuff.update(actors.split(", "))
+            return indexed, failed
+        except TransportError as err:
+            if attempt == max_retries:
+                raise
+            LOGGER.warning("Failed to index chunk, retrying. Error: %s", err)
+            time.sleep(ES_INITIAL_BACKOFF * 2 ** attempt)
 
-            production_company = line[IMDB_PRODUCTION_COMPANY_FIELD]
-            if production_company:
-                stuff.update(production_company.split(", "))
 
-            es_docs.append({
-                ES_EXTERNAL_ID_FIELD: external_id,
-                ES_TITLE_FIELD: title,
-                ES_DESCRIPTION_FIELD: description,
-                ES_ORIGINAL_TITLE_FIELD: title,
-            })
-            es_docs_count += 1
+def es_insert_movies(csv_path, checkpoint, chunk_size=ES_MAX_INSERT_COUNT,
+                     in_flight=ES_IN_FLIGHT_REQUESTS, max_retries=ES_MAX_RETRIES):
+    """Stream imdb records into checkpoint index from its offset and return counts."""
+    indexed, failed = 0, 0
+    chunks = iter_chunks(
+        iter_movies_actions(csv_path, checkpoint.index, checkpoint.offset), chunk_size
+    )
+    with ThreadPoolExecutor(max_workers=in_flight) as executor:
+        pending = {}
+        for start_offset, end_offset, actions in chunks:
+            if len(pending) >= in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk_indexed, chunk_failed = future.result()
+                    indexed, failed = indexed + chunk_indexed, failed + chunk_failed
+                    checkpoint.acknowledge(*pending.pop(future))
 
-            if es_docs_count > ES_MAX_INSERT_COUNT:
-                bulk(ES_DRIVER, es_docs, index=MOVIE_INDEX_NAME)
-                es_docs = []
-                es_docs_count = 0
+            future = executor.submit(index_chunk, actions, max_retries)
+            pending[future] = (start_offset, end_offset)
 
-        bulk(ES_DRIVER, es_docs, index=MOVIE_INDEX_NAME)
+        for future in as_completed(list(pending)):
+            chunk_indexed, chunk_failed = future.result()
+            indexed, failed = indexed + chunk_indexed, failed + chunk_failed
+            checkpoint.acknowledge(*pending.pop(future))
+
+    return indexed, failed
+
+
+def es_build_movie_index(csv_path, checkpoint_path, alias, restart=False, **ingestion_params):
+    """Build new versioned movie index from csv, swap alias to it and prune old indices."""
+    checkpoint = None if restart else Checkpoint.load(checkpoint_path, csv_path)
+    if checkpoint:
+        LOGGER.info("Resuming %s from csv row %s.", checkpoint.index, checkpoint.offset)
+    else:
+        checkpoint = Checkpoint(checkpoint_path, csv_path, make_index_name(alias))
+        es_create_movie_index(checkpoint.index)
+        checkpoint.save()
+
+    indexed, failed = es_insert_movies(csv_path, checkpoint, **ingestion_params)
+    es_finalize_movie_index(checkpoint.index, APP_CONFIG.ES_MOVIE_INDEX_REPLICAS)
+    count = es_check_movie_index(
+        checkpoint.index, alias, expected_count=count_csv_movies(csv_path) - failed
+    )
+    es_swap_alias(alias, checkpoint.index)
+    checkpoint.delete()
+    es_prune_movie_indices(alias, keep=APP_CONFIG.ES_MOVIE_INDEX_KEEP_VERSIONS)
+    LOGGER.info("Alias %s points to %s with %s docs.", alias, checkpoint.index, count)
+
+    return indexed, failed
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Build new versioned movie index from imdb csv and swap alias to it."
+    )
+    parser.add_argument("--csv", default=APP_CONFIG.IMDB_CSV_PATH)
+    parser.add_argument("--alias", default=APP_CONFIG.ES_DATABASE_MOVIE_INDEX)
+    parser.add_argument("--chunk-size", type=int, default=ES_MAX_INSERT_COUNT)
+    parser.add_argument("--in-flight", type=int, default=ES_IN_FLIGHT_REQUESTS)
+    parser.add_argument("--max-retries", type=int, default=ES_MAX_RETRIES)
+    parser.add_argument(
+        "--checkpoint", default=os.path.join(APP_CONFIG.ARTIFACTS_DIR, "es_ingestion.checkpoint")
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore checkpoint of interrupted run."
+    )
+    args = parser.parse_args()
+
     try:
-        es_create_movie_index()
-        es_insert_movies()
+        started_at = time.perf_counter()
+        indexed, failed = es_build_movie_index(
+            args.csv,
+            args.checkpoint,
+            args.alias,
+            restart=args.restart,
+            chunk_size=args.chunk_size,
+            in_flight=args.in_flight,
+            max_retries=args.max_retries,
+        )
+        elapsed = time.perf_counter() - started_at
     except Exception as exc:
         LOGGER.exception("Failed to insert records to es: ")
     else:
-        LOGGER.info("ES was successfully populated.")
+        LOGGER.info(
+            "ES was successfully populated: indexed=%s, failed=%s, took %.2fs, %.0f docs/sec.",
+            indexed, failed, elapsed, indexed / elapsed if elapsed else 0
+        )
@@ -1,4 +1,6 @@
+// LOAD CSV variant of the catalogue load, data/imdb.py loads the csv in batches much faster
 // Create indexes
+CREATE INDEX movie_external_id_index IF NOT EXISTS FOR (n:Movie) ON (n.external_id);
 CREATE INDEX actor_name_index IF NOT EXISTS FOR (n:Actor) ON (n.name);
 CREATE INDEX writer_name_index IF NOT EXISTS FOR (n:Writer) ON (n.name);
 CREATE INDEX director_name_index IF NOT EXISTS FOR (n:Director) ON (n.name);
@@ -26,3 +28,9 @@ FOREACH (writer_name IN split(row.writer, ", ") |
 FOREACH (production_company_name IN split(row.production_company, ", ") |
   MERGE (production_company:ProductionCompany {name: production_company_name})
   MERGE (production_company)-[:PRODUCED]->(movie));
+
+// Precompute entity degrees used by the idf similar movies scoring
+MATCH (entity)
+WHERE entity:Genre OR entity:Country OR entity:Actor OR entity:Director
+    OR entity:Writer OR entity:ProductionCompany
+SET entity.degree = COUNT { (entity)--(:Movie) };
@@ -0,0 +1,223 @@
+"""This module loads imdb csv into neo4j database in batches.
+
+Entities are deduplicated and their degrees are counted in python, so nodes are
+written by plain UNWIND batches backed by uniqueness constraints. Relationships of
+every type are split into a grid of movie and entity partitions and written round
+by round, where cells of the same round share neither movies nor entities and are
+written in parallel without lock conflicts.
+"""
+
+import argparse
+import csv
+import logging
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from app import NEO4J_DRIVER, APP_CONFIG
+from app.catalogue import bump_catalogue_version
+
+LOGGER = logging.getLogger(__name__)
+
+
+IMDB_TITLE_ID_FIELD = "imdb_title_id"
+IMDB_LIST_SEPARATOR = ", "
+IMDB_RELATION_FIELDS = {
+    "genres": "genre",
+    "countries": "country",
+    "directors": "director",
+    "writers": "writer",
+    "production_companies": "production_company",
+    "actors": "actors",
+}
+
+NEO4J_BATCH_SIZE = 5000
+NEO4J_PARTITIONS = 4
+
+ENTITY_RELATIONS = {
+    "genres": ("Genre", "(movie)-[:IN_GENRE]->(entity)"),
+    "countries": ("Country", "(movie)-[:IN_COUNTRY]->(entity)"),
+    "directors": ("Director", "(entity)-[:DIRECTED]->(movie)"),
+    "writers": ("Writer", "(entity)-[:WROTE]->(movie)"),
+    "production_companies": ("ProductionCompany", "(entity)-[:PRODUCED]->(movie)"),
+    "actors": ("Actor", "(entity)-[:ACTED_IN]->(movie)"),
+}
+
+SCHEMA_STATEMENTS = (
+    "DROP INDEX movie_external_id_index IF EXISTS",
+    "DROP INDEX actor_name_index IF EXISTS",
+    "DROP INDEX writer_name_index IF EXISTS",
+    "DROP INDEX director_name_index IF EXISTS",
+    "DROP INDEX production_company_name_index IF EXISTS",
+    "DROP INDEX genre_name_index IF EXISTS",
+    "CREATE CONSTRAINT movie_external_id_unique IF NOT EXISTS "
+    "FOR (n:Movie) REQUIRE n.external_id IS UNIQUE",
+    *(
+        f"CREATE CONSTRAINT {label.lower()}_name_unique IF NOT EXISTS "
+        f"FOR (n:{label}) REQUIRE n.name IS UNIQUE"
+        for label, _ in ENTITY_RELATIONS.values()
+    ),
+    "CREATE CONSTRAINT user_external_id_unique IF NOT EXISTS "
+    "FOR (n:User) REQUIRE n.external_id IS UNIQUE",
+    "CALL db.awaitIndexes()",
+)
+
+CREATE_MOVIES = """
+    UNWIND $movies AS row
+    MERGE (movie:Movie {external_id: row.external_id})
+    SET movie.title = row.title
+"""
+
+CREATE_ENTITIES = """
+    UNWIND $entities AS row
+    MERGE (entity:%(label)s {name: row.name})
+    SET entity.degree = row.degree
+"""
+
+CREATE_RELATIONSHIPS = """
+    UNWIND $relationships AS row
+    MATCH (movie:Movie {external_id: row.movie_external_id})
+    MATCH (entity:%(label)s {name: row.name})
+    MERGE %(pattern)s
+"""
+
+
+def read_movies_rows(csv_path):
+    """Return csv rows by imdb title id, the last one wins for duplicated ids."""
+    with open(csv_path, newline="") as file:
+        return {line[IMDB_TITLE_ID_FIELD]: line for line in csv.DictReader(file)}
+
+
+def make_neo4j_movie(line):
+    """Return movie with lists of distinct related entities names of csv row."""
+    movie = {"external_id": line[IMDB_TITLE_ID_FIELD], "title": line["title"]}
+    for relation, field in IMDB_RELATION_FIELDS.items():
+        names = (line[field] or "").split(IMDB_LIST_SEPARATOR)
+        movie[relation] = list(dict.fromkeys(name for name in names if name))
+
+    return movie
+
+
+def collect_entities(movies):
+    """Return entities with degrees and relationships of movies by relation."""
+    entities, relationships = {}, {}
+    for relation in ENTITY_RELATIONS:
+        degrees = defaultdict(int)
+        relationships[relation] = []
+        for movie in movies:
+            for name in movie[relation]:
+                degrees[name] += 1
+                relationships[relation].append(
+                    {"movie_external_id": movie["external_id"], "name": name}
+                )
+
+        entities[relation] = [
+            {"name": name, "degree": degree} for name, degree in degrees.items()
+        ]
+
+    return entities, relationships
+
+
+def get_partition(key, partitions):
+    """Return stable partition of provided key."""
+    return zlib.crc32(key.encode()) % partitions
+
+
+def partition_relationships(relationships, partitions, entity_key="name"):
+    """Return rounds of cells, where cells of the same round share neither movies nor entities.
+
+    A relationship goes to grid cell of its movie and entity partitions, and round
+    shift takes cells (row, (row + shift) % partitions) of every row.
+    """
+    cells = defaultdict(list)
+    for relationship in relationships:
+        movie_partition = get_partition(relationship["movie_external_id"], partitions)
+        entity_partition = get_partition(relationship[entity_key], partitions)
+        cells[(movie_partition, entity_partition)].append(relationship)
+
+    return [
+        [cells[(row, (row + shift) % partitions)] for row in range(partitions)]
+        for shift in range(partitions)
+    ]
+
+
+def write_batches(query, parameter, rows, batch_size):
+    """Write rows in batches of separate transactions."""
+    with NEO4J_DRIVER.session() as session:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            session.execute_write(lambda tx: tx.run(query, **{parameter: batch}).consume())
+
+
+def log_phase(phase, count, started_at):
+    """Log and return elapsed time and throughput of loading phase."""
+    elapsed = time.perf_counter() - started_at
+    rate = count / elapsed if elapsed else 0
+    LOGGER.info("%s: %s records, took %.2fs, %.0f records/sec.", phase, count, elapsed, rate)
+    return {"count": count, "elapsed": elapsed, "rate": rate}
+
+
+def load_catalogue(csv_path, batch_size=NEO4J_BATCH_SIZE, partitions=NEO4J_PARTITIONS):
+    """Load imdb csv into neo4j and return stats of every loading phase."""
+    stats = {}
+
+    started_at = time.perf_counter()
+    movies = [make_neo4j_movie(line) for line in read_movies_rows(csv_path).values()]
+    entities, relationships = collect_entities(movies)
+    stats["parse"] = log_phase("parse", len(movies), started_at)
+
+    started_at = time.perf_counter()
+    with NEO4J_DRIVER.session() as session:
+        for statement in SCHEMA_STATEMENTS:
+            session.run(statement).consume()
+    stats["schema"] = log_phase("schema", len(SCHEMA_STATEMENTS), started_at)
+
+    started_at = time.perf_counter()
+    write_batches(CREATE_MOVIES, "movies", movies, batch_size)
+    for relation, (label, _) in ENTITY_RELATIONS.items():
+        write_batches(
+            CREATE_ENTITIES % {"label": label}, "entities", entities[relation], batch_size
+        )
+    nodes_count = len(movies) + sum(len(rows) for rows in entities.values())
+    stats["nodes"] = log_phase("nodes", nodes_count, started_at)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=partitions) as executor:
+        for relation, (label, pattern) in ENTITY_RELATIONS.items():
+            query = CREATE_RELATIONSHIPS % {"label": label, "pattern": pattern}
+            for cells in partition_relationships(relationships[relation], partitions):
+                for future in [
+                    executor.submit(write_batches, query, "relationships", cell, batch_size)
+                    for cell in cells if cell
+                ]:
+                    future.result()
+    relationships_count = sum(len(rows) for rows in relationships.values())
+    stats["relationships"] = log_phase("relationships", relationships_count, started_at)
+
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Load imdb csv into neo4j in batches.")
+    parser.add_argument("--csv", default=APP_CONFIG.IMDB_CSV_PATH)
+    parser.add_argument("--batch-size", type=int, default=NEO4J_BATCH_SIZE)
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=NEO4J_PARTITIONS,
+        help="Count of movie and entity partitions, also count of parallel writers.",
+    )
+    args = parser.parse_args()
+
+    try:
+        started_at = time.perf_counter()
+        load_catalogue(args.csv, args.batch_size, args.partitions)
+        bump_catalogue_version()
+    except Exception as exc:
+        LOGGER.exception("Failed to load imdb catalogue to neo4j: ")
+    else:
+        LOGGER.info(
+            "Neo4j was successfully populated, took %.2fs.", time.perf_counter() - started_at
+        )
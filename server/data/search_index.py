@@ -0,0 +1,92 @@
+"""This module includes functionality for building search index artifact from imdb csv."""
+
+import argparse
+import csv
+import logging
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from app import APP_CONFIG
+from app.artifacts import ArtifactWriter
+from app.search import ANALYZERS, SEARCH_FIELDS, SEARCH_INDEX_ARTIFACT_NAME
+
+LOGGER = logging.getLogger(__name__)
+
+
+IMDB_TITLE_ID_FIELD = "imdb_title_id"
+IMDB_TITLE_FIELD = "title"
+
+
+def read_movies_docs(path):
+    """Return movies ids and fields of movie docs, the same as indexed into elasticsearch."""
+    with open(path, newline="") as file:
+        lines = {line[IMDB_TITLE_ID_FIELD]: line for line in csv.DictReader(file)}
+
+    return list(lines), list(lines.values())
+
+
+def build_postings(texts, analyzer):
+    """Return sorted terms, postings CSR arrays and lengths of analyzed texts."""
+    postings = defaultdict(list)
+    lengths = np.empty(len(texts), dtype=np.int32)
+    for row, text in enumerate(texts):
+        terms = analyzer(text or "")
+        lengths[row] = len(terms)
+        for term, frequency in Counter(terms).items():
+            postings[term].append((row, frequency))
+
+    terms = sorted(postings)
+    indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum([len(postings[term]) for term in terms], out=indptr[1:])
+    docs = np.empty(indptr[-1], dtype=np.int32)
+    frequencies = np.empty(indptr[-1], dtype=np.float32)
+    for row, term in enumerate(terms):
+        docs[indptr[row]:indptr[row + 1]], frequencies[indptr[row]:indptr[row + 1]] = zip(
+            *postings[term]
+        )
+
+    return terms, indptr, docs, frequencies, lengths
+
+
+def build_search_index(path):
+    """Build and publish search index artifact."""
+    external_ids, lines = read_movies_docs(path)
+
+    writer = ArtifactWriter(SEARCH_INDEX_ARTIFACT_NAME)
+    writer.add_ids("movie_ids", external_ids)
+    writer.add_strings("original_titles", [line[IMDB_TITLE_FIELD] for line in lines])
+
+    average_lengths, terms_counts = {}, {}
+    for field in SEARCH_FIELDS:
+        terms, indptr, docs, frequencies, lengths = build_postings(
+            [line[field] for line in lines], ANALYZERS[field]
+        )
+        writer.add_ids(f"{field}_terms", terms)
+        writer.add_array(f"{field}_indptr", indptr)
+        writer.add_array(f"{field}_docs", docs)
+        writer.add_array(f"{field}_frequencies", frequencies)
+        writer.add_array(f"{field}_lengths", lengths)
+        average_lengths[field] = float(lengths.mean()) if len(lengths) else 0
+        terms_counts[field] = len(terms)
+
+    version = writer.publish(params={"average_lengths": average_lengths})
+
+    LOGGER.info(
+        "Built search index %s: movies=%s, terms=%s", version, len(external_ids), terms_counts
+    )
+    return version
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build search index artifact.")
+    parser.add_argument("--csv", default=APP_CONFIG.IMDB_CSV_PATH)
+    args = parser.parse_args()
+
+    try:
+        build_search_index(args.csv)
+    except Exception as exc:
+        LOGGER.exception("Failed to build search index: ")
+    else:
+        LOGGER.info("Search index was successfully built.")
@@ -0,0 +1,163 @@
+"""This module includes functionality for materializing similar movies in neo4j."""
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from app import NEO4J_DRIVER, APP_CONFIG
+from app.catalogue import bump_catalogue_version
+from app.models.movie import Movie
+from app.utils.coroutines import run_sync
+from app.utils.cypher_queries import (
+    GET_MOVIES_EXTERNAL_IDS,
+    GET_MOVIES_SHARING_ENTITIES,
+    GET_SIMILAR_TO_REFERRERS,
+    REPLACE_SIMILAR_TO_RELATIONSHIPS,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+NEO4J_BATCH_SIZE = 500
+MATERIALIZE_WORKERS = 4
+
+
+def iter_movies_external_ids(batch_size=NEO4J_BATCH_SIZE):
+    """Yield batches of all movies external ids ordered by external id."""
+    after_external_id = ""
+    while True:
+        with NEO4J_DRIVER.session() as session:
+            records = session.run(
+                GET_MOVIES_EXTERNAL_IDS,
+                after_external_id=after_external_id,
+                limit=batch_size,
+            ).data()
+
+        if not records:
+            return
+
+        movie_ids = [record["external_id"] for record in records]
+        yield movie_ids
+        after_external_id = movie_ids[-1]
+
+
+def get_similar_to_referrers(movie_ids):
+    """Return external ids of movies that have SIMILAR_TO relationship to provided movies."""
+    with NEO4J_DRIVER.session() as session:
+        records = session.run(GET_SIMILAR_TO_REFERRERS, movie_external_ids=movie_ids).data()
+
+    return [record["external_id"] for record in records]
+
+
+def get_movies_sharing_entities(movie_ids, max_degree):
+    """Return external ids of movies sharing entity of at most max_degree movies with provided."""
+    with NEO4J_DRIVER.session() as session:
+        records = session.run(
+            GET_MOVIES_SHARING_ENTITIES, movie_external_ids=movie_ids, max_degree=max_degree
+        ).data()
+
+    return [record["external_id"] for record in records]
+
+
+def get_affected_movies(movie_ids, max_degree=APP_CONFIG.SIMILAR_MOVIES_MAX_DEGREE):
+    """Return external ids of movies whose similar movies may change with provided movies."""
+    affected_ids = set()
+    for start in range(0, len(movie_ids), NEO4J_BATCH_SIZE):
+        batch = movie_ids[start:start + NEO4J_BATCH_SIZE]
+        affected_ids.update(get_similar_to_referrers(batch))
+        affected_ids.update(get_movies_sharing_entities(batch, max_degree))
+
+    return affected_ids
+
+
+def materialize_similar_movies(movie_ids, top_n, workers=MATERIALIZE_WORKERS):
+    """Compute top n similar movies for provided movies and store them as SIMILAR_TO."""
+    similar_movies = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        recommendations = executor.map(
+            lambda movie_id: run_sync(Movie.compute_similar_movies(movie_id, limit=top_n)),
+            movie_ids,
+        )
+        for movie_id, movie_recommendations in zip(movie_ids, recommendations):
+            similar_movies.append({
+                "external_id": movie_id,
+                "recommendations": movie_recommendations,
+            })
+
+    with NEO4J_DRIVER.session() as session:
+        session.run(REPLACE_SIMILAR_TO_RELATIONSHIPS, similar_movies=similar_movies).consume()
+
+    return similar_movies
+
+
+def materialize_all(top_n, workers=MATERIALIZE_WORKERS):
+    """Recompute SIMILAR_TO relationships for every movie."""
+    movies_count = 0
+    for movie_ids in iter_movies_external_ids():
+        materialize_similar_movies(movie_ids, top_n, workers)
+        movies_count += len(movie_ids)
+        LOGGER.info("Materialized similar movies for %s movies.", movies_count)
+
+
+def materialize_delta(delta_ids, top_n, workers=MATERIALIZE_WORKERS, previous_affected_ids=(),
+                      max_degree=APP_CONFIG.SIMILAR_MOVIES_MAX_DEGREE):
+    """Recompute SIMILAR_TO relationships only for movies touched by catalogue delta.
+
+    Top n lists are not symmetric: a changed movie can enter or leave the list of
+    any movie it shares an entity with, and entity degrees it changes shift IDF
+    scores of all their movies. So besides changed movies, it recomputes movies
+    pointing to them and movies sharing an entity with them. The same movies of the
+    state before the delta are passed as previous_affected_ids, collected with
+    get_affected_movies before the catalogue is written.
+
+    Entities of more than max_degree movies are not followed, so lists of movies
+    sharing only such entities with the delta stay approximate. Run materialize_all
+    periodically to correct them.
+    """
+    touched_ids = set(previous_affected_ids)
+    touched_ids.update(get_affected_movies(delta_ids, max_degree))
+    touched_ids = sorted(touched_ids.difference(delta_ids))
+
+    for movie_ids in (delta_ids, touched_ids):
+        for start in range(0, len(movie_ids), NEO4J_BATCH_SIZE):
+            materialize_similar_movies(movie_ids[start:start + NEO4J_BATCH_SIZE], top_n, workers)
+
+    LOGGER.info(
+        "Materialized similar movies for %s changed and %s touched movies.",
+        len(delta_ids), len(touched_ids)
+    )
+
+
+def read_delta_ids(path):
+    """Return movies external ids listed one per line in provided file."""
+    with open(path) as file:
+        return list(dict.fromkeys(line.strip() for line in file if line.strip()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Materialize SIMILAR_TO relationships.")
+    parser.add_argument(
+        "--delta",
+        help="File with movies external ids changed after previous run, one per line. "
+             "Recomputes all if omitted.",
+    )
+    parser.add_argument("--top-n", type=int, default=APP_CONFIG.SIMILAR_MOVIES_TOP_N)
+    parser.add_argument("--workers", type=int, default=MATERIALIZE_WORKERS)
+    parser.add_argument(
+        "--max-degree", type=int, default=APP_CONFIG.SIMILAR_MOVIES_MAX_DEGREE,
+        help="Entities of more movies are not followed to find movies touched by delta.",
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.delta:
+            materialize_delta(
+                read_delta_ids(args.delta), args.top_n, args.workers, max_degree=args.max_degree
+            )
+        else:
+            materialize_all(args.top_n, args.workers)
+        bump_catalogue_version()
+    except Exception as exc:
+        LOGGER.exception("Failed to materialize similar movies: ")
+    else:
+        LOGGER.info("Similar movies were successfully materialized.")
@@ -0,0 +1,103 @@
+"""This module includes functionality for building similarity matrix artifact from imdb csv."""
+
+import argparse
+import csv
+import logging
+
+import numpy as np
+from scipy import sparse
+
+from app import APP_CONFIG
+from app.artifacts import ArtifactWriter
+from app.catalogue import bump_catalogue_version
+from app.constants import IDF_SCORING
+from app.similarity import SIMILARITY_ARTIFACT_NAME
+
+LOGGER = logging.getLogger(__name__)
+
+
+IMDB_TITLE_ID_FIELD = "imdb_title_id"
+IMDB_TITLE_FIELD = "title"
+
+# Weights of shared movie relationships, the same as in cypher similarity queries.
+IMDB_RELATIONSHIPS_WEIGHTS = {
+    "country": 1,
+    "actors": 1.5,
+    "writer": 2,
+    "director": 2,
+    "production_company": 2,
+    "genre": 3,
+}
+
+
+def read_movies_features(path):
+    """Return movies ids, titles, features weights and binary movie x feature matrix."""
+    external_ids, titles = [], []
+    features = {}
+    rows, columns = [], []
+    with open(path) as file:
+        for row, line in enumerate(csv.DictReader(file)):
+            external_ids.append(line[IMDB_TITLE_ID_FIELD])
+            titles.append(line[IMDB_TITLE_FIELD])
+            movie_features = set()
+            for field in IMDB_RELATIONSHIPS_WEIGHTS:
+                for name in line[field].split(", "):
+                    if name.strip():
+                        movie_features.add((field, name.strip()))
+
+            for feature in movie_features:
+                rows.append(row)
+                columns.append(features.setdefault(feature, len(features)))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(external_ids), len(features)),
+    )
+    weights = np.empty(len(features), dtype=np.float32)
+    for (field, _), column in features.items():
+        weights[column] = IMDB_RELATIONSHIPS_WEIGHTS[field]
+
+    return external_ids, titles, weights, matrix
+
+
+def build_similarity_matrix(path, scoring, max_degree):
+    """Build and publish similarity matrix artifact."""
+    external_ids, titles, weights, matrix = read_movies_features(path)
+    if scoring == IDF_SCORING:
+        degrees = np.asarray(matrix.sum(axis=0)).ravel()
+        weights = weights / np.log1p(degrees)
+        weights[degrees > max_degree] = 0
+
+    weighted_matrix = (matrix @ sparse.diags(weights)).tocsr()
+    weighted_matrix.sort_indices()
+
+    writer = ArtifactWriter(SIMILARITY_ARTIFACT_NAME)
+    writer.add_ids("movie_ids", external_ids)
+    writer.add_strings("titles", titles)
+    writer.add_array("data", weighted_matrix.data.astype(np.float32))
+    writer.add_array("indices", weighted_matrix.indices.astype(np.int32))
+    writer.add_array("indptr", weighted_matrix.indptr.astype(np.int32))
+    version = writer.publish(params={"shape": weighted_matrix.shape, "scoring": scoring})
+
+    LOGGER.info(
+        "Built similarity matrix %s: movies=%s, features=%s, relationships=%s",
+        version, len(external_ids), len(weights), weighted_matrix.nnz
+    )
+    return version
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build similarity matrix artifact.")
+    parser.add_argument("--csv", default=APP_CONFIG.IMDB_CSV_PATH)
+    parser.add_argument("--scoring", default=APP_CONFIG.SIMILAR_MOVIES_SCORING)
+    parser.add_argument("--max-degree", type=int, default=APP_CONFIG.SIMILAR_MOVIES_MAX_DEGREE)
+    args = parser.parse_args()
+
+    try:
+        build_similarity_matrix(args.csv, args.scoring, args.max_degree)
+        bump_catalogue_version()
+    except Exception as exc:
+        LOGGER.exception("Failed to build similarity matrix: ")
+    else:
+        LOGGER.info("Similarity matrix was successfully built.")
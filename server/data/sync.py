@@ -0,0 +1,193 @@
+"""This module syncs changed imdb csv rows into elasticsearch and neo4j databases.
+
+Content hash of every row is stored after successful sync, so the next run diffs
+the csv against it and writes only inserted, updated and deleted movies.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+from elasticsearch.helpers import streaming_bulk
+
+from app import ES_DRIVER, NEO4J_DRIVER, APP_CONFIG
+from app.catalogue import bump_catalogue_version
+from app.constants import MATERIALIZED_BACKEND
+from app.utils.cypher_queries import UPSERT_MOVIES, DELETE_MOVIES
+from data.es import ES_MAX_INSERT_COUNT, ES_MAX_RETRIES, make_movie_doc
+from data.imdb import read_movies_rows, make_neo4j_movie
+from data.similar import (
+    NEO4J_BATCH_SIZE,
+    MATERIALIZE_WORKERS,
+    get_affected_movies,
+    materialize_delta,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+IMDB_HASHED_FIELDS = (
+    "title",
+    "description",
+    "genre",
+    "country",
+    "director",
+    "writer",
+    "production_company",
+    "actors",
+)
+
+
+def hash_movie_row(line):
+    """Return content hash of csv row fields stored in databases."""
+    content = "\x1f".join(line[field] or "" for field in IMDB_HASHED_FIELDS)
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def load_hashes(path):
+    """Return content hashes by imdb title id stored by previous sync or empty dict."""
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_hashes(path, hashes):
+    """Atomically write content hashes by imdb title id."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(hashes, file)
+    os.replace(temporary_path, path)
+
+
+def diff_hashes(previous_hashes, hashes):
+    """Return sorted inserted, updated and deleted imdb title ids."""
+    inserted = sorted(hashes.keys() - previous_hashes.keys())
+    deleted = sorted(previous_hashes.keys() - hashes.keys())
+    updated = sorted(
+        movie_id for movie_id in hashes.keys() & previous_hashes.keys()
+        if hashes[movie_id] != previous_hashes[movie_id]
+    )
+    return inserted, updated, deleted
+
+
+def es_sync_movies(rows, changed_ids, deleted_ids, index, chunk_size=ES_MAX_INSERT_COUNT):
+    """Index changed and delete removed movie docs, return count of failed actions."""
+    actions = [
+        {"_index": index, "_id": movie_id, "_source": make_movie_doc(rows[movie_id])}
+        for movie_id in changed_ids
+    ]
+    actions.extend(
+        {"_op_type": "delete", "_index": index, "_id": movie_id} for movie_id in deleted_ids
+    )
+
+    failed = 0
+    for ok, item in streaming_bulk(
+        ES_DRIVER,
+        actions,
+        chunk_size=chunk_size,
+        max_retries=ES_MAX_RETRIES,
+        raise_on_error=False,
+        ignore_status=(404,),
+    ):
+        if not ok:
+            failed += 1
+            LOGGER.error("Failed to sync doc: %s", item)
+
+    return failed
+
+
+def neo4j_sync_movies(rows, changed_ids, deleted_ids, batch_size=NEO4J_BATCH_SIZE):
+    """Upsert changed movies with their relationships and delete removed movies."""
+    with NEO4J_DRIVER.session() as session:
+        for start in range(0, len(changed_ids), batch_size):
+            movies = [
+                make_neo4j_movie(rows[movie_id])
+                for movie_id in changed_ids[start:start + batch_size]
+            ]
+            session.execute_write(lambda tx: tx.run(UPSERT_MOVIES, movies=movies).consume())
+
+        for start in range(0, len(deleted_ids), batch_size):
+            movie_ids = deleted_ids[start:start + batch_size]
+            session.execute_write(
+                lambda tx: tx.run(DELETE_MOVIES, movie_external_ids=movie_ids).consume()
+            )
+
+
+def sync_catalogue(csv_path, hashes_path, index, similar=False,
+                   top_n=APP_CONFIG.SIMILAR_MOVIES_TOP_N, workers=MATERIALIZE_WORKERS,
+                   batch_size=NEO4J_BATCH_SIZE):
+    """Sync csv rows changed since previous run and return inserted, updated and deleted ids."""
+    rows = read_movies_rows(csv_path)
+    hashes = {movie_id: hash_movie_row(line) for movie_id, line in rows.items()}
+    inserted, updated, deleted = diff_hashes(load_hashes(hashes_path), hashes)
+    changed_ids = inserted + updated
+    LOGGER.info(
+        "Catalogue delta: inserted=%s, updated=%s, deleted=%s, unchanged=%s.",
+        len(inserted), len(updated), len(deleted), len(rows) - len(changed_ids)
+    )
+    if not changed_ids and not deleted:
+        return inserted, updated, deleted
+
+    failed = es_sync_movies(rows, changed_ids, deleted, index)
+    if failed:
+        raise ValueError(f"Failed to sync {failed} docs to es.")
+
+    previous_affected_ids = get_affected_movies(changed_ids + deleted) if similar else ()
+    neo4j_sync_movies(rows, changed_ids, deleted, batch_size)
+    if similar:
+        materialize_delta(
+            changed_ids, top_n, workers, previous_affected_ids.difference(deleted)
+        )
+
+    bump_catalogue_version()
+    save_hashes(hashes_path, hashes)
+
+    return inserted, updated, deleted
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Sync imdb csv rows changed since previous run into es and neo4j."
+    )
+    parser.add_argument("--csv", default=APP_CONFIG.IMDB_CSV_PATH)
+    parser.add_argument("--index", default=APP_CONFIG.ES_DATABASE_MOVIE_INDEX)
+    parser.add_argument(
+        "--hashes", default=os.path.join(APP_CONFIG.ARTIFACTS_DIR, "catalogue_hashes.json")
+    )
+    parser.add_argument(
+        "--similar",
+        action="store_true",
+        default=APP_CONFIG.SIMILAR_MOVIES_BACKEND == MATERIALIZED_BACKEND,
+        help="Recompute SIMILAR_TO relationships of movies touched by delta.",
+    )
+    parser.add_argument("--top-n", type=int, default=APP_CONFIG.SIMILAR_MOVIES_TOP_N)
+    parser.add_argument("--workers", type=int, default=MATERIALIZE_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=NEO4J_BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        started_at = time.perf_counter()
+        inserted, updated, deleted = sync_catalogue(
+            args.csv,
+            args.hashes,
+            args.index,
+            similar=args.similar,
+            top_n=args.top_n,
+            workers=args.workers,
+            batch_size=args.batch_size,
+        )
+        elapsed = time.perf_counter() - started_at
+    except Exception as exc:
+        LOGGER.exception("Failed to sync catalogue: ")
+    else:
+        LOGGER.info(
+            "Catalogue was successfully synced: inserted=%s, updated=%s, deleted=%s, took %.2fs.",
+            len(inserted), len(updated), len(deleted), elapsed
+        )
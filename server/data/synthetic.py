@@ -0,0 +1,469 @@
+"""This module generates seeded synthetic catalogue and likes for load and scaling tests.
+
+Catalogue is written as imdb csv, so it is loaded by the same loaders as the real
+one: data/imdb.py into neo4j, data/es.py into elasticsearch and the in-memory
+storage backend from IMDB_CSV_PATH. Cast, crew and companies are drawn with
+power-law popularity, so entity degrees are skewed the way they are in imdb.
+
+Likes follow power-law user activity and movie popularity. They are written into
+neo4j in partitioned parallel batches, or into like log of the in-memory storage
+backend. The same seed and sizes always produce the same dataset.
+"""
+
+import argparse
+import csv
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app import APP_CONFIG
+from app.catalogue import bump_catalogue_version
+from app.constants import LIKE_ACTION
+from app.graph import format_like_log
+from data.es import es_build_movie_index
+from data.imdb import (
+    IMDB_LIST_SEPARATOR,
+    NEO4J_BATCH_SIZE,
+    NEO4J_PARTITIONS,
+    load_catalogue,
+    log_phase,
+    partition_relationships,
+    write_batches,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+NEO4J_TARGET = "neo4j"
+ES_TARGET = "es"
+MEMORY_TARGET = "memory"
+
+# Chunk sizes take part in drawing random numbers, so they are fixed for determinism
+MOVIES_CHUNK_SIZE = 100000
+USERS_CHUNK_SIZE = 10000
+
+IMDB_FIELDS = (
+    "imdb_title_id", "title", "original_title", "genre", "country", "director", "writer",
+    "production_company", "actors", "description",
+)
+
+GENRES = (
+    "Drama", "Comedy", "Action", "Thriller", "Romance", "Crime", "Horror", "Adventure",
+    "Animation", "Family", "Mystery", "Fantasy", "Sci-Fi", "Biography", "History",
+    "War", "Music", "Western", "Sport", "Documentary",
+)
+COUNTRIES = (
+    "USA", "UK", "France", "Germany", "Italy", "Japan", "India", "Spain", "Canada",
+    "South Korea", "China", "Mexico", "Brazil", "Sweden", "Denmark", "Australia",
+    "Russia", "Poland", "Turkey", "Argentina",
+)
+FIRST_NAMES = (
+    "Anna", "Boris", "Clara", "David", "Elena", "Frank", "Greta", "Hugo", "Ines", "Jonas",
+    "Karin", "Leo", "Maria", "Nils", "Olga", "Paul", "Rosa", "Sven", "Tina", "Victor",
+)
+LAST_NAMES = (
+    "Adler", "Berg", "Costa", "Duval", "Engel", "Fiore", "Garcia", "Holm", "Ito", "Jansen",
+    "Klein", "Lund", "Moreau", "Novak", "Olsen", "Petrov", "Quinn", "Rossi", "Silva",
+    "Tanaka", "Ueda", "Vogel", "Weber", "Young", "Zima",
+)
+COMPANY_WORDS = (
+    "Northlight", "Redwood", "Silver", "Blue Harbor", "Golden Gate", "Iron Bridge",
+    "Lighthouse", "Black Pine", "Crescent", "Paper Moon",
+)
+COMPANY_KINDS = ("Pictures", "Studio", "Films", "Productions", "Entertainment")
+TITLE_ADJECTIVES = (
+    "Broken", "Night", "Silent", "Hidden", "Lost", "Golden", "Iron", "Distant", "Winter",
+    "Crimson", "Last", "Secret", "Empty", "Burning", "Frozen", "Wild", "Quiet", "Dark",
+    "Little", "Endless",
+)
+TITLE_NOUNS = (
+    "City", "Station", "River", "Mirror", "Harbor", "Song", "Letter", "Road", "Garden",
+    "Island", "Promise", "Shadow", "Kingdom", "Summer", "Door", "Witness", "Storm",
+    "Horizon", "Bridge", "Heart",
+)
+DESCRIPTION_WORDS = (
+    "family", "war", "love", "journey", "detective", "murder", "friendship", "revenge",
+    "secret", "village", "soldier", "artist", "escape", "mystery", "dream", "betrayal",
+    "island", "prison", "brothers", "sisters", "mother", "father", "town", "police",
+    "money", "music", "school", "night", "ghost", "king", "queen", "ship", "train",
+    "winter", "summer", "farm", "robbery", "trial", "election", "storm",
+)
+
+GENRES_COUNTS = (1, 4)
+COUNTRIES_COUNTS = (1, 3)
+DIRECTORS_COUNTS = (1, 3)
+WRITERS_COUNTS = (1, 3)
+COMPANIES_COUNTS = (1, 2)
+ACTORS_COUNTS = (4, 9)
+DESCRIPTION_WORDS_COUNTS = (6, 16)
+
+ENTITY_EXPONENT = 0.8
+USER_EXPONENT = 1.1
+MOVIE_EXPONENT = 1.0
+MAX_USER_LIKES = 5000
+MAX_DRAW_ROUNDS = 50
+
+LIKES_STARTED_AT = 1577836800000
+LIKES_PERIOD = 3 * 365 * 24 * 3600 * 1000
+
+CREATE_USERS = """
+    UNWIND $users AS external_id
+    MERGE (:User {external_id: external_id})
+"""
+
+CREATE_LIKES = """
+    UNWIND $likes AS like
+    MATCH (user:User {external_id: like.user_external_id})
+    MATCH (movie:Movie {external_id: like.movie_external_id})
+    CREATE (user)-[:LIKED {at: like.at}]->(movie)
+"""
+
+
+def get_power_law_cdf(count, exponent):
+    """Return cumulative distribution of ranks 1..count with weights 1 / rank ** exponent."""
+    weights = 1 / np.arange(1, count + 1, dtype=np.float64) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def draw(rng, cdf, size):
+    """Return ranks drawn from cumulative distribution."""
+    return np.minimum(np.searchsorted(cdf, rng.random(size)), len(cdf) - 1)
+
+
+def make_movie_id(row):
+    """Return imdb title id of movie row."""
+    return f"tt{row + 1:07d}"
+
+
+def make_user_id(row):
+    """Return external id of user row."""
+    return f"user-{row + 1}"
+
+
+def make_person_name(row):
+    """Return unique person name of row."""
+    first, rest = row % len(FIRST_NAMES), row // len(FIRST_NAMES)
+    name = f"{FIRST_NAMES[first]} {LAST_NAMES[rest % len(LAST_NAMES)]}"
+    if rest >= len(LAST_NAMES):
+        name = f"{name} {rest // len(LAST_NAMES) + 1}"
+
+    return name
+
+
+def make_company_name(row):
+    """Return unique production company name of row."""
+    word, rest = row % len(COMPANY_WORDS), row // len(COMPANY_WORDS)
+    name = f"{COMPANY_WORDS[word]} {COMPANY_KINDS[rest % len(COMPANY_KINDS)]}"
+    if rest >= len(COMPANY_KINDS):
+        name = f"{name} {rest // len(COMPANY_KINDS) + 1}"
+
+    return name
+
+
+def make_title(row):
+    """Return title of movie row, titles repeat with sequel numbers."""
+    adjective, rest = row % len(TITLE_ADJECTIVES), row // len(TITLE_ADJECTIVES)
+    title = f"{TITLE_ADJECTIVES[adjective]} {TITLE_NOUNS[rest % len(TITLE_NOUNS)]}"
+    if rest >= len(TITLE_NOUNS):
+        title = f"{title} {rest // len(TITLE_NOUNS) + 1}"
+
+    return title
+
+
+class EntityPool:
+    """Class that draws names of entities with power-law popularity."""
+
+    def __init__(self, rng, names, exponent=ENTITY_EXPONENT):
+        """Initialize pool with names function or sequence and popularity exponent."""
+        self.names = names
+        self.count = len(names) if isinstance(names, tuple) else None
+        self.exponent = exponent
+        self.rng = rng
+        self.cdf = None
+        self.ranks = None
+
+    def resize(self, count):
+        """Set count of entities in pool, entities popularity is shuffled over their rows."""
+        count = self.count or count
+        self.cdf = get_power_law_cdf(count, self.exponent)
+        self.ranks = self.rng.permutation(count)
+
+    def get_name(self, rank):
+        """Return name of entity of popularity rank."""
+        row = int(self.ranks[rank])
+        return self.names[row] if isinstance(self.names, tuple) else self.names(row)
+
+    def draw_names(self, counts_range, size):
+        """Return lists of distinct names of size rows with counts drawn from counts range."""
+        counts = self.rng.integers(*counts_range, size=size)
+        ranks = draw(self.rng, self.cdf, int(counts.sum()))
+        names, start = [], 0
+        for count in counts:
+            names.append(
+                list(dict.fromkeys(self.get_name(rank) for rank in ranks[start:start + count]))
+            )
+            start += count
+
+        return names
+
+
+def generate_catalogue(csv_path, movies_count, seed):
+    """Write imdb csv of synthetic movies and return their count."""
+    rng = np.random.default_rng(seed)
+    pools = {
+        "genre": (EntityPool(rng, GENRES, exponent=1.0), GENRES_COUNTS),
+        "country": (EntityPool(rng, COUNTRIES, exponent=1.2), COUNTRIES_COUNTS),
+        "director": (EntityPool(rng, make_person_name), DIRECTORS_COUNTS),
+        "writer": (EntityPool(rng, make_person_name), WRITERS_COUNTS),
+        "production_company": (EntityPool(rng, make_company_name), COMPANIES_COUNTS),
+        "actors": (EntityPool(rng, make_person_name), ACTORS_COUNTS),
+    }
+    pools_sizes = {
+        "director": movies_count // 4 + 1,
+        "writer": movies_count // 3 + 1,
+        "production_company": movies_count // 50 + 1,
+        "actors": movies_count * 2,
+    }
+    for field, (pool, _) in pools.items():
+        pool.resize(pools_sizes.get(field, 0))
+
+    os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+    with open(csv_path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=IMDB_FIELDS)
+        writer.writeheader()
+        for start in range(0, movies_count, MOVIES_CHUNK_SIZE):
+            size = min(MOVIES_CHUNK_SIZE, movies_count - start)
+            names = {
+                field: pool.draw_names(counts_range, size)
+                for field, (pool, counts_range) in pools.items()
+            }
+            words_counts = rng.integers(*DESCRIPTION_WORDS_COUNTS, size=size)
+            words = rng.integers(len(DESCRIPTION_WORDS), size=int(words_counts.sum()))
+            words_start = 0
+            for offset in range(size):
+                title = make_title(start + offset)
+                description_words = " ".join(
+                    DESCRIPTION_WORDS[word]
+                    for word in words[words_start:words_start + words_counts[offset]]
+                )
+                words_start += words_counts[offset]
+                writer.writerow({
+                    "imdb_title_id": make_movie_id(start + offset),
+                    "title": title,
+                    "original_title": title,
+                    "description": f"A story about the {title.lower()}, {description_words}.",
+                    **{
+                        field: IMDB_LIST_SEPARATOR.join(rows[offset])
+                        for field, rows in names.items()
+                    },
+                })
+
+    return movies_count
+
+
+def draw_user_likes_counts(rng, users_count, likes_count, max_user_likes):
+    """Return counts of likes of user ranks with power-law activity capped by max_user_likes.
+
+    Likes above the cap are redrawn among users below it, so the total is kept unless
+    all users reach the cap.
+    """
+    weights = 1 / np.arange(1, users_count + 1, dtype=np.float64) ** USER_EXPONENT
+    counts = rng.multinomial(likes_count, weights / weights.sum())
+    for _ in range(MAX_DRAW_ROUNDS):
+        excess = int(np.maximum(counts - max_user_likes, 0).sum())
+        counts = np.minimum(counts, max_user_likes)
+        below_cap = counts < max_user_likes
+        if not excess or not below_cap.any():
+            break
+
+        counts[below_cap] += rng.multinomial(
+            excess, weights[below_cap] / weights[below_cap].sum()
+        )
+
+    return counts
+
+
+def draw_distinct_movies(rng, users, counts, movie_cdf, movies_count):
+    """Return user and movie ranks of distinct likes, every user gets up to its count of likes.
+
+    Duplicated movies of user are redrawn, which converges slower for the most active
+    users, so a few likes of them may be missing after MAX_DRAW_ROUNDS.
+    """
+    keys = np.empty(0, dtype=np.int64)
+    missing = counts
+    for _ in range(MAX_DRAW_ROUNDS):
+        drawn_users = np.repeat(users, missing).astype(np.int64)
+        drawn_movies = draw(rng, movie_cdf, len(drawn_users))
+        keys = np.sort(np.concatenate((keys, drawn_users * movies_count + drawn_movies)))
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        missing = counts - np.bincount(
+            np.searchsorted(users, keys // movies_count), minlength=len(users)
+        )
+        if not missing.any():
+            break
+
+    return keys // movies_count, keys % movies_count
+
+
+def generate_likes(movies_count, users_count, likes_count, seed, max_user_likes=MAX_USER_LIKES):
+    """Yield chunks of distinct likes as arrays of user rows, movie rows and timestamps.
+
+    Likes of every user are drawn from power-law movie popularity, counts of likes
+    of users follow power-law activity.
+    """
+    rng = np.random.default_rng(seed)
+    user_likes = draw_user_likes_counts(
+        rng, users_count, likes_count, min(max_user_likes, movies_count)
+    )
+    user_rows = rng.permutation(users_count)
+    movie_cdf = get_power_law_cdf(movies_count, MOVIE_EXPONENT)
+    movie_rows = rng.permutation(movies_count)
+
+    for start in range(0, users_count, USERS_CHUNK_SIZE):
+        users = np.arange(start, min(start + USERS_CHUNK_SIZE, users_count))
+        user_ranks, movie_ranks = draw_distinct_movies(
+            rng, users, user_likes[users], movie_cdf, movies_count
+        )
+        ats = LIKES_STARTED_AT + rng.integers(LIKES_PERIOD, size=len(user_ranks))
+        yield user_rows[user_ranks], movie_rows[movie_ranks], ats
+
+
+def iter_likes(chunks):
+    """Yield lists of likes dicts of chunks of generated likes."""
+    for users, movies, ats in chunks:
+        yield [
+            {
+                "user_external_id": make_user_id(user),
+                "movie_external_id": make_movie_id(movie),
+                "at": int(at),
+            }
+            for user, movie, at in zip(users.tolist(), movies.tolist(), ats.tolist())
+        ]
+
+
+def neo4j_load_likes(likes_chunks, batch_size=NEO4J_BATCH_SIZE, partitions=NEO4J_PARTITIONS):
+    """Create users and likes of chunks in neo4j and return count of created likes."""
+    created = 0
+    with ThreadPoolExecutor(max_workers=partitions) as executor:
+        for likes in likes_chunks:
+            users = list(dict.fromkeys(like["user_external_id"] for like in likes))
+            write_batches(CREATE_USERS, "users", users, batch_size)
+            for cells in partition_relationships(likes, partitions, "user_external_id"):
+                for future in [
+                    executor.submit(write_batches, CREATE_LIKES, "likes", cell, batch_size)
+                    for cell in cells if cell
+                ]:
+                    future.result()
+
+            created += len(likes)
+            LOGGER.info("Created %s likes.", created)
+
+    return created
+
+
+def write_like_log(likes_chunks, like_log_path):
+    """Write likes of chunks into like log of in-memory storage backend, return their count."""
+    written = 0
+    os.makedirs(os.path.dirname(os.path.abspath(like_log_path)), exist_ok=True)
+    with open(like_log_path, "x") as file:
+        for likes in likes_chunks:
+            file.write(format_like_log({**like, "action": LIKE_ACTION} for like in likes))
+            written += len(likes)
+
+    return written
+
+
+def generate_dataset(csv_path, movies_count, users_count, likes_count, seed, targets,
+                     like_log_path=None, batch_size=NEO4J_BATCH_SIZE,
+                     partitions=NEO4J_PARTITIONS):
+    """Generate catalogue and likes, load them into targets and return stats of every phase."""
+    if MEMORY_TARGET in targets and os.path.exists(like_log_path):
+        raise FileExistsError(f"The like log already exists: {like_log_path}")
+
+    stats = {}
+
+    started_at = time.perf_counter()
+    generate_catalogue(csv_path, movies_count, seed)
+    stats["catalogue"] = log_phase("catalogue", movies_count, started_at)
+
+    if NEO4J_TARGET in targets:
+        stats["neo4j_catalogue"] = load_catalogue(csv_path, batch_size, partitions)
+
+        started_at = time.perf_counter()
+        created = neo4j_load_likes(
+            iter_likes(generate_likes(movies_count, users_count, likes_count, seed)),
+            batch_size,
+            partitions,
+        )
+        stats["neo4j_likes"] = log_phase("neo4j likes", created, started_at)
+        bump_catalogue_version()
+
+    if ES_TARGET in targets:
+        started_at = time.perf_counter()
+        with tempfile.TemporaryDirectory() as directory:
+            indexed, _ = es_build_movie_index(
+                csv_path,
+                os.path.join(directory, "es_ingestion.checkpoint"),
+                APP_CONFIG.ES_DATABASE_MOVIE_INDEX,
+                restart=True,
+            )
+        stats["es"] = log_phase("es", indexed, started_at)
+
+    if MEMORY_TARGET in targets:
+        started_at = time.perf_counter()
+        written = write_like_log(
+            iter_likes(generate_likes(movies_count, users_count, likes_count, seed)),
+            like_log_path,
+        )
+        stats["like_log"] = log_phase("like log", written, started_at)
+
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic catalogue and likes and load them into targets."
+    )
+    parser.add_argument("--csv", required=True, help="Path of generated imdb csv.")
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--likes", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--targets",
+        nargs="*",
+        choices=(NEO4J_TARGET, ES_TARGET, MEMORY_TARGET),
+        default=(),
+        help="Stores to load generated dataset into, only csv is written by default.",
+    )
+    parser.add_argument(
+        "--like-log",
+        default=APP_CONFIG.LIKE_LOG_PATH,
+        help="Like log of in-memory storage backend, it must not exist.",
+    )
+    parser.add_argument("--batch-size", type=int, default=NEO4J_BATCH_SIZE)
+    parser.add_argument("--partitions", type=int, default=NEO4J_PARTITIONS)
+    args = parser.parse_args()
+
+    try:
+        generate_dataset(
+            args.csv,
+            args.movies,
+            args.users,
+            args.likes,
+            args.seed,
+            args.targets,
+            like_log_path=args.like_log,
+            batch_size=args.batch_size,
+            partitions=args.partitions,
+        )
+    except Exception as exc:
+        LOGGER.exception("Failed to generate synthetic dataset: ")
+    else:
+        LOGGER.info("Synthetic dataset was successfully generated.")
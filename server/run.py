@@ -1,20 +1,13 @@
 """This module is entrypoint of app."""
 
-from http import HTTPStatus
-
 from flask import Flask
 from flask_cors import CORS
 from flask_swagger_ui import get_swaggerui_blueprint
 
-from app import APP_CONFIG
-from app.api.movie import movies_blueprint
-from app.api.index import (
-    internal_blueprint,
-    handle_404,
-    handle_405,
-    handle_500,
-    validate_body,
-)
+from app import APP_CONFIG, NEO4J_DRIVER, ES_DRIVER
+from app.api import index, movie
+from app.metrics import register_pool_gauges
+from app.views import register_api
 
 
 def create_app():
@@ -25,16 +18,9 @@ def create_app():
     swagger_blueprint = get_swaggerui_blueprint("/api/v1/docs", "/static/swagger.yaml")
     app.register_blueprint(swagger_blueprint, url_prefix="/api/v1/docs")
 
-    app.register_blueprint(internal_blueprint, url_prefix="/api/v1")
-    app.register_blueprint(movies_blueprint, url_prefix="/api/v1")
-
-    app.register_error_handler(HTTPStatus.NOT_FOUND, handle_404)
-    app.register_error_handler(HTTPStatus.METHOD_NOT_ALLOWED, handle_405)
-    app.register_error_handler(HTTPStatus.INTERNAL_SERVER_ERROR, handle_500)
-
-    app.config.from_object(APP_CONFIG)
+    register_api(app, index, movie)
 
-    app.before_request(validate_body)
+    register_pool_gauges(neo4j_driver=NEO4J_DRIVER, es_driver=ES_DRIVER)
 
     return app
 